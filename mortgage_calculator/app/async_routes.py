@@ -0,0 +1,219 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models as models
+import app.schemas as schemas
+from app.crud.async_mortgage_crud import (
+    create_mortgage_crud,
+    delete_mortgage_crud,
+    get_mortgage_crud,
+    get_mortgages_crud,
+    update_mortgage_crud,
+)
+from app.crud.async_property_crud import (
+    create_property_crud,
+    delete_property_crud,
+    get_properties_crud,
+    get_property_crud,
+    update_property_crud,
+)
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.custom.conditional import async_not_modified_response, conditional_response
+from app.custom.responses import ModelResponse
+from app.database import get_async_db
+
+# Async versions of the property and mortgage CRUD routes, used when DATABASE_ASYNC is set
+router = APIRouter()
+
+
+def replace_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Return a router with the routes of sync_router, where each route that async_router
+    also defines (same path and methods) is swapped for the async one.
+
+    The order of sync_router is kept, so routes still match in the order they were
+    declared in app/routes.py.
+    """
+    async_routes = {
+        (route.path, frozenset(route.methods)): route for route in async_router.routes
+    }
+    merged_router = APIRouter()
+    merged_router.routes.extend(
+        async_routes.get((route.path, frozenset(route.methods)), route)
+        for route in sync_router.routes
+    )
+    return merged_router
+
+
+@router.post(
+    "/property",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.PropertyResponseModel,
+)
+async def create_property(
+    property: schemas.PropertyCreateModel, db: AsyncSession = Depends(get_async_db)
+) -> schemas.PropertyResponseModel:
+    """
+    Create a new property.
+    """
+    return await create_property_crud(payload=property, db=db)
+
+
+@router.get(
+    "/property/{property_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.PropertyResponseModel,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
+)
+async def get_property(
+    property_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.PropertyResponseModel:
+    """
+    Get a property by ID.
+    """
+    # Polling clients whose copy is current get an empty 304
+    not_modified = await async_not_modified_response(
+        request, db, models.PropertyOrm, property_id
+    )
+    if not_modified is not None:
+        return not_modified
+    property_response = await get_property_crud(property_id=property_id, db=db)
+    return conditional_response(
+        request, ModelResponse(property_response), property_response.data
+    )
+
+
+@router.patch(
+    "/property/{property_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas.PropertyResponseModel,
+)
+async def update_property(
+    property_id: str,
+    property: schemas.PropertyUpdateModel,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.PropertyResponseModel:
+    """
+    Update a property by ID.
+    """
+    return await update_property_crud(property_id=property_id, payload=property, db=db)
+
+
+@router.delete(
+    "/property/{property_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas.PropertyDeleteModel,
+)
+async def delete_property(
+    property_id: str, db: AsyncSession = Depends(get_async_db)
+) -> schemas.PropertyDeleteModel:
+    """
+    Delete a property by ID.
+    """
+    return await delete_property_crud(property_id=property_id, db=db)
+
+
+@router.get(
+    "/property",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.PropertyListResponseModel,
+)
+async def get_properties(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.PropertyListResponseModel:
+    """
+    Get all properties, one page at a time. Pass next_cursor back to get the next page.
+    """
+    return ModelResponse(await get_properties_crud(db=db, limit=limit, cursor=cursor))
+
+
+@router.post(
+    "/mortgage",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.MortgageResponseModel,
+)
+async def create_mortgage(
+    mortgage: schemas.MortgageCreateModel, db: AsyncSession = Depends(get_async_db)
+) -> schemas.MortgageResponseModel:
+    """
+    Create a new mortgage.
+    """
+    return await create_mortgage_crud(payload=mortgage, db=db)
+
+
+@router.get(
+    "/mortgage/{mortgage_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.MortgageResponseModel,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
+)
+async def get_mortgage(
+    mortgage_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.MortgageResponseModel:
+    """
+    Get a mortgage by ID.
+    """
+    # Polling clients whose copy is current get an empty 304
+    not_modified = await async_not_modified_response(
+        request, db, models.MortgageOrm, mortgage_id
+    )
+    if not_modified is not None:
+        return not_modified
+    mortgage_response = await get_mortgage_crud(mortgage_id=mortgage_id, db=db)
+    return conditional_response(
+        request, ModelResponse(mortgage_response), mortgage_response.data
+    )
+
+
+@router.patch(
+    "/mortgage/{mortgage_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas.MortgageResponseModel,
+)
+async def update_mortgage(
+    mortgage_id: str,
+    mortgage: schemas.MortgageUpdateModel,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.MortgageResponseModel:
+    """
+    Update a mortgage by ID.
+    """
+    return await update_mortgage_crud(mortgage_id=mortgage_id, payload=mortgage, db=db)
+
+
+@router.delete(
+    "/mortgage/{mortgage_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas.MortgageDeleteModel,
+)
+async def delete_mortgage(
+    mortgage_id: str, db: AsyncSession = Depends(get_async_db)
+) -> schemas.MortgageDeleteModel:
+    """
+    Delete a mortgage by ID.
+    """
+    return await delete_mortgage_crud(mortgage_id=mortgage_id, db=db)
+
+
+@router.get(
+    "/mortgage",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.MortgageListResponseModel,
+)
+async def get_mortgages(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.MortgageListResponseModel:
+    """
+    Get all mortgages, one page at a time. Pass next_cursor back to get the next page.
+    """
+    return ModelResponse(await get_mortgages_crud(db=db, limit=limit, cursor=cursor))
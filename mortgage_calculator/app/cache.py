@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Cache backend: "memory" (in-process LRU), "redis" or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1024"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = "mortgage_calculator:"
+
+
+class NullCache:
+    """A cache that stores nothing, for when caching is disabled."""
+
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache:
+    """
+    An in-process, thread-safe least recently used cache whose entries expire.
+
+    Each worker process has its own copy, so entries invalidated in one worker
+    stay visible in the others until they expire. Use Redis when running several.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.timer():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (self.timer() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """
+    A cache shared by all workers, stored in Redis as JSON.
+
+    ``client`` is any Redis-compatible client exposing get, set, delete and
+    scan_iter, such as ``redis.Redis``. Its calls block on the network, so async
+    code goes through ``async_get``, ``async_put`` and ``async_invalidate``.
+    """
+
+    blocking = True
+
+    def __init__(self, client, ttl: float = 60, prefix: str = CACHE_PREFIX):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any):
+        self.client.set(self.prefix + key, json.dumps(value), px=int(self.ttl * 1000))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache():
+    """Build the cache backend configured by the CACHE_* environment variables."""
+    if CACHE_BACKEND == "none":
+        return NullCache()
+    if CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the redis package: "
+                "poetry install --extras redis"
+            ) from e
+        return RedisCache(redis.Redis.from_url(CACHE_REDIS_URL), ttl=CACHE_TTL)
+    if CACHE_BACKEND == "memory":
+        return LRUCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+    raise ValueError(f"Unknown CACHE_BACKEND: {CACHE_BACKEND}")
+
+
+backend = create_cache()
+
+
+def cache_key(namespace: str, id_) -> Optional[str]:
+    """
+    Build the key of a cached object, or None when the ID is not a valid UUID.
+
+    IDs are normalised, so the same object is cached under one key whatever the
+    case or format of the ID in the URL.
+    """
+    try:
+        return f"{namespace}:{uuid.UUID(str(id_))}"
+    except ValueError:
+        return None
+
+
+def get(key: Optional[str]) -> Optional[Any]:
+    return None if key is None else backend.get(key)
+
+
+def put(key: Optional[str], value: Any):
+    if key is not None:
+        backend.set(key, value)
+
+
+def invalidate(*keys: Optional[str]):
+    backend.delete(*(key for key in keys if key is not None))
+
+
+def clear():
+    backend.clear()
+
+
+async def _off_event_loop(function, *args):
+    # In-process backends answer immediately; network round trips go to the threadpool
+    if getattr(backend, "blocking", False):
+        return await run_in_threadpool(function, *args)
+    return function(*args)
+
+
+async def async_get(key: Optional[str]) -> Optional[Any]:
+    return await _off_event_loop(get, key)
+
+
+async def async_put(key: Optional[str], value: Any):
+    await _off_event_loop(put, key, value)
+
+
+async def async_invalidate(*keys: Optional[str]):
+    await _off_event_loop(invalidate, *keys)
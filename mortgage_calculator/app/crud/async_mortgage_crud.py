@@ -0,0 +1,191 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.cache as cache
+import app.models as models
+import app.schemas as schemas
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset_page, split_page
+from app.crud.returning import async_delete_by_id, async_update_returning
+from app.custom.money import calculate_mortgage_amount
+from app.database import get_async_db
+
+
+async def create_mortgage_crud(
+    payload: schemas.MortgageCreateModel, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        # Create a new mortgage object from the payload
+        new_mortgage = models.MortgageOrm(**payload.model_dump())
+
+        # Check whether the property exists in the DB
+        purchase_price = await db.scalar(
+            select(models.PropertyOrm.purchase_price).where(
+                models.PropertyOrm.id == payload.property_id
+            )
+        )
+        if purchase_price is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found.",
+            )
+
+        # Calculate mortgage amount (LTV * Purchase Price)
+        new_mortgage.mortgage_amount = calculate_mortgage_amount(
+            purchase_price, new_mortgage.loan_to_value
+        )
+
+        db.add(new_mortgage)
+        await db.commit()
+        await db.refresh(new_mortgage)
+
+        # Validate the new mortgage object
+        mortgage_data = schemas.MortgageModel.model_validate(new_mortgage)
+
+        return schemas.MortgageResponseModel(
+            status=schemas.Status.Success,
+            message="Mortgage created successfully.",
+            data=mortgage_data,
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A mortgage with the given details already exists.",
+        )
+
+
+async def get_mortgage_crud(mortgage_id: str, db: AsyncSession = Depends(get_async_db)):
+    key = cache.cache_key("mortgage", mortgage_id)
+    cached_response = await cache.async_get(key)
+    if cached_response is not None:
+        return schemas.MortgageResponseModel.model_validate(cached_response)
+
+    mortgage_data = await db.scalar(
+        select(models.MortgageOrm).where(models.MortgageOrm.id == mortgage_id)
+    )
+
+    if not mortgage_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mortgage not found.",
+        )
+
+    try:
+        response = schemas.MortgageResponseModel(
+            status=schemas.Status.Success,
+            message="Mortgage retrieved successfully.",
+            data=schemas.MortgageModel.model_validate(mortgage_data),
+        )
+        await cache.async_put(key, response.model_dump(mode="json"))
+        return response
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while retrieving the mortgage.",
+        ) from e
+
+
+async def update_mortgage_crud(
+    mortgage_id: str, payload: schemas.MortgageUpdateModel, db: AsyncSession
+):
+    # Prepare update data from the payload, only including fields that are set
+    update_data = payload.model_dump(exclude_unset=True)
+    if not update_data:
+        exists = await db.scalar(
+            select(models.MortgageOrm.id).where(models.MortgageOrm.id == mortgage_id)
+        )
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid fields provided for update.",
+        )
+
+    try:
+        # One statement checks the mortgage exists and returns its new state
+        db_mortgage = await async_update_returning(
+            db, models.MortgageOrm, mortgage_id, update_data
+        )
+        if not db_mortgage:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+            )
+        # Convert the updated ORM model to a Pydantic model before the commit
+        # expires it
+        data = schemas.MortgageModel.model_validate(db_mortgage)
+        await db.commit()
+        await cache.async_invalidate(
+            cache.cache_key("mortgage", mortgage_id),
+            cache.cache_key("mortgage_payment", mortgage_id),
+        )
+
+        return schemas.MortgageResponseModel(
+            status=schemas.Status.Success,
+            message="Mortgage updated successfully.",
+            data=data,
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A mortgage with the given details already exists.",
+        ) from e
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while updating the mortgage: {str(e)}",
+        ) from e
+
+
+async def delete_mortgage_crud(
+    mortgage_id: str, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        if not await async_delete_by_id(db, models.MortgageOrm, mortgage_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No mortgage found with ID: {mortgage_id}",
+            )
+        await db.commit()
+        await cache.async_invalidate(
+            cache.cache_key("mortgage", mortgage_id),
+            cache.cache_key("mortgage_payment", mortgage_id),
+        )
+        return schemas.MortgageDeleteModel(
+            id=mortgage_id,
+            status=schemas.Status.Success,
+            message="Mortgage deleted successfully.",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while deleting the mortgage.",
+        ) from e
+
+
+async def get_mortgages_crud(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: str = "",
+):
+    statement = keyset_page(
+        select(models.MortgageOrm), models.MortgageOrm, limit, cursor
+    )
+    mortgages, next_cursor = split_page((await db.scalars(statement)).all(), limit)
+    return schemas.MortgageListResponseModel(
+        status=schemas.Status.Success,
+        message="Mortgages retrieved successfully.",
+        data=[schemas.MortgageModel.model_validate(mortgage) for mortgage in mortgages],
+        next_cursor=next_cursor,
+    )
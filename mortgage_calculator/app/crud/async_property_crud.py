@@ -0,0 +1,183 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.cache as cache
+import app.models as models
+import app.schemas as schemas
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset_page, split_page
+from app.crud.returning import async_delete_by_id, async_update_returning
+from app.database import get_async_db
+
+
+async def create_property_crud(
+    payload: schemas.PropertyCreateModel, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        new_property = models.PropertyOrm(**payload.model_dump())
+        db.add(new_property)
+        await db.commit()
+        await db.refresh(new_property)
+
+        property_data = schemas.PropertyModel.model_validate(new_property)
+
+        return schemas.PropertyResponseModel(
+            status=schemas.Status.Success,
+            message="Property created successfully.",
+            data=property_data,
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A property with the given details already exists.",
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while creating the property: {str(e)}",
+        )
+
+
+async def get_property_crud(property_id: str, db: AsyncSession = Depends(get_async_db)):
+    key = cache.cache_key("property", property_id)
+    cached_response = await cache.async_get(key)
+    if cached_response is not None:
+        return schemas.PropertyResponseModel.model_validate(cached_response)
+
+    property_data = await db.scalar(
+        select(models.PropertyOrm).where(models.PropertyOrm.id == property_id)
+    )
+
+    if not property_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found.",
+        )
+
+    try:
+        response = schemas.PropertyResponseModel(
+            status=schemas.Status.Success,
+            message="Property retrieved successfully.",
+            data=schemas.PropertyModel.model_validate(property_data),
+        )
+        await cache.async_put(key, response.model_dump(mode="json"))
+        return response
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while retrieving the property.",
+        ) from e
+
+
+async def update_property_crud(
+    property_id: str, payload: schemas.PropertyUpdateModel, db: AsyncSession
+):
+    # Prepare update data from the payload, only including fields that are set
+    update_data = payload.model_dump(exclude_unset=True)
+    if not update_data:
+        exists = await db.scalar(
+            select(models.PropertyOrm.id).where(models.PropertyOrm.id == property_id)
+        )
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid fields provided for update.",
+        )
+
+    try:
+        # One statement checks the property exists and returns its new state
+        db_property = await async_update_returning(
+            db, models.PropertyOrm, property_id, update_data
+        )
+        if not db_property:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+            )
+        # Convert the updated ORM model to a Pydantic model before the commit
+        # expires it
+        data = schemas.PropertyModel.model_validate(db_property)
+        await db.commit()
+        await cache.async_invalidate(cache.cache_key("property", property_id))
+
+        return schemas.PropertyResponseModel(
+            status=schemas.Status.Success,
+            message="Property updated successfully.",
+            data=data,
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A property with the given details already exists.",
+        ) from e
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while updating the property: {str(e)}",
+        ) from e
+
+
+async def delete_property_crud(
+    property_id: str, db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        if not await async_delete_by_id(db, models.PropertyOrm, property_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No property found with ID: {property_id}",
+            )
+        # The cached payments of its mortgages must report the property missing
+        mortgage_ids = (
+            await db.scalars(
+                select(models.MortgageOrm.id).where(
+                    models.MortgageOrm.property_id == property_id
+                )
+            )
+        ).all()
+        await db.commit()
+        await cache.async_invalidate(
+            cache.cache_key("property", property_id),
+            *(cache.cache_key("mortgage_payment", id_) for id_ in mortgage_ids),
+        )
+        return schemas.PropertyDeleteModel(
+            id=property_id,
+            status=schemas.Status.Success,
+            message="Property deleted successfully.",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while deleting the property.",
+        ) from e
+
+
+async def get_properties_crud(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: str = "",
+):
+    statement = keyset_page(
+        select(models.PropertyOrm), models.PropertyOrm, limit, cursor
+    )
+    properties, next_cursor = split_page((await db.scalars(statement)).all(), limit)
+    return schemas.PropertyListResponseModel(
+        status=schemas.Status.Success,
+        message="Properties retrieved successfully.",
+        data=[
+            schemas.PropertyModel.model_validate(property_) for property_ in properties
+        ],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,100 @@
+from typing import AsyncIterator, Callable, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import app.schemas as schemas
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+# A chunk is a list of (row number, validated row) pairs
+Chunk = List[Tuple[int, BaseModel]]
+
+
+def row_error(row_number: int, message: str) -> schemas.BulkRowErrorModel:
+    """Build the error of a row rejected after validation."""
+    return schemas.BulkRowErrorModel(
+        row=row_number, errors=[{"type": "database", "msg": message}]
+    )
+
+
+def insert_chunk(
+    db: Session,
+    insert_rows: Callable[[Session, List[dict]], None],
+    rows: List[Tuple[int, dict]],
+) -> List[schemas.BulkRowErrorModel]:
+    """
+    Insert and commit one chunk of rows, falling back to one row at a time on error.
+
+    The fallback finds the rows the database rejected, so the rest of the chunk is
+    still inserted.
+    """
+    dialect = db.get_bind().dialect
+    try:
+        insert_rows(db, [row for _, row in rows])
+        db.commit()
+        return []
+    # COPY runs on the raw driver cursor, so its errors are not wrapped by SQLAlchemy
+    except (SQLAlchemyError, dialect.dbapi.Error):
+        db.rollback()
+
+    errors = []
+    for row_number, row in rows:
+        try:
+            insert_rows(db, [row])
+            db.commit()
+        except (SQLAlchemyError, dialect.dbapi.Error) as e:
+            db.rollback()
+            message = str(getattr(e, "orig", None) or e).splitlines()[0]
+            errors.append(row_error(row_number, message))
+    return errors
+
+
+async def bulk_create(
+    rows: AsyncIterator,
+    schema: Type[BaseModel],
+    create_chunk: Callable[[Chunk], List[schemas.BulkRowErrorModel]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[int, int, List[schemas.BulkRowErrorModel]]:
+    """
+    Validate rows against a schema and hand them to ``create_chunk`` in chunks.
+
+    ``create_chunk`` runs in the threadpool, so it may use the sync session, and
+    returns the errors of the rows it could not create.
+
+    :return: The number of rows created, the number of rows read and the errors.
+    """
+    created = 0
+    row_count = 0
+    errors = []
+    chunk = []
+
+    async def flush():
+        nonlocal created, chunk
+        if chunk:
+            chunk_errors = await run_in_threadpool(create_chunk, chunk)
+            created += len(chunk) - len(chunk_errors)
+            errors.extend(chunk_errors)
+            chunk = []
+
+    async for row in rows:
+        try:
+            chunk.append((row_count, schema.model_validate(row)))
+        except ValidationError as e:
+            errors.append(
+                schemas.BulkRowErrorModel(
+                    row=row_count,
+                    errors=e.errors(
+                        include_url=False, include_context=False, include_input=False
+                    ),
+                )
+            )
+        row_count += 1
+        if len(chunk) == chunk_size:
+            await flush()
+    await flush()
+
+    return created, row_count, sorted(errors, key=lambda error: error.row)
@@ -1,9 +1,24 @@
+import uuid
+from typing import AsyncIterator, List, Optional
+
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+import app.cache as cache
 import app.models as models
 import app.schemas as schemas
+from app.crud.bulk import (
+    DEFAULT_CHUNK_SIZE,
+    Chunk,
+    bulk_create,
+    insert_chunk,
+    row_error,
+)
+from app.crud.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.crud.returning import delete_by_id, update_returning
+from app.custom.money import calculate_mortgage_amount
 from app.database import get_db
 
 
@@ -27,10 +42,9 @@ def create_mortgage_crud(
             )
 
         # Get Purchase Price of the property and calculate mortgage amount (LTV * Purchase Price)
-        purchase_price = float(property_data.purchase_price)  # Convert to float
-        loan_to_value = float(new_mortgage.loan_to_value)  # Ensure this is float
-        mortgage_amount = (purchase_price * loan_to_value) / 100
-        new_mortgage.mortgage_amount = mortgage_amount
+        new_mortgage.mortgage_amount = calculate_mortgage_amount(
+            property_data.purchase_price, new_mortgage.loan_to_value
+        )
 
         db.add(new_mortgage)
         db.commit()
@@ -53,6 +67,11 @@ def create_mortgage_crud(
 
 
 def get_mortgage_crud(mortgage_id: str, db: Session = Depends(get_db)):
+    key = cache.cache_key("mortgage", mortgage_id)
+    cached_response = cache.get(key)
+    if cached_response is not None:
+        return schemas.MortgageResponseModel.model_validate(cached_response)
+
     mortgage_data = (
         db.query(models.MortgageOrm)
         .filter(models.MortgageOrm.id == mortgage_id)
@@ -66,11 +85,13 @@ def get_mortgage_crud(mortgage_id: str, db: Session = Depends(get_db)):
         )
 
     try:
-        return schemas.MortgageResponseModel(
+        response = schemas.MortgageResponseModel(
             status=schemas.Status.Success,
             message="Mortgage retrieved successfully.",
             data=schemas.MortgageModel.model_validate(mortgage_data),
         )
+        cache.put(key, response.model_dump(mode="json"))
+        return response
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -81,35 +102,42 @@ def get_mortgage_crud(mortgage_id: str, db: Session = Depends(get_db)):
 def update_mortgage_crud(
     mortgage_id: str, payload: schemas.MortgageUpdateModel, db: Session
 ):
-    mortgage_query = db.query(models.MortgageOrm).filter(
-        models.MortgageOrm.id == mortgage_id
-    )
-    db_mortgage = mortgage_query.first()
-
-    if not db_mortgage:
+    # Prepare update data from the payload, only including fields that are set
+    update_data = payload.model_dump(exclude_unset=True)
+    if not update_data:
+        exists = db.scalar(
+            select(models.MortgageOrm.id).where(models.MortgageOrm.id == mortgage_id)
+        )
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid fields provided for update.",
         )
 
     try:
-        # Prepare update data from the payload, only including fields that are set
-        update_data = payload.model_dump(exclude_unset=True)
-        if update_data:
-            mortgage_query.update(update_data, synchronize_session="evaluate")
-            db.commit()
-            db.refresh(db_mortgage)
-
-            # Convert the updated ORM model back to a Pydantic model
-            return schemas.MortgageResponseModel(
-                status=schemas.Status.Success,
-                message="Mortgage updated successfully.",
-                data=schemas.MortgageModel.model_validate(db_mortgage),
-            )
-        else:
+        # One statement checks the mortgage exists and returns its new state
+        db_mortgage = update_returning(db, models.MortgageOrm, mortgage_id, update_data)
+        if not db_mortgage:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No valid fields provided for update.",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
             )
+        # Convert the updated ORM model to a Pydantic model before the commit
+        # expires it
+        data = schemas.MortgageModel.model_validate(db_mortgage)
+        db.commit()
+        cache.invalidate(
+            cache.cache_key("mortgage", mortgage_id),
+            cache.cache_key("mortgage_payment", mortgage_id),
+        )
+
+        return schemas.MortgageResponseModel(
+            status=schemas.Status.Success,
+            message="Mortgage updated successfully.",
+            data=data,
+        )
     except IntegrityError as e:
         db.rollback()
         raise HTTPException(
@@ -126,22 +154,23 @@ def update_mortgage_crud(
 
 def delete_mortgage_crud(mortgage_id: str, db: Session = Depends(get_db)):
     try:
-        mortgage_query = db.query(models.MortgageOrm).filter(
-            models.MortgageOrm.id == mortgage_id
-        )
-        mortgage_ = mortgage_query.first()
-        if not mortgage_:
+        if not delete_by_id(db, models.MortgageOrm, mortgage_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No mortgage found with ID: {mortgage_id}",
             )
-        mortgage_query.delete(synchronize_session=False)
         db.commit()
+        cache.invalidate(
+            cache.cache_key("mortgage", mortgage_id),
+            cache.cache_key("mortgage_payment", mortgage_id),
+        )
         return schemas.MortgageDeleteModel(
             id=mortgage_id,
             status=schemas.Status.Success,
             message="Mortgage deleted successfully.",
         )
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -151,13 +180,75 @@ def delete_mortgage_crud(mortgage_id: str, db: Session = Depends(get_db)):
 
 
 def get_mortgages_crud(
-    db: Session = Depends(get_db), limit: int = 10, page: int = 1, search: str = ""
+    db: Session = Depends(get_db),
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: str = "",
 ):
-    skip = (page - 1) * limit
-
-    mortgages = db.query(models.MortgageOrm).limit(limit).offset(skip).all()
+    mortgages, next_cursor = paginate(
+        db.query(models.MortgageOrm), models.MortgageOrm, limit, cursor
+    )
     return schemas.MortgageListResponseModel(
         status=schemas.Status.Success,
         message="Mortgages retrieved successfully.",
         data=[schemas.MortgageModel.model_validate(mortgage) for mortgage in mortgages],
+        next_cursor=next_cursor,
+    )
+
+
+def _insert_mortgages(db: Session, rows: List[dict]):
+    """Insert rows with a single executemany."""
+    db.execute(insert(models.MortgageOrm), rows)
+
+
+async def bulk_create_mortgage_crud(
+    rows: AsyncIterator, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    """
+    Validate and insert mortgages in chunks, reporting the rows that failed.
+
+    The purchase prices of all properties referenced by a chunk are loaded with one
+    query, instead of one query per mortgage.
+    """
+
+    def create_chunk(chunk: Chunk):
+        property_ids = {mortgage.property_id for _, mortgage in chunk}
+        purchase_prices = dict(
+            db.execute(
+                select(models.PropertyOrm.id, models.PropertyOrm.purchase_price).where(
+                    models.PropertyOrm.id.in_(property_ids)
+                )
+            ).all()
+        )
+
+        values = []
+        errors = []
+        for row_number, mortgage in chunk:
+            purchase_price = purchase_prices.get(mortgage.property_id)
+            if purchase_price is None:
+                errors.append(row_error(row_number, "Property not found."))
+                continue
+            mortgage_amount = calculate_mortgage_amount(
+                purchase_price, mortgage.loan_to_value
+            )
+            values.append(
+                (
+                    row_number,
+                    {
+                        "id": uuid.uuid4(),
+                        **mortgage.model_dump(),
+                        "mortgage_amount": mortgage_amount,
+                    },
+                )
+            )
+        return errors + insert_chunk(db, _insert_mortgages, values)
+
+    inserted, row_count, errors = await bulk_create(
+        rows, schemas.MortgageCreateModel, create_chunk, chunk_size
+    )
+    return schemas.BulkCreateResponseModel(
+        status=schemas.Status.Success if not errors else schemas.Status.Error,
+        message=f"{inserted} of {row_count} mortgages created.",
+        inserted=inserted,
+        errors=errors,
     )
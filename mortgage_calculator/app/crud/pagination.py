@@ -0,0 +1,87 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import TIMESTAMP, String, literal, tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.types import TypeDecorator
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, id_) -> str:
+    """Build an opaque cursor pointing just after the given row."""
+    payload = json.dumps([created_at.isoformat(sep=" "), str(id_)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+class CursorTimestamp(TypeDecorator):
+    """
+    The createdAt of a cursor, bound as a timestamp except on SQLite.
+
+    SQLite stores timestamps as text, and CURRENT_TIMESTAMP writes them without
+    microseconds ('YYYY-MM-DD HH:MM:SS'), which SQLAlchemy's own SQLite timestamps
+    always add. The cursor is bound in the stored format there, so rows created in
+    the same second as the cursor row still compare after it.
+    """
+
+    impl = TIMESTAMP(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(self.impl)
+
+    def process_bind_param(self, value: Optional[datetime], dialect):
+        if value is not None and dialect.name == "sqlite":
+            return value.isoformat(sep=" ")
+        return value
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Return the (createdAt, id) pair stored in a cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id_ = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(id_)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        ) from e
+
+
+def keyset_page(statement, model, limit: int, cursor: Optional[str] = None):
+    """
+    Limit a query or select to the page after the cursor, ordered by (createdAt, id).
+
+    Each page seeks straight to the cursor through the ordering columns, so its cost
+    does not grow with how deep into the table it is. One extra row is fetched to
+    find out whether there is a next page; pass the rows to ``split_page``.
+    """
+    if cursor:
+        created_at, id_ = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(model.createdAt, model.id)
+            > tuple_(literal(created_at, CursorTimestamp), literal(id_, model.id.type))
+        )
+    return statement.order_by(model.createdAt, model.id).limit(limit + 1)
+
+
+def split_page(rows: List, limit: int) -> Tuple[List, Optional[str]]:
+    """Return the rows of a page fetched by ``keyset_page`` and the next page's cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].createdAt, rows[-1].id)
+
+
+def paginate(
+    query: Query, model, limit: int, cursor: Optional[str] = None
+) -> Tuple[List, Optional[str]]:
+    """Return one page of a query ordered by (createdAt, id) and the next page's cursor."""
+    return split_page(keyset_page(query, model, limit, cursor).all(), limit)
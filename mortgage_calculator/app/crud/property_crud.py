@@ -1,9 +1,19 @@
+import csv
+import io
+import uuid
+from typing import AsyncIterator, List, Optional
+
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+import app.cache as cache
 import app.models as models
 import app.schemas as schemas
+from app.crud.bulk import DEFAULT_CHUNK_SIZE, Chunk, bulk_create, insert_chunk
+from app.crud.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.crud.returning import delete_by_id, update_returning
 from app.database import get_db
 
 
@@ -38,6 +48,11 @@ def create_property_crud(
 
 
 def get_property_crud(property_id: str, db: Session = Depends(get_db)):
+    key = cache.cache_key("property", property_id)
+    cached_response = cache.get(key)
+    if cached_response is not None:
+        return schemas.PropertyResponseModel.model_validate(cached_response)
+
     property_data = (
         db.query(models.PropertyOrm)
         .filter(models.PropertyOrm.id == property_id)
@@ -51,11 +66,13 @@ def get_property_crud(property_id: str, db: Session = Depends(get_db)):
         )
 
     try:
-        return schemas.PropertyResponseModel(
+        response = schemas.PropertyResponseModel(
             status=schemas.Status.Success,
             message="Property retrieved successfully.",
             data=schemas.PropertyModel.model_validate(property_data),
         )
+        cache.put(key, response.model_dump(mode="json"))
+        return response
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,35 +83,39 @@ def get_property_crud(property_id: str, db: Session = Depends(get_db)):
 def update_property_crud(
     property_id: str, payload: schemas.PropertyUpdateModel, db: Session
 ):
-    property_query = db.query(models.PropertyOrm).filter(
-        models.PropertyOrm.id == property_id
-    )
-    db_property = property_query.first()
-
-    if not db_property:
+    # Prepare update data from the payload, only including fields that are set
+    update_data = payload.model_dump(exclude_unset=True)
+    if not update_data:
+        exists = db.scalar(
+            select(models.PropertyOrm.id).where(models.PropertyOrm.id == property_id)
+        )
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid fields provided for update.",
         )
 
     try:
-        # Prepare update data from the payload, only including fields that are set
-        update_data = payload.model_dump(exclude_unset=True)
-        if update_data:
-            property_query.update(update_data, synchronize_session="evaluate")
-            db.commit()
-            db.refresh(db_property)
-
-            # Convert the updated ORM model back to a Pydantic model
-            return schemas.PropertyResponseModel(
-                status=schemas.Status.Success,
-                message="Property updated successfully.",
-                data=schemas.PropertyModel.model_validate(db_property),
-            )
-        else:
+        # One statement checks the property exists and returns its new state
+        db_property = update_returning(db, models.PropertyOrm, property_id, update_data)
+        if not db_property:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No valid fields provided for update.",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
             )
+        # Convert the updated ORM model to a Pydantic model before the commit
+        # expires it
+        data = schemas.PropertyModel.model_validate(db_property)
+        db.commit()
+        cache.invalidate(cache.cache_key("property", property_id))
+
+        return schemas.PropertyResponseModel(
+            status=schemas.Status.Success,
+            message="Property updated successfully.",
+            data=data,
+        )
     except IntegrityError as e:
         db.rollback()
         raise HTTPException(
@@ -111,22 +132,29 @@ def update_property_crud(
 
 def delete_property_crud(property_id: str, db: Session = Depends(get_db)):
     try:
-        property_query = db.query(models.PropertyOrm).filter(
-            models.PropertyOrm.id == property_id
-        )
-        property_ = property_query.first()
-        if not property_:
+        if not delete_by_id(db, models.PropertyOrm, property_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No property found with ID: {property_id}",
             )
-        property_query.delete(synchronize_session=False)
+        # The cached payments of its mortgages must report the property missing
+        mortgage_ids = db.scalars(
+            select(models.MortgageOrm.id).where(
+                models.MortgageOrm.property_id == property_id
+            )
+        ).all()
         db.commit()
+        cache.invalidate(
+            cache.cache_key("property", property_id),
+            *(cache.cache_key("mortgage_payment", id_) for id_ in mortgage_ids),
+        )
         return schemas.PropertyDeleteModel(
             id=property_id,
             status=schemas.Status.Success,
             message="Property deleted successfully.",
         )
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -136,15 +164,77 @@ def delete_property_crud(property_id: str, db: Session = Depends(get_db)):
 
 
 def get_properties_crud(
-    db: Session = Depends(get_db), limit: int = 10, page: int = 1, search: str = ""
+    db: Session = Depends(get_db),
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    search: str = "",
 ):
-    skip = (page - 1) * limit
-
-    properties = db.query(models.PropertyOrm).limit(limit).offset(skip).all()
+    properties, next_cursor = paginate(
+        db.query(models.PropertyOrm), models.PropertyOrm, limit, cursor
+    )
     return schemas.PropertyListResponseModel(
         status=schemas.Status.Success,
         message="Properties retrieved successfully.",
         data=[
             schemas.PropertyModel.model_validate(property_) for property_ in properties
         ],
+        next_cursor=next_cursor,
+    )
+
+
+BULK_COLUMNS = tuple(schemas.PropertyCreateModel.model_fields)
+
+
+def _copy_properties(db: Session, rows: List[dict]):
+    """Load rows with Postgres COPY, the fastest way to insert many rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row["id"], *(row[column] for column in BULK_COLUMNS)])
+    buffer.seek(0)
+
+    columns = ", ".join(("id", *BULK_COLUMNS))
+    cursor = db.connection().connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {models.PropertyOrm.__tablename__} ({columns}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_properties(db: Session, rows: List[dict]):
+    """Insert rows with COPY on Postgres and a single executemany elsewhere."""
+    if db.get_bind().dialect.driver == "psycopg2":
+        _copy_properties(db, rows)
+    else:
+        db.execute(insert(models.PropertyOrm), rows)
+
+
+async def bulk_create_property_crud(
+    rows: AsyncIterator, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE
+):
+    """
+    Validate and insert rows in chunks, reporting the rows that failed.
+
+    Each chunk is committed on its own, so valid rows are kept when others fail.
+    """
+
+    def create_chunk(chunk: Chunk):
+        values = [
+            (row_number, {"id": uuid.uuid4(), **property_.model_dump()})
+            for row_number, property_ in chunk
+        ]
+        return insert_chunk(db, _insert_properties, values)
+
+    inserted, row_count, errors = await bulk_create(
+        rows, schemas.PropertyCreateModel, create_chunk, chunk_size
+    )
+    return schemas.BulkCreateResponseModel(
+        status=schemas.Status.Success if not errors else schemas.Status.Error,
+        message=f"{inserted} of {row_count} properties created.",
+        inserted=inserted,
+        errors=errors,
     )
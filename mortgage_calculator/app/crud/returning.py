@@ -0,0 +1,84 @@
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def _supports_update_returning(db) -> bool:
+    # SQLite only has RETURNING from 3.35, Postgres always
+    return db.get_bind().dialect.update_returning
+
+
+def _update_statement(model, id_, values: dict):
+    # Bulk UPDATE statements skip the mapper's version counter, so bump it here
+    return (
+        update(model).where(model.id == id_).values(**values, version=model.version + 1)
+    )
+
+
+def _select_updated(model, id_):
+    # Overwrite any copy of the row already loaded by the session
+    return (
+        select(model).where(model.id == id_).execution_options(populate_existing=True)
+    )
+
+
+def update_returning(db: Session, model, id_, values: dict) -> Optional[object]:
+    """
+    Update the row with the given id and return it as updated, or None if missing.
+
+    A single UPDATE ... RETURNING both checks that the row exists and fetches its
+    new state, including the columns the database sets such as updatedAt, and
+    increments the row's version. Databases
+    without RETURNING update the row and select it again.
+
+    :param db: The session, which is not committed.
+    :param model: The ORM model of the row.
+    :param id_: The primary key of the row.
+    :param values: The columns to update and their new values.
+    :return: The updated ORM object, or None if no row has that id.
+    """
+    statement = _update_statement(model, id_, values)
+    if _supports_update_returning(db):
+        return db.scalar(statement.returning(model))
+    if db.execute(statement).rowcount == 0:
+        return None
+    return db.scalar(_select_updated(model, id_))
+
+
+async def async_update_returning(
+    db: AsyncSession, model, id_, values: dict
+) -> Optional[object]:
+    """Update the row with the given id and return it, like ``update_returning``."""
+    statement = _update_statement(model, id_, values)
+    if _supports_update_returning(db):
+        return await db.scalar(statement.returning(model))
+    if (await db.execute(statement)).rowcount == 0:
+        return None
+    return await db.scalar(_select_updated(model, id_))
+
+
+def _delete_statement(model, id_):
+    return (
+        delete(model)
+        .where(model.id == id_)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_by_id(db: Session, model, id_) -> bool:
+    """
+    Delete the row with the given id in one statement.
+
+    The deleted row count tells whether it existed, which every database reports,
+    so no SELECT is needed beforehand.
+
+    :return: Whether a row was deleted.
+    """
+    return db.execute(_delete_statement(model, id_)).rowcount > 0
+
+
+async def async_delete_by_id(db: AsyncSession, model, id_) -> bool:
+    """Delete the row with the given id, like ``delete_by_id``."""
+    return (await db.execute(_delete_statement(model, id_))).rowcount > 0
@@ -1,3 +1,74 @@
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from app.models import MortgageType
+
+
+def round_to_pennies(values: np.ndarray) -> np.ndarray:
+    """
+    Round an array to 2 decimal places exactly like the built-in ``round``.
+
+    ``np.round`` scales by 100 before rounding, which can land an amount just below
+    a half penny on an exact half and round it the other way. Those rare values are
+    re-rounded one by one.
+
+    :param values: The amounts to round.
+    :return: The amounts rounded to 2 decimal places.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_half] = [round(value, 2) for value in values[near_half].tolist()]
+    return rounded
+
+
+def calculate_monthly_payments(
+    loan_amounts, annual_interest_rates, loan_terms_years, mortgage_types
+) -> np.ndarray:
+    """
+    Calculate the monthly payments for a batch of mortgages in one vectorized pass.
+
+    Interest-only rows ignore their loan term, so it may be ``None``. Repayment rows
+    with a zero interest rate are split evenly across the term without rounding,
+    matching the scalar functions.
+
+    :param loan_amounts: The total loan amounts (principal).
+    :param annual_interest_rates: The annual interest rates as percentages.
+    :param loan_terms_years: The terms of the loans in years.
+    :param mortgage_types: The mortgage types (``MortgageType`` members or values).
+    :return: Array of monthly payments, one per mortgage.
+    """
+    loan_amounts = np.asarray(loan_amounts, dtype=np.float64)
+    monthly_interest_rates = (
+        np.asarray(annual_interest_rates, dtype=np.float64) / 100 / 12
+    )
+    total_payments = np.asarray(loan_terms_years, dtype=np.float64) * 12
+    mortgage_types = np.asarray(mortgage_types, dtype=object)
+
+    interest_only = mortgage_types == MortgageType.interest_only.value
+    repayment = mortgage_types == MortgageType.repayment.value
+    if not np.all(interest_only | repayment):
+        raise ValueError("Unsupported mortgage type.")
+
+    payments = np.empty(loan_amounts.shape, dtype=np.float64)
+    payments[interest_only] = round_to_pennies(
+        loan_amounts[interest_only] * monthly_interest_rates[interest_only]
+    )
+
+    # A zero rate would divide by zero, so those loans are repaid in equal parts
+    zero_rate = repayment & (monthly_interest_rates == 0)
+    payments[zero_rate] = loan_amounts[zero_rate] / total_payments[zero_rate]
+
+    amortising = repayment & ~zero_rate
+    rate = monthly_interest_rates[amortising]
+    growth = (1 + rate) ** total_payments[amortising]
+    payments[amortising] = round_to_pennies(
+        loan_amounts[amortising] * (rate * growth) / (growth - 1)
+    )
+    return payments
+
+
 def calculate_interest_only_payment(
     loan_amount: float, annual_interest_rate: float
 ) -> float:
@@ -8,8 +79,11 @@ def calculate_interest_only_payment(
     :param annual_interest_rate: The annual interest rate as a percentage.
     :return: Monthly interest payment.
     """
-    monthly_interest_rate = annual_interest_rate / 100 / 12
-    return round(loan_amount * monthly_interest_rate, 2)
+    return float(
+        calculate_monthly_payments(
+            [loan_amount], [annual_interest_rate], [None], [MortgageType.interest_only]
+        )[0]
+    )
 
 
 def calculate_repayment_mortgage_payment(
@@ -23,20 +97,181 @@ def calculate_repayment_mortgage_payment(
     :param loan_term_years: The term of the loan in years.
     :return: Monthly payment for the full term of the loan.
     """
-    monthly_interest_rate = annual_interest_rate / 100 / 12
-    total_payments = loan_term_years * 12
-    if monthly_interest_rate == 0:  # This avoids division by zero if interest rate is 0
-        return loan_amount / total_payments
-    monthly_payment = (
-        loan_amount
-        * (monthly_interest_rate * (1 + monthly_interest_rate) ** total_payments)
-        / ((1 + monthly_interest_rate) ** total_payments - 1)
+    return float(
+        calculate_monthly_payments(
+            [loan_amount],
+            [annual_interest_rate],
+            [loan_term_years],
+            [MortgageType.repayment],
+        )[0]
     )
-    return round(monthly_payment, 2)
 
 
-def calculate_roi():
-    pass
+def calculate_amortization_schedule(
+    loan_amount: float,
+    annual_interest_rate: float,
+    loan_term_years: int,
+    mortgage_type: MortgageType = MortgageType.repayment,
+    monthly_payment: Optional[float] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Calculate the month-by-month amortization schedule of a mortgage.
+
+    Every month is paid at the rounded monthly payment, except the last one, which
+    clears whatever balance is left. Interest-only mortgages repay the whole loan
+    amount with the last payment. A term shorter than one month has no payments, so
+    its schedule is empty.
+
+    :param loan_amount: The total loan amount (principal).
+    :param annual_interest_rate: The annual interest rate as a percentage.
+    :param loan_term_years: The term of the loan in years.
+    :param mortgage_type: The type of mortgage.
+    :param monthly_payment: The payment to schedule, calculated from the other
+        arguments if not given.
+    :return: Arrays of month, payment, interest, principal and balance, one row per month.
+    """
+    loan_amount = float(loan_amount)
+    monthly_interest_rate = float(annual_interest_rate) / 100 / 12
+    total_payments = int(loan_term_years * 12)
+    if total_payments < 1:
+        empty = np.array([], dtype=np.float64)
+        return {
+            "month": np.array([], dtype=np.int64),
+            "payment": empty,
+            "interest": empty,
+            "principal": empty,
+            "balance": empty,
+        }
+    if monthly_payment is None:
+        monthly_payment = calculate_monthly_payments(
+            [loan_amount], [annual_interest_rate], [loan_term_years], [mortgage_type]
+        )[0]
+    months = np.arange(1, total_payments + 1)
+
+    if mortgage_type == MortgageType.interest_only.value:
+        balance = np.full(total_payments, loan_amount)
+    elif monthly_interest_rate == 0:
+        balance = loan_amount - monthly_payment * months
+    else:
+        # Closed-form balance after k payments: P(1+r)^k - M((1+r)^k - 1) / r
+        growth = (1 + monthly_interest_rate) ** months
+        balance = (
+            loan_amount * growth
+            - monthly_payment * (growth - 1) / monthly_interest_rate
+        )
+
+    opening_balance = np.concatenate(([loan_amount], balance[:-1]))
+    interest = opening_balance * monthly_interest_rate
+    principal = opening_balance - balance
+    principal[-1] = opening_balance[-1]
+    balance[-1] = 0
+
+    return {
+        "month": months,
+        "payment": round_to_pennies(interest + principal),
+        "interest": round_to_pennies(interest),
+        "principal": round_to_pennies(principal),
+        "balance": round_to_pennies(balance),
+    }
+
+
+def iter_amortization_schedules(
+    mortgages: Iterable, calculate_payments: Callable = calculate_monthly_payments
+) -> Iterator[dict]:
+    """
+    Yield the amortization schedule rows of many mortgages, one mortgage at a time.
+
+    Only one schedule is held in memory at once, so exports of any size run in
+    constant memory.
+
+    :param mortgages: Objects with id, mortgage_amount, interest_rate, loan_term and
+        mortgage_type attributes, such as ``MortgageOrm`` rows.
+    :param calculate_payments: The batch payment function scheduling each mortgage,
+        e.g. ``money.calculate_monthly_payments``.
+    :return: Iterator of schedule rows keyed by mortgage_id and the schedule columns.
+    """
+    for mortgage in mortgages:
+        [monthly_payment] = calculate_payments(
+            [mortgage.mortgage_amount],
+            [mortgage.interest_rate],
+            [mortgage.loan_term],
+            [mortgage.mortgage_type],
+        ).tolist()
+        schedule = calculate_amortization_schedule(
+            mortgage.mortgage_amount,
+            mortgage.interest_rate,
+            mortgage.loan_term,
+            mortgage.mortgage_type,
+            monthly_payment,
+        )
+        mortgage_id = str(mortgage.id)
+        columns = list(schedule)
+        for values in zip(*(schedule[column].tolist() for column in columns)):
+            yield {"mortgage_id": mortgage_id, **dict(zip(columns, values))}
+
+
+def calculate_roi(
+    purchase_prices,
+    rental_incomes,
+    renovation_costs,
+    admin_costs,
+    management_fees,
+    mortgage_debts,
+    monthly_mortgage_payments,
+) -> dict[str, np.ndarray]:
+    """
+    Calculate the investment metrics of a batch of properties in one vectorized pass.
+
+    Rental income and management fees are monthly; renovation and admin costs are
+    one-off. The total cost is the purchase price plus the one-off costs, and the cash
+    invested is the part of it not borrowed. Metrics that would divide by zero, or
+    by a negative cash investment, are NaN.
+
+    - gross_yield: annual rent / purchase price
+    - net_yield: annual rent less management fees / total cost
+    - roi: annual cashflow / total cost
+    - cash_on_cash_return: annual cashflow / cash invested
+
+    :param purchase_prices: The purchase prices of the properties.
+    :param rental_incomes: The monthly rental incomes.
+    :param renovation_costs: The one-off renovation costs.
+    :param admin_costs: The one-off admin costs.
+    :param management_fees: The monthly management fees.
+    :param mortgage_debts: The total mortgage amount of each property.
+    :param monthly_mortgage_payments: The total monthly mortgage payment of each property.
+    :return: Arrays of total_cost, cash_invested, monthly_cashflow, annual_cashflow
+        and the percentages gross_yield, net_yield, roi and cash_on_cash_return.
+    """
+    purchase_prices = np.asarray(purchase_prices, dtype=np.float64)
+    rental_incomes = np.asarray(rental_incomes, dtype=np.float64)
+    management_fees = np.asarray(management_fees, dtype=np.float64)
+
+    total_cost = (
+        purchase_prices
+        + np.asarray(renovation_costs, dtype=np.float64)
+        + np.asarray(admin_costs, dtype=np.float64)
+    )
+    cash_invested = total_cost - np.asarray(mortgage_debts, dtype=np.float64)
+    net_operating_income = (rental_incomes - management_fees) * 12
+    monthly_cashflow = (
+        rental_incomes
+        - management_fees
+        - np.asarray(monthly_mortgage_payments, dtype=np.float64)
+    )
+    annual_cashflow = monthly_cashflow * 12
 
+    def percentage(numerators, denominators):
+        result = np.full(numerators.shape, np.nan)
+        np.divide(numerators, denominators, out=result, where=denominators > 0)
+        return result * 100
 
-# TODO: Implement the calculate_roi function
+    return {
+        "total_cost": total_cost,
+        "cash_invested": cash_invested,
+        "monthly_cashflow": monthly_cashflow,
+        "annual_cashflow": annual_cashflow,
+        "gross_yield": percentage(rental_incomes * 12, purchase_prices),
+        "net_yield": percentage(net_operating_income, total_cost),
+        "roi": percentage(annual_cashflow, total_cost),
+        "cash_on_cash_return": percentage(annual_cashflow, cash_invested),
+    }
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps, which CURRENT_TIMESTAMP stores in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def version_headers(
+    version: int, created_at: datetime, updated_at: Optional[datetime]
+) -> Dict[str, str]:
+    """
+    Build the ETag and Last-Modified headers of a row from its version and
+    timestamps.
+
+    The ETag is the row's version rather than updatedAt, which SQLite stores to the
+    second: two updates within a second would otherwise share an ETag.
+    """
+    modified_at = _as_utc(updated_at or created_at)
+    return {
+        "ETag": f'"{version}"',
+        "Last-Modified": format_datetime(
+            modified_at.replace(microsecond=0), usegmt=True
+        ),
+    }
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    Whether the client's copy is current, following RFC 9110.
+
+    If-Modified-Since is only used when the request has no If-None-Match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return headers["ETag"] in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    last_modified = parsedate_to_datetime(headers["Last-Modified"])
+    return last_modified <= _as_utc(modified_since)
+
+
+def _version_statement(model, id_):
+    return select(model.version, model.createdAt, model.updatedAt).where(
+        model.id == id_
+    )
+
+
+def _not_modified(request: Request, row) -> Optional[Response]:
+    if row is None:
+        return None
+    headers = version_headers(*row)
+    if not is_not_modified(request, headers):
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def _is_uuid(id_) -> bool:
+    try:
+        uuid.UUID(str(id_))
+    except ValueError:
+        return False
+    return True
+
+
+def not_modified_response(
+    request: Request, db: Session, model, id_
+) -> Optional[Response]:
+    """
+    An empty 304 when a conditional request's copy of a row is current, else None.
+
+    Only the row's version and timestamps are selected, so a current copy is
+    answered without loading or serializing the row. Missing rows and modified
+    ones return None, to be answered in full.
+    """
+    if not is_conditional(request) or not _is_uuid(id_):
+        return None
+    return _not_modified(request, db.execute(_version_statement(model, id_)).first())
+
+
+async def async_not_modified_response(
+    request: Request, db: AsyncSession, model, id_
+) -> Optional[Response]:
+    """An empty 304 when the client's copy is current, like ``not_modified_response``."""
+    if not is_conditional(request) or not _is_uuid(id_):
+        return None
+    row = (await db.execute(_version_statement(model, id_))).first()
+    return _not_modified(request, row)
+
+
+def conditional_response(request: Request, response: Response, data) -> Response:
+    """
+    Add the version headers of a property or mortgage to its response, and answer
+    with an empty 304 instead when the client's copy is current.
+    """
+    headers = version_headers(data.version, data.createdAt, data.updatedAt)
+    if is_conditional(request) and is_not_modified(request, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return response
@@ -1,40 +1,374 @@
+import math
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from typing import Iterator, List, Optional
+
+import numpy as np
 from fastapi import HTTPException, status
+from sqlalchemy import exists, select
 from sqlalchemy.orm import Session
 
-from app.custom.calculations import (calculate_interest_only_payment,
-                                     calculate_repayment_mortgage_payment)
+import app.cache as cache
+import app.custom.money as money
+import app.schemas as schemas
+from app.custom.calculations import calculate_roi, iter_amortization_schedules
+from app.custom.overpayments import simulate_overpayments
 from app.models import MortgageOrm, PropertyOrm
 from app.schemas import MortgageType
 
 
 def get_mortgage_payment(mortgage_id: str, db: Session):
-    mortgage = db.query(MortgageOrm).filter(MortgageOrm.id == mortgage_id).first()
+    # Payments only change when the mortgage is updated or deleted, which invalidates them
+    key = cache.cache_key("mortgage_payment", mortgage_id)
+    payment = cache.get(key)
+    if payment is not None:
+        return payment
+
+    # Fetch only the columns the calculation needs and check the property in the same query
+    property_exists = (
+        exists()
+        .where(PropertyOrm.id == MortgageOrm.property_id)
+        .label("property_exists")
+    )
+    mortgage = (
+        db.query(
+            MortgageOrm.id,
+            MortgageOrm.mortgage_amount,
+            MortgageOrm.interest_rate,
+            MortgageOrm.loan_term,
+            MortgageOrm.mortgage_type,
+            property_exists,
+        )
+        .filter(MortgageOrm.id == mortgage_id)
+        .first()
+    )
     if not mortgage:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
         )
 
-    property = (
-        db.query(PropertyOrm).filter(PropertyOrm.id == mortgage.property_id).first()
-    )
-    if not property:
+    if not mortgage.property_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Associated property not found.",
         )
 
-    if mortgage.mortgage_type == MortgageType.interest_only.value:
-        monthly_payment = calculate_interest_only_payment(
-            mortgage.mortgage_amount, mortgage.interest_rate
+    if mortgage.mortgage_type not in (
+        MortgageType.interest_only.value,
+        MortgageType.repayment.value,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported mortgage type."
         )
-    elif mortgage.mortgage_type == MortgageType.repayment.value:
-        # Assuming a fixed loan term, e.g., 30 years. This could also be dynamically fetched or adjusted.
-        monthly_payment = calculate_repayment_mortgage_payment(
-            mortgage.mortgage_amount, mortgage.interest_rate, mortgage.loan_term
+    # Interest-only payments ignore the loan term
+    [monthly_payment] = money.calculate_monthly_payments(
+        [mortgage.mortgage_amount],
+        [mortgage.interest_rate],
+        [mortgage.loan_term],
+        [mortgage.mortgage_type],
+    ).tolist()
+
+    payment = {
+        "mortgage_id": str(mortgage.id),
+        "monthly_payment": float(monthly_payment),
+    }
+    cache.put(key, payment)
+    return payment
+
+
+def get_mortgage_payments(payload: schemas.MortgagePaymentsRequestModel, db: Session):
+    columns = (
+        MortgageOrm.id,
+        MortgageOrm.mortgage_amount,
+        MortgageOrm.interest_rate,
+        MortgageOrm.loan_term,
+        MortgageOrm.mortgage_type,
+        PropertyOrm.id.label("property_id"),
+    )
+
+    if payload.property_id is not None:
+        # Select from the property so an existing property without mortgages still returns a row
+        rows = (
+            db.query(*columns)
+            .select_from(PropertyOrm)
+            .outerjoin(MortgageOrm, MortgageOrm.property_id == PropertyOrm.id)
+            .filter(PropertyOrm.id == payload.property_id)
+            .all()
         )
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+            )
+        mortgages = [row for row in rows if row.id is not None]
+        errors = []
     else:
+        mortgage_ids = list(dict.fromkeys(payload.mortgage_ids))
+        rows = (
+            db.query(*columns)
+            .outerjoin(PropertyOrm, PropertyOrm.id == MortgageOrm.property_id)
+            .filter(MortgageOrm.id.in_(mortgage_ids))
+            .all()
+        )
+        rows_by_id = {row.id: row for row in rows}
+
+        mortgages = []
+        errors = []
+        for mortgage_id in mortgage_ids:
+            row = rows_by_id.get(mortgage_id)
+            if row is None:
+                detail = "Mortgage not found."
+            elif row.property_id is None:
+                detail = "Associated property not found."
+            else:
+                mortgages.append(row)
+                continue
+            errors.append(
+                schemas.MortgagePaymentErrorModel(
+                    mortgage_id=mortgage_id, detail=detail
+                )
+            )
+
+    monthly_payments = money.calculate_monthly_payments(
+        [mortgage.mortgage_amount for mortgage in mortgages],
+        [mortgage.interest_rate for mortgage in mortgages],
+        [mortgage.loan_term for mortgage in mortgages],
+        [mortgage.mortgage_type for mortgage in mortgages],
+    )
+
+    return schemas.MortgagePaymentsResponseModel(
+        status=schemas.Status.Success,
+        message="Mortgage payments calculated successfully.",
+        data=[
+            schemas.MortgagePaymentModel(
+                mortgage_id=mortgage.id, monthly_payment=monthly_payment
+            )
+            for mortgage, monthly_payment in zip(mortgages, monthly_payments.tolist())
+        ],
+        errors=errors,
+    )
+
+
+def get_mortgage_schedule(mortgage_id: str, db: Session):
+    mortgage = db.query(MortgageOrm).filter(MortgageOrm.id == mortgage_id).first()
+    if not mortgage:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported mortgage type."
+            status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
         )
+    if mortgage.loan_term is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A loan term is required to build the schedule.",
+        )
+    if int(mortgage.loan_term * 12) < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A loan term of at least one month is required to build the schedule.",
+        )
+
+    return iter_amortization_schedules([mortgage], money.calculate_monthly_payments)
 
-    return {"mortgage_id": str(mortgage.id), "monthly_payment": float(monthly_payment)}
+
+def _add_months(start: date, months: int) -> date:
+    """The same day of the month, months later, or the last day of a shorter month."""
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    return date(year, month + 1, min(start.day, monthrange(year, month + 1)[1]))
+
+
+def get_mortgage_overpayments(
+    mortgage_id: str, payload: schemas.OverpaymentRequestModel, db: Session
+):
+    mortgage = (
+        db.query(
+            MortgageOrm.id,
+            MortgageOrm.mortgage_amount,
+            MortgageOrm.interest_rate,
+            MortgageOrm.loan_term,
+            MortgageOrm.mortgage_type,
+            MortgageOrm.createdAt,
+        )
+        .filter(MortgageOrm.id == mortgage_id)
+        .first()
+    )
+    if not mortgage:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+        )
+    if mortgage.mortgage_type != MortgageType.repayment.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Overpayments can only be simulated for repayment mortgages.",
+        )
+    if mortgage.loan_term is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A loan term is required to simulate overpayments.",
+        )
+    if int(mortgage.loan_term * 12) < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A loan term of at least one month is required to simulate overpayments.",
+        )
+
+    lump_sums = defaultdict(float)
+    for lump_sum in payload.lump_sums:
+        lump_sums[lump_sum.month] += lump_sum.amount
+    result = simulate_overpayments(
+        mortgage.mortgage_amount,
+        mortgage.interest_rate,
+        mortgage.loan_term,
+        monthly_overpayment=payload.monthly_overpayment,
+        lump_sums=lump_sums,
+    )
+
+    # The first payment is due a month after the mortgage was taken out
+    start = mortgage.createdAt.date()
+    schedule = result.pop("schedule")
+    return schemas.OverpaymentResponseModel(
+        status=schemas.Status.Success,
+        message="Overpayments simulated successfully.",
+        data=schemas.OverpaymentModel(
+            **result,
+            mortgage_id=mortgage.id,
+            months_saved=result["original_term_months"] - result["term_months"],
+            original_payoff_date=_add_months(start, result["original_term_months"]),
+            payoff_date=_add_months(start, result["term_months"]),
+            schedule=schemas.OverpaymentScheduleModel(
+                **{column: values.tolist() for column, values in schedule.items()}
+            ),
+        ),
+    )
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def iter_export_rows(
+    model, schema, db: Session, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[dict]:
+    """
+    Yield every row of a table as a JSON-ready dict, oldest first.
+
+    Rows are fetched ``batch_size`` at a time through a server-side cursor on
+    Postgres, so exports of any size run in constant memory. The session is
+    closed once the export is done, because it outlives the request handler.
+    """
+    statement = (
+        select(*model.__table__.columns)
+        .order_by(model.createdAt, model.id)
+        .execution_options(yield_per=batch_size)
+    )
+    try:
+        for row in db.execute(statement):
+            yield schema.model_validate(row._mapping).model_dump(mode="json")
+    finally:
+        db.close()
+
+
+def _calculate_properties_roi(db: Session, property_id=None):
+    """Calculate the investment metrics of one property, or of all of them."""
+    # Core selects, since ORM row handling would dominate for thousands of rows
+    properties_query = select(
+        PropertyOrm.id,
+        PropertyOrm.purchase_price,
+        PropertyOrm.rental_income,
+        PropertyOrm.renovation_cost,
+        PropertyOrm.admin_costs,
+        PropertyOrm.management_fees,
+    )
+    mortgages_query = select(
+        MortgageOrm.property_id,
+        MortgageOrm.mortgage_amount,
+        MortgageOrm.interest_rate,
+        MortgageOrm.loan_term,
+        MortgageOrm.mortgage_type,
+    ).where(MortgageOrm.property_id.is_not(None))
+    if property_id is not None:
+        properties_query = properties_query.where(PropertyOrm.id == property_id)
+        mortgages_query = mortgages_query.where(MortgageOrm.property_id == property_id)
+
+    properties = db.execute(properties_query).all()
+    index = {row.id: i for i, row in enumerate(properties)}
+    mortgages = [
+        row for row in db.execute(mortgages_query).all() if row.property_id in index
+    ]
+
+    # Total the debt and monthly payments of each property's mortgages
+    owners = np.fromiter(
+        (index[mortgage.property_id] for mortgage in mortgages),
+        dtype=np.intp,
+        count=len(mortgages),
+    )
+    mortgage_amounts = np.asarray(
+        [mortgage.mortgage_amount for mortgage in mortgages], dtype=np.float64
+    )
+    monthly_payments = money.calculate_monthly_payments(
+        [mortgage.mortgage_amount for mortgage in mortgages],
+        [mortgage.interest_rate for mortgage in mortgages],
+        [mortgage.loan_term for mortgage in mortgages],
+        [mortgage.mortgage_type for mortgage in mortgages],
+    )
+
+    def per_property(values):
+        return np.bincount(owners, weights=values, minlength=len(properties))
+
+    columns = list(zip(*properties)) or [()] * 6
+    metrics = calculate_roi(
+        purchase_prices=columns[1],
+        rental_incomes=columns[2],
+        renovation_costs=columns[3],
+        admin_costs=columns[4],
+        management_fees=columns[5],
+        mortgage_debts=per_property(mortgage_amounts),
+        monthly_mortgage_payments=per_property(monthly_payments),
+    )
+    return [row.id for row in properties], metrics
+
+
+def _roi_models(
+    property_ids, metrics, order: Optional[np.ndarray] = None
+) -> List[schemas.PropertyRoiModel]:
+    if order is None:
+        order = np.arange(len(property_ids))
+    columns = {name: values[order].tolist() for name, values in metrics.items()}
+    return [
+        schemas.PropertyRoiModel(
+            property_id=property_ids[i],
+            # NaN marks a metric that cannot be calculated, e.g. with nothing invested
+            **{
+                name: None if math.isnan(values[position]) else values[position]
+                for name, values in columns.items()
+            },
+        )
+        for position, i in enumerate(order.tolist())
+    ]
+
+
+def get_property_roi(property_id: str, db: Session):
+    property_ids, metrics = _calculate_properties_roi(db, property_id)
+    if not property_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Property not found."
+        )
+
+    return schemas.PropertyRoiResponseModel(
+        status=schemas.Status.Success,
+        message="Property ROI calculated successfully.",
+        data=_roi_models(property_ids, metrics)[0],
+    )
+
+
+def get_portfolio_roi(rank_by: schemas.RoiMetric, limit: int, db: Session):
+    """Rank every property by an investment metric, best first."""
+    property_ids, metrics = _calculate_properties_roi(db)
+
+    # Sort descending, with the properties whose metric is undefined last
+    values = metrics[rank_by.value]
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), kind="stable")[:limit]
+
+    return schemas.PortfolioRoiResponseModel(
+        status=schemas.Status.Success,
+        message="Portfolio ROI calculated successfully.",
+        data=_roi_models(property_ids, metrics, order),
+    )
@@ -0,0 +1,170 @@
+import os
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+import app.custom.calculations as calculations
+from app.models import MortgageType
+
+# How payments and mortgage amounts are calculated: "float" uses numpy floats,
+# "pence" keeps amounts as Decimal and integer pence, and rounds payments exactly
+MONEY_PRECISION = os.getenv("MONEY_PRECISION", "float").lower()
+PENNY = Decimal("0.01")
+# Fractional bits of the fixed-point annuity factors
+FIXED_POINT_BITS = 128
+_HALF = 1 << (FIXED_POINT_BITS - 1)
+# The exact factors are only built for terms up to 50 years and rates of at most
+# 100% with up to 10 decimal places, which keeps their integers a few KB long
+MAX_EXACT_MONTHS = 600
+MAX_EXACT_RATE = 100
+MAX_EXACT_RATE_DENOMINATOR = 10**10
+
+
+def to_decimal(value) -> Decimal:
+    """Convert an amount to Decimal, floats by their shortest repr, e.g. 0.1 to 0.1."""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def to_pence(value) -> int:
+    """Convert an amount to whole pence, rounding half to even."""
+    return int(to_decimal(value).quantize(PENNY, rounding=ROUND_HALF_EVEN) * 100)
+
+
+def from_pence(pence: int) -> Decimal:
+    return Decimal(pence).scaleb(-2)
+
+
+def _divide_rounded(numerator: int, denominator: int) -> int:
+    """Integer division rounding half to even, like the built-in round."""
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+@lru_cache(maxsize=4096)
+def _ratio(value) -> Tuple[int, int]:
+    # Rates and terms repeat across mortgages, so their exact ratios are cached
+    return to_decimal(value).as_integer_ratio()
+
+
+def _is_exact(p: int, q: int, months: int) -> bool:
+    """Whether the exact factor of a monthly rate p/q and a term is cheap to build."""
+    return (
+        0 < 1200 * p <= MAX_EXACT_RATE * q
+        and q <= 1200 * MAX_EXACT_RATE_DENOMINATOR
+        and 1 <= months <= MAX_EXACT_MONTHS
+    )
+
+
+@lru_cache(maxsize=256)
+def _annuity_factor(p: int, q: int, months: int) -> Tuple[int, int, int]:
+    """
+    The factor r(1+r)^n / ((1+r)^n - 1) for r = p/q, exactly and in fixed point.
+
+    Exactly, it is p(q+p)^n / (q((q+p)^n - q^n)), with integers thousands of bits
+    long. The fixed-point factor is the same value scaled by 2^FIXED_POINT_BITS and
+    floored, which payments multiply by instead of dividing those integers.
+    """
+    if not _is_exact(p, q, months):
+        raise ValueError("The rate or term is out of range for an exact payment.")
+    growth = (q + p) ** months
+    numerator = p * growth
+    denominator = q * (growth - q**months)
+    return numerator, denominator, (numerator << FIXED_POINT_BITS) // denominator
+
+
+def monthly_payment_pence(
+    loan_pence: int, annual_interest_rate, loan_term_years, mortgage_type
+) -> int:
+    """
+    Calculate a monthly payment in pence with integer arithmetic only.
+
+    The payment is the exact rational value of the annuity formula rounded half to
+    even, so it never depends on float rounding. A fixed-point factor decides the
+    rounding of almost every payment, and exact division the rest. Zero-rate
+    repayment loans are also rounded to the penny. Terms that are not a whole number
+    of months, or longer than MAX_EXACT_MONTHS, and negative rates or rates above
+    MAX_EXACT_RATE or with more than 10 decimal places, fall back to the float
+    formula rounded to the penny.
+
+    :param loan_pence: The loan amount in pence.
+    :param annual_interest_rate: The annual interest rate as a percentage.
+    :param loan_term_years: The term of the loan in years, ignored if interest-only.
+    :param mortgage_type: The mortgage type (``MortgageType`` member or value).
+    :return: Monthly payment in pence.
+    """
+    # The monthly rate r = p/q is the annual percentage / 1200
+    p, q = _ratio(annual_interest_rate)
+    q *= 1200
+    if mortgage_type == MortgageType.interest_only.value:
+        return _divide_rounded(loan_pence * p, q)
+    if mortgage_type != MortgageType.repayment.value:
+        raise ValueError("Unsupported mortgage type.")
+
+    years, fraction = _ratio(loan_term_years)
+    months, remainder = divmod(years * 12, fraction)
+    if p == 0 and not remainder and months >= 1:
+        return _divide_rounded(loan_pence, months)
+    if remainder or not _is_exact(p, q, months):
+        return to_pence(
+            calculations.calculate_repayment_mortgage_payment(
+                from_pence(loan_pence), annual_interest_rate, loan_term_years
+            )
+        )
+    numerator, denominator, factor = _annuity_factor(p, q, months)
+    # The factor is less than one unit below the exact one, so the exact scaled
+    # payment lies in [loan_pence * factor, loan_pence * factor + loan_pence).
+    # Offset by half a penny, both ends flooring to the same penny decide the
+    # rounding, unless the lower end is exactly a half penny.
+    low = loan_pence * factor + _HALF
+    payment = low >> FIXED_POINT_BITS
+    high_payment = (low + loan_pence - 1) >> FIXED_POINT_BITS
+    on_half_penny = low & (2 * _HALF - 1) == 0
+    if payment == high_payment and not on_half_penny:
+        return payment
+    return _divide_rounded(loan_pence * numerator, denominator)
+
+
+def calculate_monthly_payments(
+    loan_amounts, annual_interest_rates, loan_terms_years, mortgage_types
+) -> np.ndarray:
+    """
+    Calculate monthly payments in the configured MONEY_PRECISION.
+
+    Takes the same arguments as ``calculations.calculate_monthly_payments``. In
+    pence mode amounts are read as Decimal and each payment comes from
+    ``monthly_payment_pence``. The payments are whole pence, so the floats returned
+    print as their exact decimal value.
+    """
+    if MONEY_PRECISION != "pence":
+        return calculations.calculate_monthly_payments(
+            loan_amounts, annual_interest_rates, loan_terms_years, mortgage_types
+        )
+    return np.array(
+        [
+            monthly_payment_pence(to_pence(amount), rate, term, mortgage_type) / 100
+            for amount, rate, term, mortgage_type in zip(
+                loan_amounts, annual_interest_rates, loan_terms_years, mortgage_types
+            )
+        ],
+        dtype=np.float64,
+    )
+
+
+def calculate_mortgage_amount(purchase_price, loan_to_value):
+    """
+    The mortgage amount of a loan to value, in percent, of a purchase price.
+
+    In pence mode it is a Decimal rounded half to even to the penny, otherwise a
+    float that the Numeric column rounds.
+    """
+    if MONEY_PRECISION != "pence":
+        return float(purchase_price) * float(loan_to_value) / 100
+    return (to_decimal(purchase_price) * to_decimal(loan_to_value) / 100).quantize(
+        PENNY, rounding=ROUND_HALF_EVEN
+    )
@@ -0,0 +1,154 @@
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.custom.calculations import round_to_pennies
+from app.custom.money import calculate_monthly_payments
+from app.models import MortgageType
+
+# Balances below half a penny count as repaid
+PAID_OFF_BALANCE = 0.005
+
+
+def _regular_balances(
+    loan_amount: float, monthly_rate: float, payment: float, months: np.ndarray
+) -> np.ndarray:
+    # Closed-form balance after k payments: P(1+r)^k - M((1+r)^k - 1) / r
+    if monthly_rate == 0:
+        return loan_amount - payment * months
+    growth = (1 + monthly_rate) ** months
+    return loan_amount * growth - payment * (growth - 1) / monthly_rate
+
+
+def _regular_payoff_month(
+    loan_amount: float, monthly_rate: float, payment: float, term_months: int
+) -> int:
+    """The month the last payment falls in when paying the same amount every month."""
+    if monthly_rate == 0:
+        months = math.ceil(loan_amount / payment)
+    else:
+        # Solve P(1+r)^n = M((1+r)^n - 1) / r for n
+        months = math.ceil(
+            math.log(payment / (payment - monthly_rate * loan_amount))
+            / math.log1p(monthly_rate)
+        )
+    months = max(min(months, term_months), 1)
+    # The logarithms can overshoot by a month when the balance lands on 0
+    if months > 1:
+        balance = _regular_balances(loan_amount, monthly_rate, payment, months - 1)
+        if balance <= PAID_OFF_BALANCE:
+            months -= 1
+    return months
+
+
+def _regular_total_interest(
+    loan_amount: float, monthly_rate: float, payment: float, months: int
+) -> float:
+    # Every payment but the last is the full amount; the last clears the balance
+    opening_balance = _regular_balances(loan_amount, monthly_rate, payment, months - 1)
+    return payment * (months - 1) + opening_balance * (1 + monthly_rate) - loan_amount
+
+
+def _irregular_balances(
+    loan_amount: float, monthly_rate: float, payments: np.ndarray
+) -> np.ndarray:
+    """
+    The balance after each month of varying payments, without a loop.
+
+    B_k = B_{k-1}(1+r) - M_k unrolls to B_k = (1+r)^k (P - sum_{j<=k} M_j (1+r)^-j),
+    a cumulative sum.
+    """
+    growth = (1 + monthly_rate) ** np.arange(1, len(payments) + 1)
+    return growth * (loan_amount - np.cumsum(payments / growth))
+
+
+def simulate_overpayments(
+    loan_amount: float,
+    annual_interest_rate: float,
+    loan_term_years: float,
+    monthly_overpayment: float = 0.0,
+    lump_sums: Optional[Dict[int, float]] = None,
+) -> dict:
+    """
+    Simulate overpaying a repayment mortgage, regularly or with lump sums.
+
+    The monthly payment stays the one of the original schedule, so overpaying
+    shortens the term. Regular overpayments alone have a closed-form payoff month
+    and interest; lump sums switch to a vectorized cumulative sum over the months.
+
+    :param loan_amount: The total loan amount (principal).
+    :param annual_interest_rate: The annual interest rate as a percentage.
+    :param loan_term_years: The term of the loan in years.
+    :param monthly_overpayment: The amount paid on top of every monthly payment.
+    :param lump_sums: One-off overpayments by month number, starting at 1.
+    :return: The monthly payment, the original and new term in months and total
+        interest, the interest saved, and the revised schedule as arrays of month,
+        payment, overpayment, interest, principal and balance.
+    """
+    [monthly_payment] = calculate_monthly_payments(
+        [loan_amount],
+        [annual_interest_rate],
+        [loan_term_years],
+        [MortgageType.repayment.value],
+    ).tolist()
+    loan_amount = float(loan_amount)
+    monthly_rate = float(annual_interest_rate) / 100 / 12
+    term_months = int(round(float(loan_term_years) * 12))
+
+    original_months = _regular_payoff_month(
+        loan_amount, monthly_rate, monthly_payment, term_months
+    )
+    original_interest = _regular_total_interest(
+        loan_amount, monthly_rate, monthly_payment, original_months
+    )
+
+    lump_sums = {
+        month: amount
+        for month, amount in (lump_sums or {}).items()
+        if 1 <= month <= original_months and amount > 0
+    }
+    if lump_sums:
+        extra = np.full(original_months, float(monthly_overpayment))
+        for month, amount in lump_sums.items():
+            extra[month - 1] += amount
+        balances = _irregular_balances(
+            loan_amount, monthly_rate, monthly_payment + extra
+        )
+        paid_off = np.flatnonzero(balances <= PAID_OFF_BALANCE)
+        months = int(paid_off[0]) + 1 if len(paid_off) else original_months
+        balances = balances[:months]
+        extra = extra[:months]
+    else:
+        payment = monthly_payment + monthly_overpayment
+        months = _regular_payoff_month(loan_amount, monthly_rate, payment, term_months)
+        balances = _regular_balances(
+            loan_amount, monthly_rate, payment, np.arange(1, months + 1)
+        )
+        extra = np.full(months, float(monthly_overpayment))
+
+    opening_balance = np.concatenate(([loan_amount], balances[:-1]))
+    interest = opening_balance * monthly_rate
+    balances[-1] = 0
+    principal = opening_balance - balances
+    payment = interest + principal
+    # The last payment only clears what is left, which may take less than planned
+    overpayment = np.minimum(extra, np.maximum(payment - monthly_payment, 0))
+    total_interest = float(interest.sum())
+
+    return {
+        "monthly_payment": monthly_payment,
+        "original_term_months": original_months,
+        "term_months": months,
+        "original_total_interest": original_interest,
+        "total_interest": total_interest,
+        "interest_saved": original_interest - total_interest,
+        "schedule": {
+            "month": np.arange(1, months + 1),
+            "payment": round_to_pennies(payment),
+            "overpayment": round_to_pennies(overpayment),
+            "interest": round_to_pennies(interest),
+            "principal": round_to_pennies(principal),
+            "balance": round_to_pennies(balances),
+        },
+    }
@@ -0,0 +1,165 @@
+from enum import Enum
+from typing import List
+
+from sqlalchemy import func, literal, select, true
+from sqlalchemy.orm import Session
+
+import app.portfolio_totals as portfolio_totals
+import app.schemas as schemas
+from app.models import MortgageOrm, PortfolioTotalsOrm, PropertyOrm
+
+
+def _mortgage_totals(*group_columns):
+    return select(
+        *group_columns,
+        func.count(MortgageOrm.id).label("mortgage_count"),
+        func.coalesce(func.sum(MortgageOrm.mortgage_amount), 0).label(
+            "total_mortgage_debt"
+        ),
+        func.coalesce(
+            func.sum(MortgageOrm.interest_rate * MortgageOrm.mortgage_amount), 0
+        ).label("total_weighted_interest"),
+        func.coalesce(func.sum(MortgageOrm.loan_to_value), 0).label(
+            "total_loan_to_value"
+        ),
+    )
+
+
+def _property_totals(*group_columns):
+    return select(
+        *group_columns,
+        func.count(PropertyOrm.id).label("property_count"),
+        func.coalesce(func.sum(PropertyOrm.purchase_price), 0).label(
+            "total_purchase_price"
+        ),
+        func.coalesce(func.sum(PropertyOrm.rental_income), 0).label(
+            "total_rental_income"
+        ),
+    )
+
+
+def _to_summary(totals, group=None) -> schemas.PortfolioSummaryModel:
+    """Derive the averages of a summary from its sums and counts."""
+    mortgage_count = totals["mortgage_count"] or 0
+    total_mortgage_debt = float(totals["total_mortgage_debt"] or 0)
+    if isinstance(group, Enum):
+        group = group.value
+    return schemas.PortfolioSummaryModel(
+        group=None if group is None else str(group),
+        property_count=totals["property_count"] or 0,
+        mortgage_count=mortgage_count,
+        total_purchase_price=float(totals["total_purchase_price"] or 0),
+        total_mortgage_debt=total_mortgage_debt,
+        weighted_average_interest_rate=(
+            float(totals["total_weighted_interest"]) / total_mortgage_debt
+            if total_mortgage_debt
+            else None
+        ),
+        average_loan_to_value=(
+            float(totals["total_loan_to_value"]) / mortgage_count
+            if mortgage_count
+            else None
+        ),
+        total_monthly_rental_income=float(totals["total_rental_income"] or 0),
+    )
+
+
+def _portfolio_totals(db: Session) -> List[schemas.PortfolioSummaryModel]:
+    if portfolio_totals.PORTFOLIO_TOTALS_TABLE:
+        # The totals are split over a few rows; without any, no triggers keep them
+        table = PortfolioTotalsOrm.__table__
+        totals = db.execute(
+            select(
+                func.count(table.c.id).label("rows"),
+                *(func.sum(column).label(column.name) for column in table.c[1:]),
+            )
+        ).one()
+        if totals.rows:
+            return [_to_summary(totals._mapping)]
+
+    # Both aggregates return exactly one row, so they are joined side by side
+    properties = _property_totals().subquery()
+    mortgages = _mortgage_totals().subquery()
+    totals = db.execute(
+        select(properties, mortgages).select_from(properties.join(mortgages, true()))
+    ).one()
+    return [_to_summary(totals._mapping)]
+
+
+def _totals_by_mortgage_type(db: Session) -> List[schemas.PortfolioSummaryModel]:
+    mortgages = (
+        _mortgage_totals(MortgageOrm.mortgage_type)
+        .group_by(MortgageOrm.mortgage_type)
+        .subquery()
+    )
+    # A property with mortgages of both types counts towards both groups, but once each
+    property_types = (
+        select(MortgageOrm.mortgage_type, MortgageOrm.property_id).distinct().subquery()
+    )
+    properties = (
+        _property_totals(property_types.c.mortgage_type)
+        .join_from(property_types, PropertyOrm)
+        .where(PropertyOrm.id == property_types.c.property_id)
+        .group_by(property_types.c.mortgage_type)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            mortgages,
+            properties.c.property_count,
+            properties.c.total_purchase_price,
+            properties.c.total_rental_income,
+        )
+        .select_from(
+            mortgages.outerjoin(
+                properties, properties.c.mortgage_type == mortgages.c.mortgage_type
+            )
+        )
+        .order_by(mortgages.c.mortgage_type)
+    )
+    return [_to_summary(row._mapping, row.mortgage_type) for row in rows]
+
+
+def _totals_by_property(db: Session) -> List[schemas.PortfolioSummaryModel]:
+    mortgages = (
+        _mortgage_totals(MortgageOrm.property_id)
+        .group_by(MortgageOrm.property_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            PropertyOrm.id,
+            literal(1).label("property_count"),
+            PropertyOrm.purchase_price.label("total_purchase_price"),
+            PropertyOrm.rental_income.label("total_rental_income"),
+            mortgages.c.mortgage_count,
+            mortgages.c.total_mortgage_debt,
+            mortgages.c.total_weighted_interest,
+            mortgages.c.total_loan_to_value,
+        )
+        .outerjoin(mortgages, mortgages.c.property_id == PropertyOrm.id)
+        .order_by(PropertyOrm.createdAt, PropertyOrm.id)
+    )
+    return [_to_summary(row._mapping, row.id) for row in rows]
+
+
+def get_portfolio_summary(
+    group_by: schemas.PortfolioGroupBy, db: Session
+) -> schemas.PortfolioSummaryResponseModel:
+    """
+    Aggregate the portfolio in the database, as a whole or per group.
+
+    Sums and counts are computed in SQL; only the averages are derived from them.
+    """
+    if group_by == schemas.PortfolioGroupBy.mortgage_type:
+        data = _totals_by_mortgage_type(db)
+    elif group_by == schemas.PortfolioGroupBy.property:
+        data = _totals_by_property(db)
+    else:
+        data = _portfolio_totals(db)
+
+    return schemas.PortfolioSummaryResponseModel(
+        status=schemas.Status.Success,
+        message="Portfolio summary retrieved successfully.",
+        data=data,
+    )
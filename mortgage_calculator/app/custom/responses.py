@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.custom.streaming import JSON_MEDIA_TYPE
+
+
+class ModelResponse(Response):
+    """
+    A JSON response rendered straight from a response model by pydantic-core.
+
+    Returning a plain model makes FastAPI dump it to a dict, validate that dict
+    against the route's response_model and encode it again. The CRUD functions
+    already build validated response models, so routes return them in a
+    ModelResponse to serialise each row once. Keep response_model on the route
+    for the OpenAPI schema.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.__pydantic_serializer__.to_json(content)
@@ -0,0 +1,164 @@
+import itertools
+import math
+import os
+import uuid
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import app.schemas as schemas
+from app.cache import LRUCache
+from app.custom.money import calculate_monthly_payments, calculate_mortgage_amount
+from app.models import MortgageOrm, MortgageType, PropertyOrm
+
+SCENARIO_CACHE_SIZE = int(os.getenv("SCENARIO_CACHE_SIZE", "100000"))
+
+# Payments only depend on their inputs, so they never expire
+payment_cache = LRUCache(maxsize=SCENARIO_CACHE_SIZE, ttl=math.inf)
+
+
+def _payment_key(loan_amount, annual_interest_rate, loan_term_years, mortgage_type):
+    # Interest-only payments do not depend on the term, so all terms share one key
+    if mortgage_type == MortgageType.interest_only:
+        loan_term_years = None
+    return (
+        round(float(loan_amount), 2),
+        float(annual_interest_rate),
+        None if loan_term_years is None else float(loan_term_years),
+        MortgageType(mortgage_type).value,
+    )
+
+
+def memoized_monthly_payments(keys) -> np.ndarray:
+    """
+    Calculate monthly payments, reusing those already calculated for the same inputs.
+
+    The payments missing from the cache are calculated together in one vectorized
+    call.
+
+    :param keys: (loan amount, annual interest rate, loan term, mortgage type) tuples,
+        as built by ``_payment_key``.
+    :return: Array of monthly payments, one per key.
+    """
+    # Misses are None, which numpy turns into NaN
+    payments = np.array([payment_cache.get(key) for key in keys], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(payments))
+    if len(missing):
+        # Calculate each missing payment once, even when several rows share its key
+        missing_keys = list(dict.fromkeys(keys[i] for i in missing))
+        calculated = dict(
+            zip(
+                missing_keys,
+                calculate_monthly_payments(*zip(*missing_keys)).tolist(),
+            )
+        )
+        for key, payment in calculated.items():
+            payment_cache.set(key, payment)
+        payments[missing] = [calculated[keys[i]] for i in missing]
+    return payments
+
+
+def _get_mortgage(mortgage_id: str, db: Session):
+    try:
+        mortgage_id = uuid.UUID(str(mortgage_id))
+    except ValueError:
+        mortgage = None
+    else:
+        mortgage = db.execute(
+            select(
+                MortgageOrm.mortgage_amount,
+                MortgageOrm.interest_rate,
+                MortgageOrm.loan_term,
+                MortgageOrm.loan_to_value,
+                MortgageOrm.mortgage_type,
+                PropertyOrm.purchase_price,
+            )
+            .outerjoin(PropertyOrm, PropertyOrm.id == MortgageOrm.property_id)
+            .where(MortgageOrm.id == mortgage_id)
+        ).first()
+    if mortgage is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Mortgage not found."
+        )
+    if mortgage.purchase_price is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Associated property not found.",
+        )
+    return mortgage
+
+
+def get_mortgage_scenarios(
+    mortgage_id: str, payload: schemas.MortgageScenariosRequestModel, db: Session
+) -> schemas.MortgageScenariosResponseModel:
+    """
+    Calculate the payments of a mortgage for every combination of new interest rate,
+    loan term and loan to value, without changing it.
+
+    Values left out keep those of the mortgage. The mortgage amount of a scenario is
+    its loan to value of the property's purchase price, as when creating a mortgage.
+    """
+    mortgage = _get_mortgage(mortgage_id, db)
+    loan_term = None if mortgage.loan_term is None else int(mortgage.loan_term)
+    grid = list(
+        itertools.product(
+            payload.interest_rates or [float(mortgage.interest_rate)],
+            payload.loan_terms or [loan_term],
+            payload.loan_to_values or [float(mortgage.loan_to_value)],
+        )
+    )
+    # Rounded to pennies as the payments are memoized, so both describe the same loan
+    mortgage_amounts = [
+        round(
+            float(calculate_mortgage_amount(mortgage.purchase_price, loan_to_value)), 2
+        )
+        for _, _, loan_to_value in grid
+    ]
+
+    current_key = _payment_key(
+        mortgage.mortgage_amount,
+        mortgage.interest_rate,
+        mortgage.loan_term,
+        mortgage.mortgage_type,
+    )
+    current_payment, *payments = memoized_monthly_payments(
+        [current_key]
+        + [
+            _payment_key(mortgage_amount, interest_rate, term, mortgage.mortgage_type)
+            for mortgage_amount, (interest_rate, term, _) in zip(mortgage_amounts, grid)
+        ]
+    ).tolist()
+
+    interest_only = mortgage.mortgage_type == MortgageType.interest_only
+    scenarios = []
+    for (interest_rate, term, loan_to_value), mortgage_amount, payment in zip(
+        grid, mortgage_amounts, payments
+    ):
+        if term is None:
+            total_interest = None
+        else:
+            # Interest-only loans repay nothing until the end of the term
+            total_paid = payment * term * 12
+            total_interest = (
+                total_paid if interest_only else total_paid - mortgage_amount
+            )
+        scenarios.append(
+            schemas.MortgageScenarioModel(
+                interest_rate=interest_rate,
+                loan_term=term,
+                loan_to_value=loan_to_value,
+                mortgage_amount=mortgage_amount,
+                monthly_payment=payment,
+                monthly_payment_change=payment - current_payment,
+                total_interest=total_interest,
+            )
+        )
+
+    return schemas.MortgageScenariosResponseModel(
+        status=schemas.Status.Success,
+        message="Mortgage scenarios calculated successfully.",
+        current_monthly_payment=current_payment,
+        data=scenarios,
+    )
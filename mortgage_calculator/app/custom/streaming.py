@@ -0,0 +1,187 @@
+import codecs
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, Optional, Sequence, Union
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.schemas import ExportFormat
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+def iter_ndjson(rows: Iterable[dict], chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Serialize rows lazily as newline-delimited JSON.
+
+    :param rows: The rows to serialize, one JSON object each.
+    :param chunk_size: The number of rows written per yielded chunk.
+    :return: Iterator of NDJSON text chunks.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(
+    rows: Iterable[dict], fieldnames: Sequence[str], chunk_size: int = 1000
+) -> Iterator[str]:
+    """
+    Serialize rows lazily as CSV with a header line.
+
+    :param rows: The rows to serialize, keyed by the field names.
+    :param fieldnames: The CSV columns, in order.
+    :param chunk_size: The number of rows written per yielded chunk.
+    :return: Iterator of CSV text chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_gzip(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress text chunks lazily into a single gzip stream.
+
+    :param chunks: The text to compress, encoded as UTF-8.
+    :param level: The zlib compression level, from 1 (fastest) to 9 (smallest).
+    :return: Iterator of gzip-compressed bytes.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the Accept-Encoding header of the request allows gzip."""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            try:
+                return not params or float(quality) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def export_response(
+    request: Request,
+    rows: Iterable[dict],
+    export_format: ExportFormat,
+    fieldnames: Sequence[str],
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream rows as NDJSON or CSV, gzip-compressed when the client accepts it.
+
+    :param request: The request, for its Accept-Encoding header.
+    :param rows: The rows to stream, consumed lazily.
+    :param export_format: NDJSON or CSV.
+    :param fieldnames: The CSV columns, in order.
+    :param filename: Sent in Content-Disposition, without its extension.
+    :return: The streaming response.
+    """
+    if export_format == ExportFormat.csv:
+        chunks, media_type = iter_csv(rows, fieldnames), CSV_MEDIA_TYPE
+    else:
+        chunks, media_type = iter_ndjson(rows), NDJSON_MEDIA_TYPE
+
+    headers = {"Vary": "Accept-Encoding"}
+    if filename:
+        headers["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{export_format.value}"'
+        )
+    if accepts_gzip(request):
+        chunks = iter_gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+async def aiter_lines(request: Request) -> AsyncIterator[str]:
+    """Yield the lines of a request body as it streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def aiter_request_rows(request: Request) -> AsyncIterator[Union[dict, str]]:
+    """
+    Yield the rows of a JSON array, NDJSON or CSV request body, by its content type.
+
+    NDJSON and CSV bodies are parsed as they stream in. Lines that are not valid JSON
+    are yielded as the raw text so they can be reported as invalid rows.
+    """
+    content_type = request.headers.get("content-type", JSON_MEDIA_TYPE)
+    media_type = content_type.split(";")[0].strip().lower()
+
+    if media_type == NDJSON_MEDIA_TYPE:
+        async for line in aiter_lines(request):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield line
+    elif media_type == CSV_MEDIA_TYPE:
+        fieldnames = None
+        record = ""
+        async for line in aiter_lines(request):
+            record += line + "\n"
+            # A quoted field can span lines, so wait until its quotes are balanced
+            if record.count('"') % 2:
+                continue
+            values = next(csv.reader([record]), [])
+            record = ""
+            if not values:
+                continue
+            if fieldnames is None:
+                fieldnames = values
+            else:
+                yield dict(zip(fieldnames, values))
+    elif media_type == JSON_MEDIA_TYPE:
+        try:
+            rows = json.loads(await request.body())
+        except json.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body."
+            ) from e
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The JSON body must be an array of rows.",
+            )
+        for row in rows:
+            yield row
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type: {media_type}.",
+        )
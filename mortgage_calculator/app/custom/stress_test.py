@@ -0,0 +1,280 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import app.schemas as schemas
+from app.custom.money import calculate_monthly_payments
+from app.models import MortgageOrm, MortgageType, PropertyOrm
+
+# Processes repricing the mortgages, 0 or 1 reprices them in the request thread
+STRESS_TEST_WORKERS = int(os.getenv("STRESS_TEST_WORKERS", str(os.cpu_count() or 1)))
+# Simulations of fewer paths x mortgages stay in the request thread, where they are
+# faster than shipping them to the workers
+STRESS_TEST_PARALLEL_MIN = int(os.getenv("STRESS_TEST_PARALLEL_MIN", "1000000"))
+# Payments held in memory at once per process, 8 bytes each
+REPRICE_CHUNK_SIZE = 1_000_000
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def simulate_rate_paths(
+    rate_model: schemas.RateModel,
+    paths: int,
+    months: int,
+    initial_rate: float,
+    volatility: float,
+    mean_rate: Optional[float] = None,
+    reversion_speed: float = 0.0,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Simulate monthly paths of an annual interest rate.
+
+    The random walk adds normal shocks with an annual standard deviation of
+    ``volatility``. The Vasicek model also pulls the rate back towards ``mean_rate``,
+    using the exact discretisation of dr = a(b - r)dt + sigma dW, so monthly steps
+    do not bias the paths.
+
+    :param rate_model: The model the rates follow.
+    :param paths: The number of paths.
+    :param months: The number of monthly steps of each path.
+    :param initial_rate: The rate every path starts from, as a percentage.
+    :param volatility: The annual standard deviation of the rate, in percentage points.
+    :param mean_rate: The long-term rate of the Vasicek model, the initial rate if None.
+    :param reversion_speed: How fast the Vasicek model reverts to its mean, per year.
+    :param seed: Seed of the random generator, for reproducible paths.
+    :return: Array of rates with one row per path and one column per month.
+    """
+    rng = np.random.default_rng(seed)
+    dt = 1 / 12
+    mean_rate = initial_rate if mean_rate is None else mean_rate
+    if rate_model == schemas.RateModel.vasicek and reversion_speed > 0:
+        decay = math.exp(-reversion_speed * dt)
+        step_deviation = volatility * math.sqrt((1 - decay**2) / (2 * reversion_speed))
+    else:
+        decay = 1.0
+        step_deviation = volatility * math.sqrt(dt)
+
+    rates = np.empty((paths, months))
+    rate = np.full(paths, float(initial_rate))
+    for month in range(months):
+        rate = mean_rate + (rate - mean_rate) * decay
+        rate += step_deviation * rng.standard_normal(paths)
+        rates[:, month] = rate
+    return rates
+
+
+class Loans(NamedTuple):
+    """The mortgages still outstanding when their rate resets, as arrays."""
+
+    amortising_balances: np.ndarray
+    amortising_rates: np.ndarray
+    amortising_months: np.ndarray
+    interest_only_balances: np.ndarray
+    interest_only_rates: np.ndarray
+
+
+def _reprice(loans: Loans, rate_shifts: np.ndarray) -> np.ndarray:
+    """Total the monthly payments of the loans after each shift of their rates."""
+    totals = np.empty(len(rate_shifts))
+    balances = loans.amortising_balances
+    monthly_rates = loans.amortising_rates / 1200
+    monthly_shifts = rate_shifts / 1200
+    loan_count = max(len(balances), len(loans.interest_only_balances), 1)
+    step = max(1, REPRICE_CHUNK_SIZE // loan_count)
+    for start in range(0, len(rate_shifts), step):
+        shifts = monthly_shifts[start : start + step, None]
+        # Level payments B * r / (1 - (1 + r)^-n), computed in place and with
+        # log1p/expm1, which stay exact for tiny rates
+        rates = np.add(monthly_rates, shifts)
+        np.maximum(rates, 0, out=rates)
+        discount = np.log1p(rates)
+        discount *= -loans.amortising_months
+        np.expm1(discount, out=discount)
+        zero_rate = discount == 0
+        rates *= balances
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates /= discount
+        # Rates floored at 0 repay the balance in equal parts
+        if zero_rate.any():
+            rates[zero_rate] = np.broadcast_to(
+                -balances / loans.amortising_months, rates.shape
+            )[zero_rate]
+        totals[start : start + step] = -rates.sum(axis=1)
+
+        interest_only_rates = np.maximum(loans.interest_only_rates / 1200 + shifts, 0)
+        totals[start : start + step] += interest_only_rates @ (
+            loans.interest_only_balances
+        )
+    return totals
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the process pool of the stress tests, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Forking the threaded server could copy locks held by other threads
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _executor = ProcessPoolExecutor(
+                max_workers=STRESS_TEST_WORKERS, mp_context=context
+            )
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def reprice_mortgages(loans: Loans, rate_shifts: np.ndarray) -> np.ndarray:
+    """
+    Total the monthly payments of the loans on every rate path.
+
+    Large simulations split the paths across the process pool.
+
+    :param loans: The outstanding loans.
+    :param rate_shifts: How far each path moved the rates, in percentage points.
+    :return: Array of total monthly payments, one per path.
+    """
+    loan_count = len(loans.amortising_balances) + len(loans.interest_only_balances)
+    if (
+        STRESS_TEST_WORKERS <= 1
+        or len(rate_shifts) * loan_count < STRESS_TEST_PARALLEL_MIN
+    ):
+        return _reprice(loans, rate_shifts)
+
+    chunks = np.array_split(rate_shifts, STRESS_TEST_WORKERS * 4)
+    return np.concatenate(list(get_executor().map(partial(_reprice, loans), chunks)))
+
+
+def _outstanding_loans(mortgages, monthly_payments, horizon_months: int) -> Loans:
+    """The balances and remaining terms of the mortgages after horizon_months."""
+    amounts = np.asarray([row.mortgage_amount for row in mortgages], dtype=np.float64)
+    rates = np.asarray([row.interest_rate for row in mortgages], dtype=np.float64)
+    term_months = (
+        np.asarray([row.loan_term for row in mortgages], dtype=np.float64) * 12
+    )
+    interest_only = np.asarray(
+        [row.mortgage_type == MortgageType.interest_only for row in mortgages],
+        dtype=bool,
+    )
+
+    # Closed-form balance after k payments: P(1+r)^k - M((1+r)^k - 1) / r
+    elapsed = np.minimum(horizon_months, np.nan_to_num(term_months))
+    monthly_rates = rates / 100 / 12
+    growth = (1 + monthly_rates) ** elapsed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balances = np.where(
+            monthly_rates > 0,
+            amounts * growth - monthly_payments * (growth - 1) / monthly_rates,
+            amounts - monthly_payments * elapsed,
+        )
+    remaining_months = term_months - elapsed
+    amortising = ~interest_only & (remaining_months > 0) & (balances > 0.005)
+    # Interest-only loans without a term never end
+    interest_only &= ~(term_months <= horizon_months)
+
+    return Loans(
+        amortising_balances=balances[amortising],
+        amortising_rates=rates[amortising],
+        amortising_months=remaining_months[amortising],
+        interest_only_balances=amounts[interest_only],
+        interest_only_rates=rates[interest_only],
+    )
+
+
+def run_stress_test(
+    payload: schemas.StressTestRequestModel, db: Session
+) -> schemas.StressTestResponseModel:
+    """
+    Reprice every mortgage of the portfolio on simulated interest rate paths.
+
+    Each mortgage is treated as starting today at its current payment, and as
+    resetting at the horizon to its rate plus the move of the simulated base rate.
+    Payments are then the level payments of the remaining balance over the rest of
+    the term, or the interest on the loan amount for interest-only mortgages.
+    """
+    mortgages = db.execute(
+        select(
+            MortgageOrm.mortgage_amount,
+            MortgageOrm.interest_rate,
+            MortgageOrm.loan_term,
+            MortgageOrm.mortgage_type,
+        )
+    ).all()
+    rental_income, management_fees = db.execute(
+        select(
+            func.coalesce(func.sum(PropertyOrm.rental_income), 0),
+            func.coalesce(func.sum(PropertyOrm.management_fees), 0),
+        )
+    ).one()
+    net_rental_income = float(rental_income) - float(management_fees)
+
+    monthly_payments = calculate_monthly_payments(
+        [row.mortgage_amount for row in mortgages],
+        [row.interest_rate for row in mortgages],
+        [row.loan_term for row in mortgages],
+        [row.mortgage_type for row in mortgages],
+    )
+    current_payment = float(monthly_payments.sum())
+
+    rates = simulate_rate_paths(
+        payload.rate_model,
+        payload.paths,
+        payload.horizon_months,
+        initial_rate=payload.initial_rate,
+        volatility=payload.volatility,
+        mean_rate=payload.mean_rate,
+        reversion_speed=payload.reversion_speed,
+        seed=payload.seed,
+    )[:, -1]
+    loans = _outstanding_loans(mortgages, monthly_payments, payload.horizon_months)
+    payments = reprice_mortgages(loans, rates - payload.initial_rate)
+    cashflows = net_rental_income - payments
+
+    percentiles = [
+        schemas.StressTestPercentileModel(
+            percentile=percentile,
+            rate=rate,
+            monthly_payment=payment,
+            monthly_cashflow=cashflow,
+        )
+        for percentile, rate, payment, cashflow in zip(
+            PERCENTILES,
+            *(
+                np.percentile(values, PERCENTILES).tolist()
+                for values in (rates, payments, cashflows)
+            ),
+        )
+    ]
+
+    return schemas.StressTestResponseModel(
+        status=schemas.Status.Success,
+        message="Stress test completed successfully.",
+        data=schemas.StressTestModel(
+            paths=payload.paths,
+            horizon_months=payload.horizon_months,
+            mortgage_count=len(mortgages),
+            current_monthly_payment=current_payment,
+            current_monthly_cashflow=net_rental_income - current_payment,
+            mean_monthly_payment=float(payments.mean()),
+            percentiles=percentiles,
+        ),
+    )
@@ -1,8 +1,13 @@
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 load_dotenv()
 
@@ -12,17 +17,127 @@ POSTGRES_USER = os.getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
 POSTGRES_DB = os.getenv("POSTGRES_DB")
 
+# Serve the property and mortgage CRUD routes with async handlers and AsyncSession
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a database URL for its asyncio counterpart."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(
+        hide_password=False
+    )
+
+
+class PoolWaitTimeMixin:
+    """Record how long checkouts wait for a connection, including connecting."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        wait_time = time.perf_counter() - start
+        with self._wait_lock:
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+        return connection
+
+    def recreate(self):
+        # Keep the statistics when the pool is recreated, e.g. by engine.dispose()
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.wait_time_total = self.wait_time_total
+        pool.wait_time_max = self.wait_time_max
+        return pool
+
+
+class InstrumentedQueuePool(PoolWaitTimeMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolWaitTimeMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+def get_pool_options(use_async: bool = False) -> dict:
+    """
+    Build the connection pool arguments of create_engine from environment variables.
+
+    DB_POOL_NULLPOOL opens a new connection per checkout and closes it on release,
+    leaving the pooling to an external pooler such as PgBouncer.
+    """
+    if env_bool("DB_POOL_NULLPOOL", False):
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Replace connections older than this many seconds, -1 keeps them forever
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        # Test connections on checkout so ones dropped by a database restart are replaced
+        "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True),
+        "pool_use_lifo": env_bool("DB_POOL_USE_LIFO", False),
+    }
+
+
+def get_pool_stats(engine: Engine) -> dict:
+    """Return the live usage statistics of an engine's connection pool."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, PoolWaitTimeMixin):
+        stats.update(
+            checkouts=pool.checkouts,
+            wait_time_total_ms=pool.wait_time_total * 1000,
+            wait_time_avg_ms=pool.wait_time_total * 1000 / max(pool.checkouts, 1),
+            wait_time_max_ms=pool.wait_time_max * 1000,
+        )
+    return stats
+
 
 # SQLALCHEMY_DATABASE_URL = "sqlite:///./mortgage.db"
 SQLALCHEMY_DATABASE_URL = (
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}/{POSTGRES_DB}"
 )
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_pool_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = (
+    create_async_engine(
+        to_async_url(SQLALCHEMY_DATABASE_URL), **get_pool_options(use_async=True)
+    )
+    if DATABASE_ASYNC
+    else None
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -32,3 +147,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,29 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app import models, routes
-from app.database import engine
+from app import async_routes, profiling, routes
+from app.custom.stress_test import shutdown_executor
+from app.database import DATABASE_ASYNC, async_engine, engine, get_pool_stats
+from app.metrics import (
+    CONTENT_TYPE,
+    METRICS_ENABLED,
+    MetricsMiddleware,
+    instrument_engines,
+    registry,
+)
+from app.profiling import PROFILING_ENABLED, ProfilingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_executor()
 
-models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+# The database schema is managed by Alembic: run "alembic upgrade head" before starting
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:3000",
@@ -20,10 +37,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    profiling.instrument_engines()
 
-app.include_router(routes.router, tags=["MortgageCalculator"], prefix="/api/v1")
+if METRICS_ENABLED:
+    # Added last, so it is the outermost middleware and times the whole request
+    app.add_middleware(MetricsMiddleware)
+    instrument_engines()
+
+
+router = (
+    async_routes.replace_routes(routes.router, async_routes.router)
+    if DATABASE_ASYNC
+    else routes.router
+)
+app.include_router(router, tags=["MortgageCalculator"], prefix="/api/v1")
 
 
 @app.get("/api/healthchecker")
 def root():
     return {"message": "The API is LIVE!!"}
+
+
+@app.get("/api/pool")
+def pool_stats():
+    """
+    Live statistics of the database connection pools, for sizing them.
+    """
+    stats = {"sync": get_pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = get_pool_stats(async_engine.sync_engine)
+    return stats
+
+
+if METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """
+        Request metrics in the Prometheus text format.
+
+        An async route, so it reads them on the event loop that writes them.
+        """
+        return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,244 @@
+import bisect
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import env_bool
+
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Route label of the requests that matched no route, so unknown paths add no series
+UNMATCHED_ROUTE = "<unmatched>"
+# Method label of any other method, as clients can send arbitrary ones
+METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+OTHER_METHOD = "other"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Counts of observed values per bucket, in the Prometheus histogram layout."""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # One count per bucket and one for the values above the last bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        # Bucket bounds are inclusive, as "le" says
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestDatabaseTime:
+    """The time a request spent in the database and the statements it ran."""
+
+    __slots__ = ("seconds", "statements")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.statements = 0
+
+
+# The database time of the request being served, None outside of requests
+_request_database_time: ContextVar[Optional[RequestDatabaseTime]] = ContextVar(
+    "request_database_time", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+
+
+class Metrics:
+    """
+    Request metrics of this process, rendered in the Prometheus text format.
+
+    Only the middleware writes them, from the event loop thread, so plain integers
+    and floats are enough: no update needs a lock. Like the in-process cache, each
+    worker process keeps its own metrics.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.database_times: Dict[Tuple[str, str], Histogram] = {}
+        self.database_statements: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.response_sizes: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+        database_time: RequestDatabaseTime,
+        response_size: int,
+    ):
+        """Record a request that has been served."""
+        key = (method, route)
+        self.requests[(method, route, status_code)] += 1
+        if key not in self.durations:
+            self.durations[key] = Histogram(LATENCY_BUCKETS)
+            self.database_times[key] = Histogram(LATENCY_BUCKETS)
+            self.response_sizes[key] = Histogram(SIZE_BUCKETS)
+        self.durations[key].observe(duration)
+        self.database_times[key].observe(database_time.seconds)
+        self.database_statements[key] += database_time.statements
+        self.response_sizes[key].observe(response_size)
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_in_flight Requests being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests served, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for key, count in list(self.requests.items()):
+            lines.append(
+                f"http_requests_total{{{_labels(('method', 'route', 'status'), key)}}} "
+                f"{count}"
+            )
+        lines += self._render_histograms(
+            "http_request_duration_seconds",
+            "Time to serve a request.",
+            self.durations,
+        )
+        lines += self._render_histograms(
+            "http_request_db_seconds",
+            "Time a request spent running database statements.",
+            self.database_times,
+        )
+        lines += [
+            "# HELP http_request_db_statements_total Database statements run by requests.",
+            "# TYPE http_request_db_statements_total counter",
+        ]
+        for key, count in list(self.database_statements.items()):
+            lines.append(
+                f"http_request_db_statements_total{{{_labels(('method', 'route'), key)}}}"
+                f" {count}"
+            )
+        lines += self._render_histograms(
+            "http_response_size_bytes",
+            "Size of the response bodies.",
+            self.response_sizes,
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(name: str, help_text: str, histograms: Dict) -> list:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for key, histogram in list(histograms.items()):
+            labels = _labels(("method", "route"), key)
+            cumulative = 0
+            bounds = [*histogram.buckets, "+Inf"]
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+registry = Metrics()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency, database time, status and response size
+    of every HTTP request, by route template, e.g. /api/v1/property/{property_id}.
+    """
+
+    def __init__(self, app, metrics: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = metrics or registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        database_time = RequestDatabaseTime()
+        # Sync routes run in the threadpool with a copy of this context, which
+        # still points to the same RequestDatabaseTime
+        token = _request_database_time.set(database_time)
+        self.metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - start
+            self.metrics.in_flight -= 1
+            _request_database_time.reset(token)
+            # The router stores the route it matched in the scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            self.metrics.observe(
+                method if method in METHODS else OTHER_METHOD,
+                route,
+                status_code,
+                duration,
+                database_time,
+                response_size,
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if context is not None and _request_database_time.get() is not None:
+        context._metrics_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    database_time = _request_database_time.get()
+    start = getattr(context, "_metrics_start_time", None)
+    if database_time is not None and start is not None:
+        database_time.seconds += time.perf_counter() - start
+        database_time.statements += 1
+
+
+def instrument_engines():
+    """Time the statements of every engine, sync and async, per request."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
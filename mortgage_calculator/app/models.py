@@ -3,11 +3,12 @@ from enum import Enum
 
 from sqlalchemy import TIMESTAMP, Column
 from sqlalchemy import Enum as SQLAlchemyEnum
-from sqlalchemy import ForeignKey, Numeric, String
+from sqlalchemy import ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy_utils import UUIDType
 
+from app import portfolio_totals  # noqa: F401 - creates the triggers on create_all
 from app.database import Base
 
 
@@ -31,8 +32,17 @@ class PropertyOrm(Base):
         TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
     updatedAt = Column(TIMESTAMP(timezone=True), default=None, onupdate=func.now())
+    # Incremented by every update, for ETags and optimistic locking
+    version = Column(Integer, nullable=False, server_default="1")
     mortgages = relationship("MortgageOrm", back_populates="property")
 
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # Keyset pagination of the property listing
+        Index("ix_properties_createdAt_id", "createdAt", "id"),
+    )
+
 
 class MortgageOrm(Base):
     __tablename__ = "mortgages"
@@ -51,3 +61,35 @@ class MortgageOrm(Base):
         TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
     updatedAt = Column(TIMESTAMP(timezone=True), default=None, onupdate=func.now())
+    # Incremented by every update, for ETags and optimistic locking
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+    __table_args__ = (
+        # Mortgages of a property, newest or oldest first; also serves property_id lookups
+        Index("ix_mortgages_property_id_createdAt", "property_id", "createdAt"),
+        # Keyset pagination of the mortgage listing
+        Index("ix_mortgages_createdAt_id", "createdAt", "id"),
+    )
+
+
+class PortfolioTotalsOrm(Base):
+    """
+    Running totals of the whole portfolio, split over rows that add up to them.
+
+    Database triggers on properties and mortgages keep the rows up to date, so every
+    write path is covered, including bulk inserts and COPY. The triggers and the
+    rows they add to are in ``app.portfolio_totals``.
+    """
+
+    __tablename__ = "portfolio_totals"
+
+    id = Column(Integer, primary_key=True)
+    property_count = Column(Integer, nullable=False)
+    total_purchase_price = Column(Numeric(18, 2), nullable=False)
+    total_rental_income = Column(Numeric(18, 2), nullable=False)
+    mortgage_count = Column(Integer, nullable=False)
+    total_mortgage_debt = Column(Numeric(18, 2), nullable=False)
+    # Sum of interest_rate * mortgage_amount, for the debt-weighted average rate
+    total_weighted_interest = Column(Numeric(24, 4), nullable=False)
+    total_loan_to_value = Column(Numeric(18, 2), nullable=False)
@@ -0,0 +1,161 @@
+from typing import List
+
+from sqlalchemy import event
+
+from app.database import Base, env_bool
+
+# Keep the portfolio_totals rows up to date with triggers, and read the ungrouped
+# summary from them
+PORTFOLIO_TOTALS_TABLE = env_bool("PORTFOLIO_TOTALS_TABLE", True)
+
+# On Postgres each connection adds to the row picked by its backend pid, so
+# concurrent writers do not queue on one row lock. SQLite has a single writer at a
+# time and a single row with id 1.
+PORTFOLIO_TOTALS_SLOTS = 32
+POSTGRESQL_PORTFOLIO_TOTALS_SLOT = (
+    f"1 + mod(pg_backend_pid(), {PORTFOLIO_TOTALS_SLOTS})"
+)
+
+# The portfolio_totals columns each source table adds to, and the row expression added
+PORTFOLIO_TOTALS_SOURCES = {
+    "properties": {
+        "property_count": "1",
+        "total_purchase_price": "{row}.purchase_price",
+        "total_rental_income": "{row}.rental_income",
+    },
+    "mortgages": {
+        "mortgage_count": "1",
+        "total_mortgage_debt": "{row}.mortgage_amount",
+        "total_weighted_interest": "{row}.interest_rate * {row}.mortgage_amount",
+        "total_loan_to_value": "{row}.loan_to_value",
+    },
+}
+PORTFOLIO_TOTALS_COLUMNS = [
+    column for columns in PORTFOLIO_TOTALS_SOURCES.values() for column in columns
+]
+TRIGGER_OPERATIONS = ("insert", "update", "delete")
+
+
+def _postgresql_ddl() -> List[str]:
+    # Every slot must exist before a trigger can add to it
+    statements = [
+        f"INSERT INTO portfolio_totals (id, {', '.join(PORTFOLIO_TOTALS_COLUMNS)}) "
+        f"SELECT generate_series(2, {PORTFOLIO_TOTALS_SLOTS}), "
+        f"{', '.join('0' for _ in PORTFOLIO_TOTALS_COLUMNS)} "
+        "ON CONFLICT (id) DO NOTHING"
+    ]
+    # Statement-level triggers with transition tables: one update per statement
+    for table, columns in PORTFOLIO_TOTALS_SOURCES.items():
+        updates = []
+        for rows, sign in (("old_rows", "-"), ("new_rows", "+")):
+            assignments = ", ".join(
+                f"{column} = portfolio_totals.{column} {sign} delta.{column}"
+                for column in columns
+            )
+            sums = ", ".join(
+                f"coalesce(sum({expression.format(row=rows)}), 0) AS {column}"
+                for column, expression in columns.items()
+            )
+            operations = (
+                "('UPDATE', 'DELETE')" if rows == "old_rows" else "('INSERT', 'UPDATE')"
+            )
+            updates.append(
+                f"IF TG_OP IN {operations} THEN "
+                f"UPDATE portfolio_totals SET {assignments} "
+                f"FROM (SELECT {sums} FROM {rows}) AS delta "
+                f"WHERE id = {POSTGRESQL_PORTFOLIO_TOTALS_SLOT}; "
+                "END IF;"
+            )
+        statements.append(
+            f"CREATE OR REPLACE FUNCTION portfolio_totals_{table}() RETURNS trigger AS $$ "
+            f"BEGIN {' '.join(updates)} RETURN NULL; END; $$ LANGUAGE plpgsql"
+        )
+        for operation, referencing in zip(
+            TRIGGER_OPERATIONS,
+            (
+                "NEW TABLE AS new_rows",
+                "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+                "OLD TABLE AS old_rows",
+            ),
+        ):
+            statements.append(
+                f"CREATE OR REPLACE TRIGGER portfolio_totals_{table}_{operation} "
+                f"AFTER {operation.upper()} ON {table} REFERENCING {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_{table}()"
+            )
+    return statements
+
+
+def _sqlite_ddl() -> List[str]:
+    statements = []
+    for table, columns in PORTFOLIO_TOTALS_SOURCES.items():
+        for operation, changes in zip(
+            TRIGGER_OPERATIONS,
+            ((("NEW", "+"),), (("OLD", "-"), ("NEW", "+")), (("OLD", "-"),)),
+        ):
+            assignments = ", ".join(
+                f"{column} = {column}"
+                + "".join(
+                    f" {sign} ({expression.format(row=row)})" for row, sign in changes
+                )
+                for column, expression in columns.items()
+            )
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS portfolio_totals_{table}_{operation} "
+                f"AFTER {operation.upper()} ON {table} "
+                f"BEGIN UPDATE portfolio_totals SET {assignments} WHERE id = 1; END"
+            )
+    return statements
+
+
+DIALECT_DDL = {"postgresql": _postgresql_ddl, "sqlite": _sqlite_ddl}
+
+
+def portfolio_totals_ddl(dialect_name: str) -> List[str]:
+    """
+    The statements that create the portfolio_totals triggers and seed its rows.
+
+    Every statement is idempotent, so they can run on each ``create_all``. Databases
+    other than Postgres and SQLite get none, and their summaries are aggregated live.
+    """
+    if dialect_name not in DIALECT_DDL:
+        return []
+    # Seed row 1 from the existing data, in the same transaction as the triggers
+    totals = [
+        f"(SELECT coalesce(sum({expression.format(row=table)}), 0) FROM {table})"
+        for table, columns in PORTFOLIO_TOTALS_SOURCES.items()
+        for expression in columns.values()
+    ]
+    return [
+        *DIALECT_DDL[dialect_name](),
+        f"INSERT INTO portfolio_totals (id, {', '.join(PORTFOLIO_TOTALS_COLUMNS)}) "
+        f"SELECT 1, {', '.join(totals)} "
+        "WHERE NOT EXISTS (SELECT 1 FROM portfolio_totals WHERE id = 1)",
+    ]
+
+
+def portfolio_totals_drop_ddl(dialect_name: str) -> List[str]:
+    """The statements that drop the portfolio_totals triggers, if they exist."""
+    if dialect_name not in DIALECT_DDL:
+        return []
+    statements = []
+    for table in PORTFOLIO_TOTALS_SOURCES:
+        for operation in TRIGGER_OPERATIONS:
+            trigger = f"portfolio_totals_{table}_{operation}"
+            statements.append(
+                f"DROP TRIGGER IF EXISTS {trigger} ON {table}"
+                if dialect_name == "postgresql"
+                else f"DROP TRIGGER IF EXISTS {trigger}"
+            )
+        if dialect_name == "postgresql":
+            statements.append(f"DROP FUNCTION IF EXISTS portfolio_totals_{table}()")
+    return statements
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_portfolio_totals_triggers(target, connection, **kw):
+    # Runs once all tables exist, since the triggers span three of them
+    if not PORTFOLIO_TOTALS_TABLE:
+        return
+    for statement in portfolio_totals_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,258 @@
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi import status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from app.database import env_bool
+
+# Profiling is off unless enabled here, and then only for the requests that ask for it
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+# Required with PROFILING_ENABLED: requests send it as the header value to be profiled
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# Store profiles in this directory, instead of returning them as the response
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_HEADER = b"x-profile"
+# Threads whose innermost frame is in these modules are waiting, not working
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+
+class StackSampler:
+    """
+    Sample the Python stacks of every busy thread at a fixed interval.
+
+    Requests are served by the event loop thread and, for sync routes, by a
+    threadpool worker, so all threads are sampled while the request runs. Samples
+    of the requests served concurrently end up in the same profile.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or frame.f_code.co_filename.endswith(
+                    IDLE_MODULES
+                ):
+                    continue
+                self.stacks[_fold(frame)] += 1
+                self.samples += 1
+
+    def folded(self) -> List[str]:
+        """The stacks in the folded format of flamegraph.pl, speedscope and inferno."""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ProfileSession:
+    """The statements run by a profiled request, with their total durations."""
+
+    def __init__(self):
+        self.statements: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+
+    def add(self, statement: str, duration: float):
+        totals = self.statements[statement]
+        totals[0] += 1
+        totals[1] += duration
+
+    def sql_breakdown(self) -> dict:
+        by_statement = sorted(
+            (
+                {"statement": statement, "count": count, "duration_ms": seconds * 1000}
+                for statement, (count, seconds) in self.statements.items()
+            ),
+            key=lambda row: row["duration_ms"],
+            reverse=True,
+        )
+        return {
+            "statements": sum(row["count"] for row in by_statement),
+            "duration_ms": sum(row["duration_ms"] for row in by_statement),
+            "by_statement": by_statement,
+        }
+
+
+_profile_session: ContextVar[Optional[ProfileSession]] = ContextVar(
+    "profile_session", default=None
+)
+
+
+# Held while a request is profiled: each profile samples every thread of the process
+_profile_lock = threading.Lock()
+
+
+def _profile_requested(scope, token: bytes) -> bool:
+    header = dict(scope["headers"]).get(PROFILE_HEADER)
+    return header is not None and hmac.compare_digest(header, token)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests that send the profiling token in an
+    X-Profile header.
+
+    The response of a profiled request is replaced by its profile, or the profile is
+    saved to PROFILE_DIR with its id in the X-Profile-Id response header. The profile
+    holds the sampled stacks, in the folded format, and the time spent in each SQL
+    statement. Only one request is profiled at a time per process; the others asking
+    for a profile get a 429. Other requests only pay for the header lookup, and the
+    middleware is not installed unless PROFILING_ENABLED is set.
+    """
+
+    def __init__(
+        self, app, token: str = PROFILING_TOKEN, profile_dir: str = PROFILE_DIR
+    ):
+        if not token:
+            raise RuntimeError("PROFILING_TOKEN must be set to enable profiling.")
+        self.app = app
+        self.token = token.encode()
+        self.profile_dir = profile_dir
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope, self.token):
+            await self.app(scope, receive, send)
+            return
+        if not _profile_lock.acquire(blocking=False):
+            await _send_json(
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                {"detail": "Another request is being profiled."},
+            )
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profile_lock.release()
+
+    async def _profile(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex
+        response_start = {}
+        response_size = 0
+
+        async def send_profiled(message):
+            nonlocal response_size
+            if message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+                if self.profile_dir:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile_id.encode()))
+                    await send({**message, "headers": headers})
+            elif self.profile_dir:
+                await send(message)
+
+        session = ProfileSession()
+        token = _profile_session.set(session)
+        sampler = StackSampler()
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            duration = time.perf_counter() - start
+            _profile_session.reset(token)
+            await run_in_threadpool(sampler.stop)
+
+        route = getattr(scope.get("route"), "path", None)
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": response_start.get("status"),
+            "response_size": response_size,
+            "duration_ms": duration * 1000,
+            "sql": session.sql_breakdown(),
+            "profile": {
+                "format": "folded",
+                "interval_ms": sampler.interval * 1000,
+                "samples": sampler.samples,
+                "stacks": sampler.folded(),
+            },
+        }
+        if self.profile_dir:
+            await run_in_threadpool(self._save, profile)
+            return
+
+        await _send_json(
+            send,
+            status.HTTP_200_OK,
+            profile,
+            [(b"x-profile-id", profile_id.encode())],
+        )
+
+    def _save(self, profile: dict):
+        """Save the stacks for flamegraph tools and the whole profile as JSON."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, profile["id"])
+        with open(f"{path}.folded", "w") as file:
+            file.write("\n".join(profile["profile"]["stacks"]) + "\n")
+        with open(f"{path}.json", "w") as file:
+            json.dump(profile, file, indent=2)
+
+
+async def _send_json(send, status_code: int, content: dict, headers=()):
+    body = json.dumps(content).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if context is not None and _profile_session.get() is not None:
+        context._profile_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    session = _profile_session.get()
+    start = getattr(context, "_profile_start_time", None)
+    if session is not None and start is not None:
+        session.add(statement, time.perf_counter() - start)
+
+
+def instrument_engines():
+    """Time the statements of every engine for the profiled requests."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,28 +1,57 @@
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+import app.models as models
 import app.schemas as schemas
+from app.crud.bulk import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE
 from app.crud.mortgage_crud import (
+    bulk_create_mortgage_crud,
     create_mortgage_crud,
     delete_mortgage_crud,
     get_mortgage_crud,
     get_mortgages_crud,
     update_mortgage_crud,
 )
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.crud.property_crud import (
+    bulk_create_property_crud,
     create_property_crud,
     delete_property_crud,
     get_properties_crud,
     get_property_crud,
     update_property_crud,
 )
-from app.custom.db_queries import get_mortgage_payment
+from app.custom.conditional import conditional_response, not_modified_response
+from app.custom.db_queries import (
+    get_mortgage_overpayments,
+    get_mortgage_payment,
+    get_mortgage_payments,
+    get_mortgage_schedule,
+    get_portfolio_roi,
+    get_property_roi,
+    iter_export_rows,
+)
+from app.custom.portfolio import get_portfolio_summary
+from app.custom.responses import ModelResponse
+from app.custom.scenarios import get_mortgage_scenarios
+from app.custom.streaming import aiter_request_rows, export_response
+from app.custom.stress_test import run_stress_test
 from app.database import get_db
 
 router = APIRouter()
 
+SCHEDULE_CSV_FIELDNAMES = (
+    "mortgage_id",
+    "month",
+    "payment",
+    "interest",
+    "principal",
+    "balance",
+)
+
 
 @router.post(
     "/property",
@@ -38,18 +67,82 @@ def create_property(
     return create_property_crud(payload=property, db=db)
 
 
+@router.post(
+    "/property/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.BulkCreateResponseModel,
+)
+async def bulk_create_properties(
+    request: Request,
+    chunk_size: int = Query(default=DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    db: Session = Depends(get_db),
+) -> schemas.BulkCreateResponseModel:
+    """
+    Create many properties from a JSON array, NDJSON or CSV body.
+    """
+    return await bulk_create_property_crud(
+        rows=aiter_request_rows(request), db=db, chunk_size=chunk_size
+    )
+
+
+# Declared before /property/{property_id}, which would otherwise match "export"
+@router.get("/property/export", status_code=status.HTTP_200_OK)
+def export_properties(
+    request: Request,
+    export_format: schemas.ExportFormat = Query(
+        default=schemas.ExportFormat.ndjson, alias="format"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream every property as NDJSON or CSV, gzip-compressed if the client accepts it.
+    """
+    rows = iter_export_rows(models.PropertyOrm, schemas.PropertyModel, db)
+    return export_response(
+        request,
+        rows,
+        export_format,
+        list(schemas.PropertyModel.model_fields),
+        filename="properties",
+    )
+
+
 @router.get(
     "/property/{property_id}",
     status_code=status.HTTP_200_OK,
     response_model=schemas.PropertyResponseModel,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
 )
 def get_property(
-    property_id: str, db: Session = Depends(get_db)
+    property_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
 ) -> schemas.PropertyResponseModel:
     """
     Get a property by ID.
     """
-    return get_property_crud(property_id=property_id, db=db)
+    # Polling clients whose copy is current get an empty 304
+    not_modified = not_modified_response(request, db, models.PropertyOrm, property_id)
+    if not_modified is not None:
+        return not_modified
+    property_response = get_property_crud(property_id=property_id, db=db)
+    return conditional_response(
+        request, ModelResponse(property_response), property_response.data
+    )
+
+
+@router.get(
+    "/property/{property_id}/roi",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.PropertyRoiResponseModel,
+)
+def get_property_investment_metrics(
+    property_id: str, db: Session = Depends(get_db)
+) -> schemas.PropertyRoiResponseModel:
+    """
+    Calculate the ROI, yields and cashflow of a property after its mortgage payments.
+    """
+    return get_property_roi(property_id, db)
 
 
 @router.patch(
@@ -87,11 +180,15 @@ def delete_property(
     status_code=status.HTTP_200_OK,
     response_model=schemas.PropertyListResponseModel,
 )
-def get_properties(db: Session = Depends(get_db)) -> schemas.PropertyListResponseModel:
+def get_properties(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> schemas.PropertyListResponseModel:
     """
-    Get all properties.
+    Get all properties, one page at a time. Pass next_cursor back to get the next page.
     """
-    return get_properties_crud(db=db)
+    return ModelResponse(get_properties_crud(db=db, limit=limit, cursor=cursor))
 
 
 @router.post(
@@ -108,18 +205,68 @@ def create_mortgage(
     return create_mortgage_crud(payload=mortgage, db=db)
 
 
+@router.post(
+    "/mortgage/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.BulkCreateResponseModel,
+)
+async def bulk_create_mortgages(
+    request: Request,
+    chunk_size: int = Query(default=DEFAULT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE),
+    db: Session = Depends(get_db),
+) -> schemas.BulkCreateResponseModel:
+    """
+    Create many mortgages from a JSON array, NDJSON or CSV body.
+    """
+    return await bulk_create_mortgage_crud(
+        rows=aiter_request_rows(request), db=db, chunk_size=chunk_size
+    )
+
+
+# Declared before /mortgage/{mortgage_id}, which would otherwise match "export"
+@router.get("/mortgage/export", status_code=status.HTTP_200_OK)
+def export_mortgages(
+    request: Request,
+    export_format: schemas.ExportFormat = Query(
+        default=schemas.ExportFormat.ndjson, alias="format"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream every mortgage as NDJSON or CSV, gzip-compressed if the client accepts it.
+    """
+    rows = iter_export_rows(models.MortgageOrm, schemas.MortgageModel, db)
+    return export_response(
+        request,
+        rows,
+        export_format,
+        list(schemas.MortgageModel.model_fields),
+        filename="mortgages",
+    )
+
+
 @router.get(
     "/mortgage/{mortgage_id}",
     status_code=status.HTTP_200_OK,
     response_model=schemas.MortgageResponseModel,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"}},
 )
 def get_mortgage(
-    mortgage_id: str, db: Session = Depends(get_db)
+    mortgage_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
 ) -> schemas.MortgageResponseModel:
     """
     Get a mortgage by ID.
     """
-    return get_mortgage_crud(mortgage_id=mortgage_id, db=db)
+    # Polling clients whose copy is current get an empty 304
+    not_modified = not_modified_response(request, db, models.MortgageOrm, mortgage_id)
+    if not_modified is not None:
+        return not_modified
+    mortgage_response = get_mortgage_crud(mortgage_id=mortgage_id, db=db)
+    return conditional_response(
+        request, ModelResponse(mortgage_response), mortgage_response.data
+    )
 
 
 @router.patch(
@@ -157,11 +304,15 @@ def delete_mortgage(
     status_code=status.HTTP_200_OK,
     response_model=schemas.MortgageListResponseModel,
 )
-def get_mortgages(db: Session = Depends(get_db)) -> schemas.MortgageListResponseModel:
+def get_mortgages(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> schemas.MortgageListResponseModel:
     """
-    Get all mortgages.
+    Get all mortgages, one page at a time. Pass next_cursor back to get the next page.
     """
-    return get_mortgages_crud(db=db)
+    return ModelResponse(get_mortgages_crud(db=db, limit=limit, cursor=cursor))
 
 
 @router.post("/mortgage/{mortgage_id}/payment", response_model=Dict[str, str | float])
@@ -172,3 +323,113 @@ def calculate_mortgage_payment(
     Retrieve the monthly payment for a given mortgage.
     """
     return get_mortgage_payment(mortgage_id, db)
+
+
+@router.post(
+    "/mortgage/payments",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.MortgagePaymentsResponseModel,
+)
+def calculate_mortgage_payments(
+    payload: schemas.MortgagePaymentsRequestModel, db: Session = Depends(get_db)
+) -> schemas.MortgagePaymentsResponseModel:
+    """
+    Retrieve the monthly payments for a list of mortgages or all mortgages of a property.
+    """
+    return get_mortgage_payments(payload, db)
+
+
+@router.post(
+    "/mortgage/{mortgage_id}/overpayments",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.OverpaymentResponseModel,
+)
+def simulate_mortgage_overpayments(
+    mortgage_id: str,
+    payload: schemas.OverpaymentRequestModel,
+    db: Session = Depends(get_db),
+) -> schemas.OverpaymentResponseModel:
+    """
+    Simulate regular and lump-sum overpayments of a repayment mortgage: the new
+    payoff date, the interest saved and the revised schedule. Nothing is saved.
+    """
+    return ModelResponse(get_mortgage_overpayments(mortgage_id, payload, db))
+
+
+@router.post(
+    "/mortgage/{mortgage_id}/scenarios",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.MortgageScenariosResponseModel,
+)
+def calculate_mortgage_scenarios(
+    mortgage_id: str,
+    payload: schemas.MortgageScenariosRequestModel,
+    db: Session = Depends(get_db),
+) -> schemas.MortgageScenariosResponseModel:
+    """
+    Calculate the monthly payments of a mortgage refinanced at every combination of
+    the given interest rates, loan terms and loan to values. Nothing is saved.
+    """
+    return ModelResponse(get_mortgage_scenarios(mortgage_id, payload, db))
+
+
+@router.get("/mortgage/{mortgage_id}/schedule", status_code=status.HTTP_200_OK)
+def get_mortgage_amortization_schedule(
+    mortgage_id: str,
+    request: Request,
+    export_format: schemas.ExportFormat = Query(
+        default=schemas.ExportFormat.ndjson, alias="format"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream the month-by-month amortization schedule for a given mortgage.
+    """
+    rows = get_mortgage_schedule(mortgage_id, db)
+    return export_response(request, rows, export_format, SCHEDULE_CSV_FIELDNAMES)
+
+
+@router.get(
+    "/portfolio/summary",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.PortfolioSummaryResponseModel,
+)
+def get_portfolio_summary_route(
+    group_by: schemas.PortfolioGroupBy = schemas.PortfolioGroupBy.none,
+    db: Session = Depends(get_db),
+) -> schemas.PortfolioSummaryResponseModel:
+    """
+    Get the portfolio totals, optionally grouped by mortgage type or property.
+    """
+    return ModelResponse(get_portfolio_summary(group_by=group_by, db=db))
+
+
+@router.get(
+    "/portfolio/roi",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.PortfolioRoiResponseModel,
+)
+def get_portfolio_investment_metrics(
+    rank_by: schemas.RoiMetric = schemas.RoiMetric.roi,
+    limit: int = Query(default=100, ge=1, le=10000),
+    db: Session = Depends(get_db),
+) -> schemas.PortfolioRoiResponseModel:
+    """
+    Rank the properties of the portfolio by an investment metric, best first.
+    """
+    return ModelResponse(get_portfolio_roi(rank_by=rank_by, limit=limit, db=db))
+
+
+@router.post(
+    "/portfolio/stress-test",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.StressTestResponseModel,
+)
+def stress_test_portfolio(
+    payload: schemas.StressTestRequestModel, db: Session = Depends(get_db)
+) -> schemas.StressTestResponseModel:
+    """
+    Simulate interest rate paths and get the distribution of the portfolio's
+    monthly payments and cashflow when its mortgage rates reset.
+    """
+    return ModelResponse(run_stress_test(payload, db))
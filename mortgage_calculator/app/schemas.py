@@ -1,9 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from app.models import MortgageType
 
@@ -13,6 +13,30 @@ class Status(Enum):
     Error = "Error"
 
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class RoiMetric(str, Enum):
+    roi = "roi"
+    cash_on_cash_return = "cash_on_cash_return"
+    gross_yield = "gross_yield"
+    net_yield = "net_yield"
+    monthly_cashflow = "monthly_cashflow"
+
+
+class PortfolioGroupBy(str, Enum):
+    none = "none"
+    mortgage_type = "mortgage_type"
+    property = "property"
+
+
+class RateModel(str, Enum):
+    random_walk = "random_walk"
+    vasicek = "vasicek"
+
+
 class PropertyBaseModel(BaseModel):
     purchase_price: Optional[float] = Field(
         default=None,
@@ -77,6 +101,7 @@ class PropertyModel(PropertyBaseModel):
     id: UUID
     createdAt: datetime
     updatedAt: Optional[datetime]
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -91,6 +116,7 @@ class PropertyListResponseModel(BaseModel):
     status: Status = Status.Success
     message: str
     data: List[PropertyModel]
+    next_cursor: Optional[str] = None
 
 
 class PropertyDeleteModel(BaseModel):
@@ -99,6 +125,18 @@ class PropertyDeleteModel(BaseModel):
     message: str
 
 
+class BulkRowErrorModel(BaseModel):
+    row: int
+    errors: List[Dict[str, Any]]
+
+
+class BulkCreateResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    inserted: int
+    errors: List[BulkRowErrorModel] = []
+
+
 # Mortgage Schemas
 class MortgageBaseModel(BaseModel):
     loan_to_value: Optional[float] = Field(
@@ -156,6 +194,7 @@ class MortgageModel(MortgageBaseModel):
     id: UUID
     createdAt: datetime
     updatedAt: Optional[datetime]
+    version: int
     property_id: UUID
 
     model_config = ConfigDict(from_attributes=True)
@@ -177,3 +216,323 @@ class MortgageListResponseModel(BaseModel):
     status: Status = Status.Success
     message: str
     data: List[MortgageModel]
+    next_cursor: Optional[str] = None
+
+
+# Mortgage Payment Schemas
+MAX_PAYMENT_MORTGAGE_IDS = 1000
+
+
+class MortgagePaymentsRequestModel(BaseModel):
+    mortgage_ids: Optional[List[UUID]] = Field(
+        default=None,
+        max_length=MAX_PAYMENT_MORTGAGE_IDS,
+        json_schema_extra={
+            "description": "IDs of the mortgages to calculate payments for",
+        },
+    )
+    property_id: Optional[UUID] = Field(
+        default=None,
+        json_schema_extra={
+            "description": "ID of a property to calculate payments for all its mortgages",
+        },
+    )
+
+    @model_validator(mode="after")
+    def check_mortgage_ids_or_property_id(self):
+        if (self.mortgage_ids is None) == (self.property_id is None):
+            raise ValueError("Provide either mortgage_ids or property_id.")
+        return self
+
+
+class MortgagePaymentModel(BaseModel):
+    mortgage_id: UUID
+    monthly_payment: float
+
+
+class MortgagePaymentErrorModel(BaseModel):
+    mortgage_id: UUID
+    detail: str
+
+
+class MortgagePaymentsResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: List[MortgagePaymentModel]
+    errors: List[MortgagePaymentErrorModel] = []
+
+
+# Mortgage Scenario Schemas
+MAX_SCENARIOS = 1000
+MAX_SCENARIO_INTEREST_RATE = 100
+MAX_SCENARIO_LOAN_TERM = 50
+
+
+class MortgageScenariosRequestModel(BaseModel):
+    interest_rates: Optional[
+        List[Annotated[float, Field(ge=0, le=MAX_SCENARIO_INTEREST_RATE)]]
+    ] = Field(
+        default=None,
+        min_length=1,
+        json_schema_extra={
+            "example": [3.5, 4.0, 4.5],
+            "description": "Interest rates to try. Defaults to the mortgage's rate",
+        },
+    )
+    loan_terms: Optional[
+        List[Annotated[int, Field(ge=1, le=MAX_SCENARIO_LOAN_TERM)]]
+    ] = Field(
+        default=None,
+        min_length=1,
+        json_schema_extra={
+            "example": [20, 25, 30],
+            "description": "Loan terms in years to try. Defaults to the mortgage's term",
+        },
+    )
+    loan_to_values: Optional[List[Annotated[float, Field(gt=0, le=100)]]] = Field(
+        default=None,
+        min_length=1,
+        json_schema_extra={
+            "example": [60, 75],
+            "description": "Loan to value ratios to try. Defaults to the mortgage's",
+        },
+    )
+
+    @model_validator(mode="after")
+    def check_grid_size(self):
+        size = 1
+        for values in (self.interest_rates, self.loan_terms, self.loan_to_values):
+            size *= len(values or [None])
+        if size > MAX_SCENARIOS:
+            raise ValueError(f"At most {MAX_SCENARIOS} scenarios can be requested.")
+        return self
+
+
+class MortgageScenarioModel(BaseModel):
+    interest_rate: float
+    loan_term: Optional[int]
+    loan_to_value: float
+    mortgage_amount: float
+    monthly_payment: float
+    monthly_payment_change: float = Field(
+        json_schema_extra={"description": "Change from the current monthly payment"},
+    )
+    total_interest: Optional[float] = Field(
+        json_schema_extra={
+            "description": "Interest paid over the loan term, if the mortgage has one",
+        },
+    )
+
+
+class MortgageScenariosResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    current_monthly_payment: float
+    data: List[MortgageScenarioModel]
+
+
+# Overpayment Schemas
+class LumpSumModel(BaseModel):
+    month: int = Field(
+        ge=1,
+        json_schema_extra={
+            "example": 12,
+            "description": "Month of the overpayment, 1 being the first month",
+        },
+    )
+    amount: float = Field(gt=0, json_schema_extra={"example": 10000.00})
+
+
+class OverpaymentRequestModel(BaseModel):
+    monthly_overpayment: float = Field(
+        default=0,
+        ge=0,
+        json_schema_extra={
+            "example": 200.00,
+            "description": "Amount paid on top of every monthly payment",
+        },
+    )
+    lump_sums: List[LumpSumModel] = Field(default=[], max_length=1000)
+
+
+class OverpaymentScheduleModel(BaseModel):
+    """The revised schedule by column, one value per month in each list."""
+
+    month: List[int]
+    payment: List[float]
+    overpayment: List[float]
+    interest: List[float]
+    principal: List[float]
+    balance: List[float]
+
+
+class OverpaymentModel(BaseModel):
+    mortgage_id: UUID
+    monthly_payment: float
+    original_term_months: int
+    term_months: int
+    months_saved: int
+    original_payoff_date: date
+    payoff_date: date
+    original_total_interest: float
+    total_interest: float
+    interest_saved: float
+    schedule: OverpaymentScheduleModel
+
+
+class OverpaymentResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: OverpaymentModel
+
+
+# Portfolio Schemas
+class PortfolioSummaryModel(BaseModel):
+    group: Optional[str] = Field(
+        default=None,
+        json_schema_extra={
+            "description": "The mortgage type or property ID of the group, if grouped",
+        },
+    )
+    property_count: int
+    mortgage_count: int
+    total_purchase_price: float
+    total_mortgage_debt: float
+    weighted_average_interest_rate: Optional[float] = Field(
+        json_schema_extra={
+            "description": "Interest rate weighted by mortgage amount, if there is debt",
+        },
+    )
+    average_loan_to_value: Optional[float] = Field(
+        json_schema_extra={
+            "description": "Mean loan to value of the mortgages, if there are any",
+        },
+    )
+    total_monthly_rental_income: float
+
+
+class PortfolioSummaryResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: List[PortfolioSummaryModel]
+
+
+class PropertyRoiModel(BaseModel):
+    property_id: UUID
+    total_cost: float
+    cash_invested: float
+    monthly_cashflow: Optional[float]
+    annual_cashflow: Optional[float]
+    gross_yield: Optional[float] = Field(
+        json_schema_extra={"description": "Annual rent / purchase price, in %"},
+    )
+    net_yield: Optional[float] = Field(
+        json_schema_extra={
+            "description": "Annual rent less management fees / total cost, in %",
+        },
+    )
+    roi: Optional[float] = Field(
+        json_schema_extra={"description": "Annual cashflow / total cost, in %"},
+    )
+    cash_on_cash_return: Optional[float] = Field(
+        json_schema_extra={"description": "Annual cashflow / cash invested, in %"},
+    )
+
+
+class PropertyRoiResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: PropertyRoiModel
+
+
+class PortfolioRoiResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: List[PropertyRoiModel]
+
+
+# Stress Test Schemas
+class StressTestRequestModel(BaseModel):
+    rate_model: RateModel = Field(
+        default=RateModel.vasicek,
+        json_schema_extra={"description": "Model of the base rate paths"},
+    )
+    paths: int = Field(
+        default=1000,
+        ge=1,
+        le=50000,
+        json_schema_extra={"description": "Number of simulated rate paths"},
+    )
+    horizon_months: int = Field(
+        default=24,
+        ge=1,
+        le=120,
+        json_schema_extra={
+            "description": "Months until the mortgage rates reset to the simulated rate",
+        },
+    )
+    initial_rate: float = Field(
+        default=5.0,
+        json_schema_extra={"example": 5.0, "description": "Base rate today, in %"},
+    )
+    volatility: float = Field(
+        default=1.0,
+        ge=0,
+        json_schema_extra={
+            "example": 1.0,
+            "description": "Annual standard deviation of the base rate, in percentage points",
+        },
+    )
+    mean_rate: Optional[float] = Field(
+        default=None,
+        json_schema_extra={
+            "example": 4.0,
+            "description": "Long-term base rate of the Vasicek model, in %. Defaults to initial_rate",
+        },
+    )
+    reversion_speed: float = Field(
+        default=0.5,
+        ge=0,
+        json_schema_extra={
+            "example": 0.5,
+            "description": "How fast the Vasicek model reverts to its mean, per year",
+        },
+    )
+    seed: Optional[int] = Field(
+        default=None,
+        ge=0,
+        json_schema_extra={"description": "Random seed, for reproducible results"},
+    )
+
+
+class StressTestPercentileModel(BaseModel):
+    percentile: float
+    rate: float = Field(json_schema_extra={"description": "Base rate at the horizon"})
+    monthly_payment: float = Field(
+        json_schema_extra={"description": "Total monthly payment of the portfolio"},
+    )
+    monthly_cashflow: float = Field(
+        json_schema_extra={
+            "description": "Rental income less management fees and mortgage payments",
+        },
+    )
+
+
+class StressTestModel(BaseModel):
+    paths: int
+    horizon_months: int
+    mortgage_count: int
+    current_monthly_payment: float
+    current_monthly_cashflow: float
+    mean_monthly_payment: float
+    percentiles: List[StressTestPercentileModel] = Field(
+        json_schema_extra={
+            "description": "Percentiles of each value across the paths, taken separately",
+        },
+    )
+
+
+class StressTestResponseModel(BaseModel):
+    status: Status = Status.Success
+    message: str
+    data: StressTestModel
@@ -0,0 +1,80 @@
+"""
+Compare the float payment kernel, Decimal arithmetic and the integer pence kernel.
+
+    $ poetry run python -m benchmarks.money_precision
+    $ poetry run python -m benchmarks.money_precision --mortgages=100000
+"""
+
+import argparse
+import time
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+
+from app.custom import money
+from app.custom.calculations import calculate_monthly_payments
+
+
+def decimal_payment(loan_amount: Decimal, rate: Decimal, years: int) -> Decimal:
+    """The annuity formula on Decimal, which runs Decimal ** int on the slow path."""
+    monthly_rate = rate / 1200
+    growth = (1 + monthly_rate) ** (years * 12)
+    payment = loan_amount * monthly_rate * growth / (growth - 1)
+    return payment.quantize(money.PENNY, rounding=ROUND_HALF_EVEN)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mortgages", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Realistic portfolios share few rates and terms: 2 dp rates up to 10%, whole years
+    rng = np.random.default_rng(0)
+    loan_pence = rng.integers(50_000_00, 1_000_000_00, args.mortgages).tolist()
+    loan_amounts = [money.from_pence(pence) for pence in loan_pence]
+    rates = [
+        money.from_pence(bp) for bp in rng.integers(1, 1000, args.mortgages).tolist()
+    ]
+    terms = rng.integers(5, 41, args.mortgages).tolist()
+    types = ["repayment"] * args.mortgages
+
+    implementations = {
+        "float": lambda: calculate_monthly_payments(loan_amounts, rates, terms, types),
+        "decimal": lambda: [
+            decimal_payment(*row) for row in zip(loan_amounts, rates, terms)
+        ],
+        "pence_cold": lambda: [
+            money.monthly_payment_pence(*row)
+            for row in zip(loan_pence, rates, terms, types)
+        ],
+        "pence_warm": lambda: [
+            money.monthly_payment_pence(*row)
+            for row in zip(loan_pence, rates, terms, types)
+        ],
+    }
+    results = {}
+    money._annuity_factor.cache_clear()
+    for name, implementation in implementations.items():
+        start = time.perf_counter()
+        results[name] = implementation()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>10}: {args.mortgages} payments in {elapsed * 1000:.0f} ms "
+            f"({elapsed / args.mortgages * 1e6:.1f} us each)"
+        )
+
+    pence = np.asarray(results["pence_warm"])
+    float_pence = np.round(results["float"] * 100).astype(np.int64)
+    decimal_pence = np.asarray(
+        [money.to_pence(payment) for payment in results["decimal"]]
+    )
+    print(
+        f"float differs from pence on {np.count_nonzero(float_pence != pence)} payments"
+    )
+    print(
+        f"decimal differs from pence on {np.count_nonzero(decimal_pence != pence)} payments"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Time repricing synthetic mortgages on simulated rate paths, in the request thread and on the process pool.
+
+    $ poetry run python -m benchmarks.stress_test
+    $ STRESS_TEST_WORKERS=8 poetry run python -m benchmarks.stress_test --paths=10000 --mortgages=10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import app.custom.stress_test as stress_test
+from app.schemas import RateModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--mortgages", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    interest_only = args.mortgages // 10
+    amortising = args.mortgages - interest_only
+    loans = stress_test.Loans(
+        amortising_balances=rng.uniform(100000, 500000, amortising),
+        amortising_rates=rng.uniform(1, 7, amortising),
+        amortising_months=rng.integers(60, 360, amortising).astype(float),
+        interest_only_balances=rng.uniform(100000, 500000, interest_only),
+        interest_only_rates=rng.uniform(1, 7, interest_only),
+    )
+
+    start = time.perf_counter()
+    rates = stress_test.simulate_rate_paths(
+        RateModel.vasicek, args.paths, 24, 5, 1, reversion_speed=0.5, seed=0
+    )
+    print(f"{'paths':>8}: {time.perf_counter() - start:.2f} s")
+
+    rate_shifts = rates[:, -1] - 5
+    for name, workers in {"inline": 1, "pool": stress_test.STRESS_TEST_WORKERS}.items():
+        stress_test.STRESS_TEST_WORKERS = workers
+        if workers > 1:
+            # Start the worker processes before timing
+            list(stress_test.get_executor().map(abs, range(workers)))
+        start = time.perf_counter()
+        stress_test.reprice_mortgages(loans, rate_shifts)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>8}: {args.paths} paths x {args.mortgages} mortgages in "
+            f"{elapsed:.2f} s with {workers} process(es)"
+        )
+    stress_test.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
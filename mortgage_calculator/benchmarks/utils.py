@@ -0,0 +1,61 @@
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+
+DEFAULT_DB_URL = "sqlite:///./test_db.db"
+
+
+@contextmanager
+def rollback_session(db_url: str) -> Iterator[Session]:
+    """Yield a session whose changes are rolled back afterwards, like the test suite."""
+    engine = create_engine(db_url, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = sessionmaker(autocommit=False, autoflush=False)(bind=connection)
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+@contextmanager
+def count_statements(session: Session) -> Iterator[list]:
+    """Collect the SQL statements executed through the session's engine."""
+    statements = []
+    engine = session.get_bind().engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def time_calls(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    """Call func repeatedly and return latency statistics in milliseconds."""
+    func()  # Warm up caches and compiled statements
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+    }
@@ -0,0 +1,75 @@
+"""create properties and mortgages
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 14:43:14.922731
+
+Databases created by the old ``Base.metadata.create_all`` call on startup already
+have these tables; mark them as migrated with ``alembic stamp 0001``.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "properties",
+        sa.Column("id", sqlalchemy_utils.UUIDType(binary=False), nullable=False),
+        sa.Column("purchase_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("rental_income", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("renovation_cost", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("property_name", sa.String(length=255), nullable=False),
+        sa.Column("admin_costs", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("management_fees", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            "createdAt",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("updatedAt", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "mortgages",
+        sa.Column("id", sqlalchemy_utils.UUIDType(binary=False), nullable=False),
+        sa.Column(
+            "property_id", sqlalchemy_utils.UUIDType(binary=False), nullable=True
+        ),
+        sa.Column("loan_to_value", sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column("interest_rate", sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column(
+            "mortgage_type",
+            sa.Enum("interest_only", "repayment", name="mortgagetype"),
+            nullable=False,
+        ),
+        sa.Column("loan_term", sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column("mortgage_amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            "createdAt",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("updatedAt", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["property_id"], ["properties.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("mortgages")
+    op.drop_table("properties")
+    sa.Enum(name="mortgagetype").drop(op.get_bind(), checkfirst=True)
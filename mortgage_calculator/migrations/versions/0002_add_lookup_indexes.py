@@ -0,0 +1,38 @@
+"""add lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 14:45:02.301154
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_properties_createdAt_id", "properties", ["createdAt", "id"]),
+    ("ix_mortgages_property_id_createdAt", "mortgages", ["property_id", "createdAt"]),
+    ("ix_mortgages_createdAt_id", "mortgages", ["createdAt", "id"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without locking writes on Postgres; this cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,303 @@
+"""add portfolio totals
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 16:02:41.518377
+
+Triggers on properties and mortgages keep running totals of the portfolio in
+portfolio_totals. On Postgres the totals are split over 32 rows, and each connection
+adds to the row picked by its backend pid, so concurrent writers do not queue on one
+row lock. SQLite has one writer at a time and keeps a single row.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.database import env_bool
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The statements of app.portfolio_totals as they were when this revision was
+# written; later changes to the triggers go in their own revisions
+TRIGGERS = {
+    "postgresql": [
+        (
+            "INSERT INTO portfolio_totals (id, property_count, "
+            "total_purchase_price, total_rental_income, mortgage_count, "
+            "total_mortgage_debt, total_weighted_interest, total_loan_to_value) "
+            "SELECT generate_series(2, 32), 0, 0, 0, 0, 0, 0, 0 "
+            "ON CONFLICT (id) DO NOTHING"
+        ),
+        (
+            "CREATE OR REPLACE FUNCTION portfolio_totals_properties() RETURNS "
+            "trigger AS $$ "
+            "BEGIN "
+            "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+            "UPDATE portfolio_totals SET property_count = "
+            "portfolio_totals.property_count - delta.property_count, "
+            "total_purchase_price = portfolio_totals.total_purchase_price - "
+            "delta.total_purchase_price, total_rental_income = "
+            "portfolio_totals.total_rental_income - delta.total_rental_income "
+            "FROM (SELECT coalesce(sum(1), 0) AS property_count, "
+            "coalesce(sum(old_rows.purchase_price), 0) AS total_purchase_price, "
+            "coalesce(sum(old_rows.rental_income), 0) AS total_rental_income "
+            "FROM old_rows) AS delta "
+            "WHERE id = 1 + mod(pg_backend_pid(), 32); "
+            "END IF; "
+            "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+            "UPDATE portfolio_totals SET property_count = "
+            "portfolio_totals.property_count + delta.property_count, "
+            "total_purchase_price = portfolio_totals.total_purchase_price + "
+            "delta.total_purchase_price, total_rental_income = "
+            "portfolio_totals.total_rental_income + delta.total_rental_income "
+            "FROM (SELECT coalesce(sum(1), 0) AS property_count, "
+            "coalesce(sum(new_rows.purchase_price), 0) AS total_purchase_price, "
+            "coalesce(sum(new_rows.rental_income), 0) AS total_rental_income "
+            "FROM new_rows) AS delta "
+            "WHERE id = 1 + mod(pg_backend_pid(), 32); "
+            "END IF; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_properties_insert "
+            "AFTER INSERT ON properties "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_properties()"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_properties_update "
+            "AFTER UPDATE ON properties "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_properties()"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_properties_delete "
+            "AFTER DELETE ON properties "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_properties()"
+        ),
+        (
+            "CREATE OR REPLACE FUNCTION portfolio_totals_mortgages() RETURNS "
+            "trigger AS $$ "
+            "BEGIN "
+            "IF TG_OP IN ('UPDATE', 'DELETE') THEN "
+            "UPDATE portfolio_totals SET mortgage_count = "
+            "portfolio_totals.mortgage_count - delta.mortgage_count, "
+            "total_mortgage_debt = portfolio_totals.total_mortgage_debt - "
+            "delta.total_mortgage_debt, total_weighted_interest = "
+            "portfolio_totals.total_weighted_interest - "
+            "delta.total_weighted_interest, total_loan_to_value = "
+            "portfolio_totals.total_loan_to_value - delta.total_loan_to_value "
+            "FROM (SELECT coalesce(sum(1), 0) AS mortgage_count, "
+            "coalesce(sum(old_rows.mortgage_amount), 0) AS total_mortgage_debt, "
+            "coalesce(sum(old_rows.interest_rate * old_rows.mortgage_amount), 0) AS "
+            "total_weighted_interest, coalesce(sum(old_rows.loan_to_value), 0) AS "
+            "total_loan_to_value "
+            "FROM old_rows) AS delta "
+            "WHERE id = 1 + mod(pg_backend_pid(), 32); "
+            "END IF; "
+            "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+            "UPDATE portfolio_totals SET mortgage_count = "
+            "portfolio_totals.mortgage_count + delta.mortgage_count, "
+            "total_mortgage_debt = portfolio_totals.total_mortgage_debt + "
+            "delta.total_mortgage_debt, total_weighted_interest = "
+            "portfolio_totals.total_weighted_interest + "
+            "delta.total_weighted_interest, total_loan_to_value = "
+            "portfolio_totals.total_loan_to_value + delta.total_loan_to_value "
+            "FROM (SELECT coalesce(sum(1), 0) AS mortgage_count, "
+            "coalesce(sum(new_rows.mortgage_amount), 0) AS total_mortgage_debt, "
+            "coalesce(sum(new_rows.interest_rate * new_rows.mortgage_amount), 0) AS "
+            "total_weighted_interest, coalesce(sum(new_rows.loan_to_value), 0) AS "
+            "total_loan_to_value "
+            "FROM new_rows) AS delta "
+            "WHERE id = 1 + mod(pg_backend_pid(), 32); "
+            "END IF; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_mortgages_insert "
+            "AFTER INSERT ON mortgages "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_mortgages()"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_mortgages_update "
+            "AFTER UPDATE ON mortgages "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_mortgages()"
+        ),
+        (
+            "CREATE OR REPLACE TRIGGER portfolio_totals_mortgages_delete "
+            "AFTER DELETE ON mortgages "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION portfolio_totals_mortgages()"
+        ),
+        (
+            "INSERT INTO portfolio_totals (id, property_count, "
+            "total_purchase_price, total_rental_income, mortgage_count, "
+            "total_mortgage_debt, total_weighted_interest, total_loan_to_value) "
+            "SELECT 1, (SELECT coalesce(sum(1), 0) "
+            "FROM properties), (SELECT coalesce(sum(properties.purchase_price), 0) "
+            "FROM properties), (SELECT coalesce(sum(properties.rental_income), 0) "
+            "FROM properties), (SELECT coalesce(sum(1), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.mortgage_amount), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.interest_rate * "
+            "mortgages.mortgage_amount), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.loan_to_value), 0) "
+            "FROM mortgages) "
+            "WHERE NOT EXISTS (SELECT 1 "
+            "FROM portfolio_totals "
+            "WHERE id = 1)"
+        ),
+    ],
+    "sqlite": [
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_properties_insert "
+            "AFTER INSERT ON properties "
+            "BEGIN "
+            "UPDATE portfolio_totals SET property_count = property_count + (1), "
+            "total_purchase_price = total_purchase_price + (NEW.purchase_price), "
+            "total_rental_income = total_rental_income + (NEW.rental_income) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_properties_update "
+            "AFTER UPDATE ON properties "
+            "BEGIN "
+            "UPDATE portfolio_totals SET property_count = property_count - (1) + "
+            "(1), total_purchase_price = total_purchase_price - "
+            "(OLD.purchase_price) + (NEW.purchase_price), total_rental_income = "
+            "total_rental_income - (OLD.rental_income) + (NEW.rental_income) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_properties_delete "
+            "AFTER DELETE ON properties "
+            "BEGIN "
+            "UPDATE portfolio_totals SET property_count = property_count - (1), "
+            "total_purchase_price = total_purchase_price - (OLD.purchase_price), "
+            "total_rental_income = total_rental_income - (OLD.rental_income) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_mortgages_insert "
+            "AFTER INSERT ON mortgages "
+            "BEGIN "
+            "UPDATE portfolio_totals SET mortgage_count = mortgage_count + (1), "
+            "total_mortgage_debt = total_mortgage_debt + (NEW.mortgage_amount), "
+            "total_weighted_interest = total_weighted_interest + (NEW.interest_rate "
+            "* NEW.mortgage_amount), total_loan_to_value = total_loan_to_value + "
+            "(NEW.loan_to_value) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_mortgages_update "
+            "AFTER UPDATE ON mortgages "
+            "BEGIN "
+            "UPDATE portfolio_totals SET mortgage_count = mortgage_count - (1) + "
+            "(1), total_mortgage_debt = total_mortgage_debt - (OLD.mortgage_amount) "
+            "+ (NEW.mortgage_amount), total_weighted_interest = "
+            "total_weighted_interest - (OLD.interest_rate * OLD.mortgage_amount) + "
+            "(NEW.interest_rate * NEW.mortgage_amount), total_loan_to_value = "
+            "total_loan_to_value - (OLD.loan_to_value) + (NEW.loan_to_value) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "CREATE TRIGGER IF NOT EXISTS portfolio_totals_mortgages_delete "
+            "AFTER DELETE ON mortgages "
+            "BEGIN "
+            "UPDATE portfolio_totals SET mortgage_count = mortgage_count - (1), "
+            "total_mortgage_debt = total_mortgage_debt - (OLD.mortgage_amount), "
+            "total_weighted_interest = total_weighted_interest - (OLD.interest_rate "
+            "* OLD.mortgage_amount), total_loan_to_value = total_loan_to_value - "
+            "(OLD.loan_to_value) "
+            "WHERE id = 1; END"
+        ),
+        (
+            "INSERT INTO portfolio_totals (id, property_count, "
+            "total_purchase_price, total_rental_income, mortgage_count, "
+            "total_mortgage_debt, total_weighted_interest, total_loan_to_value) "
+            "SELECT 1, (SELECT coalesce(sum(1), 0) "
+            "FROM properties), (SELECT coalesce(sum(properties.purchase_price), 0) "
+            "FROM properties), (SELECT coalesce(sum(properties.rental_income), 0) "
+            "FROM properties), (SELECT coalesce(sum(1), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.mortgage_amount), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.interest_rate * "
+            "mortgages.mortgage_amount), 0) "
+            "FROM mortgages), (SELECT coalesce(sum(mortgages.loan_to_value), 0) "
+            "FROM mortgages) "
+            "WHERE NOT EXISTS (SELECT 1 "
+            "FROM portfolio_totals "
+            "WHERE id = 1)"
+        ),
+    ],
+}
+
+DROP_TRIGGERS = {
+    "postgresql": [
+        ("DROP TRIGGER IF EXISTS portfolio_totals_properties_insert ON " "properties"),
+        ("DROP TRIGGER IF EXISTS portfolio_totals_properties_update ON " "properties"),
+        ("DROP TRIGGER IF EXISTS portfolio_totals_properties_delete ON " "properties"),
+        "DROP FUNCTION IF EXISTS portfolio_totals_properties()",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_insert ON mortgages",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_update ON mortgages",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_delete ON mortgages",
+        "DROP FUNCTION IF EXISTS portfolio_totals_mortgages()",
+    ],
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS portfolio_totals_properties_insert",
+        "DROP TRIGGER IF EXISTS portfolio_totals_properties_update",
+        "DROP TRIGGER IF EXISTS portfolio_totals_properties_delete",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_insert",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_update",
+        "DROP TRIGGER IF EXISTS portfolio_totals_mortgages_delete",
+    ],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "portfolio_totals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("property_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "total_purchase_price", sa.Numeric(precision=18, scale=2), nullable=False
+        ),
+        sa.Column(
+            "total_rental_income", sa.Numeric(precision=18, scale=2), nullable=False
+        ),
+        sa.Column("mortgage_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "total_mortgage_debt", sa.Numeric(precision=18, scale=2), nullable=False
+        ),
+        sa.Column(
+            "total_weighted_interest", sa.Numeric(precision=24, scale=4), nullable=False
+        ),
+        sa.Column(
+            "total_loan_to_value", sa.Numeric(precision=18, scale=2), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Without the triggers the table stays empty and the summary is aggregated live
+    dialect_name = op.get_bind().dialect.name
+    if not env_bool("PORTFOLIO_TOTALS_TABLE", True) or dialect_name not in TRIGGERS:
+        return
+    # The triggers and the seeded row must match, so lock out writes while both are made
+    if dialect_name == "postgresql":
+        op.execute("LOCK TABLE properties, mortgages IN SHARE ROW EXCLUSIVE MODE")
+    for statement in TRIGGERS[dialect_name]:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in DROP_TRIGGERS.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+    op.drop_table("portfolio_totals")
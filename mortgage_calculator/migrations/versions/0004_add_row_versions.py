@@ -0,0 +1,36 @@
+"""add row versions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 21:37:15.082641
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("properties", "mortgages")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default fills the existing rows without rewriting them on Postgres
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(TABLES):
+        op.drop_column(table, "version")
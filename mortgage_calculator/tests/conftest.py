@@ -1,11 +1,20 @@
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
 import pytest
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event
 from sqlalchemy.exc import OperationalError as SQLAlchemyOperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app import async_routes, cache
+from app.database import Base, get_async_db, get_db, to_async_url
 from app.main import app
 
 
@@ -37,6 +46,12 @@ def pytest_sessionstart(session):
         )
 
 
+@pytest.fixture(scope="function", autouse=True)
+def empty_cache(monkeypatch):
+    """Give every test its own empty in-process cache."""
+    monkeypatch.setattr(cache, "backend", cache.LRUCache())
+
+
 @pytest.fixture(scope="session")
 def db_url(request):
     """Fixture to retrieve the database URL."""
@@ -66,14 +81,134 @@ def db_session(db_url):
     connection.close()
 
 
+# Identical statements run this many times by one request are flagged as N+1 queries
+N_PLUS_ONE_THRESHOLD = 3
+
+
+class NPlusOneWarning(UserWarning):
+    """A request ran the same statement over and over, e.g. once per row."""
+
+
+@dataclass
+class Statement:
+    sql: str
+    duration_ms: float
+
+
+@dataclass
+class RequestQueries:
+    """The statements run while serving one request."""
+
+    method: str
+    path: str
+    statements: List[Statement] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        return sum(statement.duration_ms for statement in self.statements)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """The statements run at least threshold times, with their counts."""
+        counts: Dict[str, int] = {}
+        for statement in self.statements:
+            counts[statement.sql] = counts.get(statement.sql, 0) + 1
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.method} {self.path}: {len(self.statements)} statement(s) "
+            f"in {self.duration_ms:.2f} ms"
+        ]
+        lines += [f"  {' '.join(s.sql.split())}" for s in self.statements]
+        return "\n".join(lines)
+
+
+class QueryCounter:
+    """
+    Record the statements an engine runs, with their timings, per test client request.
+
+    Statements run outside of a request, e.g. by fixtures, are only in ``statements``.
+    """
+
+    def __init__(self):
+        self.statements: List[Statement] = []
+        self.requests: List[RequestQueries] = []
+        self.current: Optional[RequestQueries] = None
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, many):
+        start = conn.info["query_start_time"].pop()
+        recorded = Statement(statement, (time.perf_counter() - start) * 1000)
+        self.statements.append(recorded)
+        if self.current is not None:
+            self.current.statements.append(recorded)
+
+    def start_request(self, method: str, path: str):
+        self.current = RequestQueries(method, path)
+        self.requests.append(self.current)
+
+    def end_request(self):
+        self.current = None
+
+    @property
+    def last(self) -> RequestQueries:
+        """The statements of the latest request."""
+        assert self.requests, "No request has run a query yet."
+        return self.requests[-1]
+
+    def assert_max_queries(self, n: int, request: Optional[RequestQueries] = None):
+        """Fail if the latest request, or the one given, ran more than n statements."""
+        request = request or self.last
+        assert len(request.statements) <= n, (
+            f"Expected at most {n} statement(s), got {len(request.statements)}:\n"
+            f"{request}"
+        )
+
+    def assert_no_n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        """Fail if any request ran the same statement threshold times or more."""
+        offenders = [
+            request for request in self.requests if request.repeated(threshold)
+        ]
+        assert not offenders, "N+1 queries:\n" + "\n".join(map(str, offenders))
+
+    def clear(self):
+        self.statements.clear()
+        self.requests.clear()
+
+
 @pytest.fixture(scope="function")
-def test_client(db_session):
+def sql_queries(request, db_session):
+    """
+    Count the statements run on the test database, per test client request.
+
+    Requests that repeat a statement N_PLUS_ONE_THRESHOLD times raise an
+    NPlusOneWarning at the end of the test. Tests that expect it can be marked with
+    ``@pytest.mark.filterwarnings("ignore::tests.conftest.NPlusOneWarning")``.
+    """
+    counter = QueryCounter()
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", counter.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", counter.after_cursor_execute)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter.before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", counter.after_cursor_execute)
+    for request_queries in counter.requests:
+        if request_queries.repeated():
+            warnings.warn(f"N+1 queries in {request_queries}", NPlusOneWarning)
+
+
+@pytest.fixture(scope="function")
+def test_client(db_session, sql_queries):
     """Create a test client that uses the override_get_db fixture to return a session."""
 
-    def override_get_db():
+    def override_get_db(request: Request):
+        sql_queries.start_request(request.method, request.url.path)
         try:
             yield db_session
         finally:
+            sql_queries.end_request()
             db_session.close()
 
     app.dependency_overrides[get_db] = override_get_db
@@ -81,6 +216,45 @@ def test_client(db_session):
         yield test_client
 
 
+@pytest.fixture(scope="function")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_db_session(db_url):
+    """Create a new async database session with a rollback at the end of the test."""
+    engine = create_async_engine(to_async_url(db_url), poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    connection = await engine.connect()
+    transaction = await connection.begin()
+    session = AsyncSession(bind=connection, autoflush=False, expire_on_commit=False)
+    yield session
+    await session.close()
+    await transaction.rollback()
+    await connection.close()
+    await engine.dispose()
+
+
+@pytest.fixture(scope="function")
+async def async_test_client(async_db_session):
+    """Create an async client for the async routes that uses the async test session."""
+    async_app = FastAPI()
+    async_app.include_router(async_routes.router, prefix="/api/v1")
+
+    async def override_get_async_db():
+        yield async_db_session
+
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = ASGITransport(app=async_app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as client:
+        yield client
+
+
 @pytest.fixture(scope="function")
 def property_endpoint():
     return "/api/v1/property/"
@@ -131,3 +305,50 @@ def update_mortgage_payload():
     return {
         "interest_rate": 2.5,
     }
+
+
+@pytest.fixture(scope="function")
+def create_portfolio(
+    test_client,
+    property_payload,
+    mortgage_payload,
+    property_endpoint,
+    mortgage_endpoint,
+):
+    """
+    Create properties, then mortgages on them, through the API.
+
+    Each property is property_payload updated with one dict of ``properties``, and
+    each mortgage is a ``(property index, dict)`` pair of ``mortgages`` updating
+    mortgage_payload. Returns the property ids and the mortgage ids.
+    """
+
+    def create(properties=({},), mortgages=()):
+        property_ids = []
+        for overrides in properties:
+            response = test_client.post(
+                property_endpoint, json={**property_payload, **overrides}
+            )
+            property_ids.append(response.json()["data"]["id"])
+
+        mortgage_ids = []
+        for index, overrides in mortgages:
+            response = test_client.post(
+                mortgage_endpoint,
+                json={
+                    **mortgage_payload,
+                    "property_id": property_ids[index],
+                    **overrides,
+                },
+            )
+            mortgage_ids.append(response.json()["data"]["id"])
+        return property_ids, mortgage_ids
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def mortgage_id(create_portfolio):
+    """A mortgage_payload mortgage on a property_payload property."""
+    _, [mortgage_id] = create_portfolio(mortgages=[(0, {})])
+    return mortgage_id
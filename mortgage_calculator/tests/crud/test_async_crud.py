@@ -0,0 +1,157 @@
+import inspect
+
+import pytest
+
+from app import async_routes, routes
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_property_crud(
+    async_test_client, property_payload, update_property_payload, property_endpoint
+):
+    # Create a property
+    create_response = await async_test_client.post(
+        property_endpoint, json=property_payload
+    )
+    assert create_response.status_code == 201
+    property_id = create_response.json()["data"]["id"]
+
+    # Get the property
+    get_response = await async_test_client.get(f"{property_endpoint}{property_id}")
+    assert get_response.status_code == 200
+    assert get_response.json()["data"]["property_name"] == "123 Elm Steet"
+
+    # Update the property
+    update_response = await async_test_client.patch(
+        f"{property_endpoint}{property_id}", json=update_property_payload
+    )
+    property_data = update_response.json()["data"]
+    assert update_response.status_code == 202
+    assert property_data["property_name"] == update_property_payload["property_name"]
+    assert property_data["purchase_price"] == property_payload["purchase_price"]
+    assert property_data["updatedAt"] is not None
+
+    # List the properties
+    list_response = await async_test_client.get(
+        "/api/v1/property", params={"limit": 100}
+    )
+    assert list_response.status_code == 200
+    assert property_id in {
+        property_["id"] for property_ in list_response.json()["data"]
+    }
+
+    # Delete the property
+    delete_response = await async_test_client.delete(
+        f"{property_endpoint}{property_id}"
+    )
+    assert delete_response.status_code == 202
+    get_response = await async_test_client.get(f"{property_endpoint}{property_id}")
+    assert get_response.status_code == 404
+    assert get_response.json()["detail"] == "Property not found."
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_mortgage_crud(
+    async_test_client,
+    property_payload,
+    mortgage_payload,
+    update_mortgage_payload,
+    property_endpoint,
+    mortgage_endpoint,
+):
+    # Create a property and a mortgage on it
+    create_response = await async_test_client.post(
+        property_endpoint, json=property_payload
+    )
+    assert create_response.status_code == 201
+    mortgage_payload["property_id"] = create_response.json()["data"]["id"]
+
+    create_response = await async_test_client.post(
+        mortgage_endpoint, json=mortgage_payload
+    )
+    assert create_response.status_code == 201
+    mortgage_data = create_response.json()["data"]
+    assert mortgage_data["mortgage_amount"] == 300000
+    mortgage_id = mortgage_data["id"]
+
+    # Update the mortgage
+    update_response = await async_test_client.patch(
+        f"{mortgage_endpoint}{mortgage_id}", json=update_mortgage_payload
+    )
+    assert update_response.status_code == 202
+    assert update_response.json()["data"]["interest_rate"] == 2.5
+    assert update_response.json()["data"]["updatedAt"] is not None
+
+    # Delete the mortgage
+    delete_response = await async_test_client.delete(
+        f"{mortgage_endpoint}{mortgage_id}"
+    )
+    assert delete_response.status_code == 202
+    get_response = await async_test_client.get(f"{mortgage_endpoint}{mortgage_id}")
+    assert get_response.status_code == 404
+    assert get_response.json()["detail"] == "Mortgage not found."
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_create_mortgage_property_doesnt_exist(
+    async_test_client, mortgage_payload, mortgage_endpoint
+):
+    mortgage_payload["property_id"] = "00000000-0000-0000-0000-000000000000"
+    create_response = await async_test_client.post(
+        mortgage_endpoint, json=mortgage_payload
+    )
+    assert create_response.status_code == 404
+    assert create_response.json() == {"detail": "Property not found."}
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_list_follows_cursor(
+    async_test_client, property_payload, property_endpoint
+):
+    property_ids = set()
+    for number in range(5):
+        property_payload["property_name"] = f"Async page {number}"
+        create_response = await async_test_client.post(
+            property_endpoint, json=property_payload
+        )
+        property_ids.add(create_response.json()["data"]["id"])
+
+    # Rows created in the same second as a cursor row are on the next page
+    listed_ids = []
+    params = {"limit": 2}
+    while True:
+        list_response = await async_test_client.get("/api/v1/property", params=params)
+        assert list_response.status_code == 200
+        listed_ids += [property_["id"] for property_ in list_response.json()["data"]]
+        next_cursor = list_response.json()["next_cursor"]
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+    assert len(listed_ids) == len(set(listed_ids))
+    assert property_ids <= set(listed_ids)
+
+
+@pytest.mark.unit
+def test_replace_routes_keeps_sync_order():
+    merged_router = async_routes.replace_routes(routes.router, async_routes.router)
+    assert [route.path for route in merged_router.routes] == [
+        route.path for route in routes.router.routes
+    ]
+    endpoints = {
+        (route.path, frozenset(route.methods)): route.endpoint
+        for route in merged_router.routes
+    }
+    assert inspect.iscoroutinefunction(
+        endpoints[("/property/{property_id}", frozenset({"GET"}))]
+    )
+    assert not inspect.iscoroutinefunction(
+        endpoints[("/mortgage/{mortgage_id}/payment", frozenset({"POST"}))]
+    )
@@ -0,0 +1,160 @@
+import fnmatch
+import threading
+
+import pytest
+
+from app import cache
+
+
+class FakeRedis:
+    """Just enough of the redis.Redis API for the cache, with a settable clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.values = {}
+        self.threads = set()
+
+    def get(self, name):
+        self.threads.add(threading.get_ident())
+        value, expires_at = self.values.get(name, (None, None))
+        if expires_at is not None and expires_at <= self.now:
+            del self.values[name]
+            return None
+        return value
+
+    def set(self, name, value, px=None):
+        self.threads.add(threading.get_ident())
+        expires_at = None if px is None else self.now + px / 1000
+        self.values[name] = (value.encode(), expires_at)
+
+    def delete(self, *names):
+        self.threads.add(threading.get_ident())
+        for name in names:
+            self.values.pop(name, None)
+
+    def scan_iter(self, match="*"):
+        return [name for name in list(self.values) if fnmatch.fnmatch(name, match)]
+
+
+@pytest.fixture(scope="function")
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "backend", cache.RedisCache(client, ttl=60))
+    return client
+
+
+@pytest.mark.unit
+def test_lru_cache_expires_entries():
+    now = [0.0]
+    lru_cache = cache.LRUCache(maxsize=10, ttl=5, timer=lambda: now[0])
+    lru_cache.set("key", {"value": 1})
+    now[0] = 4.9
+    assert lru_cache.get("key") == {"value": 1}
+    now[0] = 5
+    assert lru_cache.get("key") is None
+
+
+@pytest.mark.unit
+def test_lru_cache_evicts_least_recently_used():
+    lru_cache = cache.LRUCache(maxsize=2, ttl=60)
+    lru_cache.set("a", 1)
+    lru_cache.set("b", 2)
+    lru_cache.get("a")
+    lru_cache.set("c", 3)
+    assert lru_cache.get("a") == 1
+    assert lru_cache.get("b") is None
+    assert lru_cache.get("c") == 3
+
+
+@pytest.mark.unit
+def test_redis_cache(fake_redis):
+    cache.put("a", {"value": 1})
+    cache.put("b", [1, 2])
+    assert cache.get("a") == {"value": 1}
+    assert "mortgage_calculator:a" in fake_redis.values
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == [1, 2]
+
+    fake_redis.now = 60
+    assert cache.get("b") is None
+
+
+@pytest.mark.unit
+def test_cache_key_normalises_ids():
+    id_ = "6F1D4C8A-0B6E-4E57-9D4B-3F0C2A1E5B7D"
+    assert cache.cache_key("mortgage", id_) == cache.cache_key("mortgage", id_.lower())
+    assert cache.cache_key("mortgage", "not-a-uuid") is None
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_get_property_is_cached(test_client, property_payload, property_endpoint):
+    create_response = test_client.post(property_endpoint, json=property_payload)
+    property_id = create_response.json()["data"]["id"]
+
+    first_response = test_client.get(f"{property_endpoint}{property_id}")
+    assert cache.get(cache.cache_key("property", property_id)) is not None
+    second_response = test_client.get(f"{property_endpoint}{property_id.upper()}")
+    assert second_response.json() == first_response.json()
+
+    # Updating the property invalidates the cached response
+    update_response = test_client.patch(
+        f"{property_endpoint}{property_id}", json={"property_name": "New name"}
+    )
+    assert update_response.status_code == 202
+    get_response = test_client.get(f"{property_endpoint}{property_id}")
+    assert get_response.json()["data"]["property_name"] == "New name"
+
+    delete_response = test_client.delete(f"{property_endpoint}{property_id}")
+    assert delete_response.status_code == 202
+    assert test_client.get(f"{property_endpoint}{property_id}").status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.integration
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_mortgage_payment_cache_is_invalidated(
+    request, test_client, mortgage_id, mortgage_endpoint, backend
+):
+    if backend == "redis":
+        request.getfixturevalue("fake_redis")
+
+    payment_url = f"{mortgage_endpoint}{mortgage_id}/payment"
+    first_payment = test_client.post(payment_url).json()["monthly_payment"]
+    assert cache.get(cache.cache_key("mortgage_payment", mortgage_id)) is not None
+    assert test_client.post(payment_url).json()["monthly_payment"] == first_payment
+
+    test_client.get(f"{mortgage_endpoint}{mortgage_id}")
+    update_response = test_client.patch(
+        f"{mortgage_endpoint}{mortgage_id}", json={"interest_rate": 5}
+    )
+    assert update_response.status_code == 202
+    assert cache.get(cache.cache_key("mortgage", mortgage_id)) is None
+    assert test_client.post(payment_url).json()["monthly_payment"] > first_payment
+    get_response = test_client.get(f"{mortgage_endpoint}{mortgage_id}")
+    assert get_response.json()["data"]["interest_rate"] == 5
+
+    delete_response = test_client.delete(f"{mortgage_endpoint}{mortgage_id}")
+    assert delete_response.status_code == 202
+    assert test_client.post(payment_url).status_code == 404
+    assert test_client.get(f"{mortgage_endpoint}{mortgage_id}").status_code == 404
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_crud_calls_redis_off_the_event_loop(
+    async_test_client, fake_redis, property_payload, property_endpoint
+):
+    create_response = await async_test_client.post(
+        property_endpoint, json=property_payload
+    )
+    property_url = f"{property_endpoint}{create_response.json()['data']['id']}"
+    await async_test_client.get(property_url)
+    assert (await async_test_client.get(property_url)).status_code == 200
+    await async_test_client.patch(property_url, json={"property_name": "New name"})
+
+    assert fake_redis.threads
+    assert threading.get_ident() not in fake_redis.threads
@@ -0,0 +1,109 @@
+import pytest
+
+
+@pytest.fixture(scope="function")
+def property_url(test_client, property_payload, property_endpoint):
+    create_response = test_client.post(property_endpoint, json=property_payload)
+    return f"{property_endpoint}{create_response.json()['data']['id']}"
+
+
+@pytest.fixture(scope="function")
+def mortgage_url(mortgage_id, mortgage_endpoint):
+    return f"{mortgage_endpoint}{mortgage_id}"
+
+
+@pytest.mark.api
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "resource_url, update_payload",
+    [
+        ("property_url", {"property_name": "456 Elm Street"}),
+        ("mortgage_url", {"interest_rate": 2.5}),
+    ],
+)
+def test_get_if_none_match(
+    request, test_client, sql_queries, resource_url, update_payload
+):
+    url = request.getfixturevalue(resource_url)
+    get_response = test_client.get(url)
+    etag = get_response.headers["ETag"]
+    assert get_response.status_code == 200
+    assert "Last-Modified" in get_response.headers
+
+    # A current copy is answered with a 304 after selecting only the row's version
+    not_modified_response = test_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified_response.status_code == 304
+    assert not_modified_response.content == b""
+    assert not_modified_response.headers["ETag"] == etag
+    sql_queries.assert_max_queries(1)
+    [statement] = sql_queries.last.statements
+    assert "version" in statement.sql
+    assert "property_name" not in statement.sql
+    assert "mortgage_amount" not in statement.sql
+
+    weak_response = test_client.get(url, headers={"If-None-Match": f'"x", W/{etag}'})
+    assert weak_response.status_code == 304
+
+    # Updating the resource changes its ETag
+    update_response = test_client.patch(url, json=update_payload)
+    assert update_response.status_code == 202
+    assert update_response.json()["data"]["version"] == 2
+    modified_response = test_client.get(url, headers={"If-None-Match": etag})
+    assert modified_response.status_code == 200
+    assert modified_response.headers["ETag"] == '"2"'
+    assert test_client.get(url).headers["ETag"] == modified_response.headers["ETag"]
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_updates_within_a_second(test_client, property_url):
+    # SQLite stores updatedAt to the second, so both updates may share it
+    test_client.patch(property_url, json={"property_name": "1 First Street"})
+    etag = test_client.get(property_url).headers["ETag"]
+    test_client.patch(property_url, json={"property_name": "2 Second Street"})
+
+    response = test_client.get(property_url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["property_name"] == "2 Second Street"
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_get_if_modified_since(test_client, property_url):
+    last_modified = test_client.get(property_url).headers["Last-Modified"]
+
+    response = test_client.get(
+        property_url, headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = test_client.get(
+        property_url, headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_conditional_get_not_found(test_client, property_endpoint):
+    response = test_client.get(
+        f"{property_endpoint}6f1d4c8a-0b6e-4e57-9d4b-3f0c2a1e5b7d",
+        headers={"If-None-Match": "*"},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+@pytest.mark.api
+@pytest.mark.integration
+async def test_async_get_if_none_match(
+    async_test_client, property_payload, property_endpoint
+):
+    create_response = await async_test_client.post(
+        property_endpoint, json=property_payload
+    )
+    url = f"{property_endpoint}{create_response.json()['data']['id']}"
+    etag = (await async_test_client.get(url)).headers["ETag"]
+
+    response = await async_test_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,66 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture(scope="function")
+def property_ids(create_portfolio):
+    property_ids, _ = create_portfolio(
+        properties=[{"property_name": f"Flat {i}, Elm Street"} for i in range(3)]
+    )
+    return property_ids
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_export_properties_ndjson(test_client, property_ids):
+    response = test_client.get(
+        "/api/v1/property/export", headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = {row["id"]: row for row in rows}
+    assert set(property_ids) <= set(exported)
+    assert exported[property_ids[1]]["property_name"] == "Flat 1, Elm Street"
+    assert exported[property_ids[1]]["purchase_price"] == 300000
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_export_properties_csv_gzip(test_client, property_ids):
+    with test_client.stream(
+        "GET",
+        "/api/v1/property/export",
+        params={"format": "csv"},
+        headers={"Accept-Encoding": "gzip"},
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "properties.csv" in response.headers["content-disposition"]
+        body = gzip.decompress(b"".join(response.iter_raw()))
+
+    rows = list(csv.DictReader(io.StringIO(body.decode())))
+    assert set(property_ids) <= {row["id"] for row in rows}
+    assert "Flat 2, Elm Street" in {row["property_name"] for row in rows}
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_export_mortgages(
+    test_client, property_ids, mortgage_payload, mortgage_endpoint
+):
+    mortgage_payload["property_id"] = property_ids[0]
+    create_response = test_client.post(mortgage_endpoint, json=mortgage_payload)
+    mortgage_id = create_response.json()["data"]["id"]
+
+    response = test_client.get("/api/v1/mortgage/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = {row["id"]: row for row in csv.DictReader(io.StringIO(response.text))}
+    assert rows[mortgage_id]["property_id"] == property_ids[0]
+    assert rows[mortgage_id]["mortgage_type"] == "repayment"
@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 
 
@@ -124,3 +126,84 @@ def test_delete_mortgage(
     get_response = test_client.get(f"{mortgage_endpoint}{mortgage_id}")
     assert get_response.status_code == 404
     assert get_response.json()["detail"] == "Mortgage not found."
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_list_mortgages_pagination(
+    test_client,
+    property_payload,
+    mortgage_payload,
+    property_endpoint,
+    mortgage_endpoint,
+):
+    # Create a property
+    create_response = test_client.post(property_endpoint, json=property_payload)
+    assert create_response.status_code == 201
+    mortgage_payload["property_id"] = create_response.json()["data"]["id"]
+
+    # Create 3 mortgages
+    mortgage_ids = []
+    for _ in range(3):
+        create_response = test_client.post(mortgage_endpoint, json=mortgage_payload)
+        assert create_response.status_code == 201
+        mortgage_ids.append(create_response.json()["data"]["id"])
+
+    # Walk through every page using the cursor from the previous page
+    listed_ids = []
+    cursor = None
+    for _ in range(100):
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        list_response = test_client.get("/api/v1/mortgage", params=params)
+        assert list_response.status_code == 200
+        list_response_json = list_response.json()
+        listed_ids.extend(mortgage["id"] for mortgage in list_response_json["data"])
+        cursor = list_response_json["next_cursor"]
+        if cursor is None:
+            break
+    else:
+        pytest.fail("The cursor never reached the last page.")
+
+    assert len(listed_ids) == len(set(listed_ids))
+    assert set(mortgage_ids) <= set(listed_ids)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_bulk_create_mortgages(
+    test_client, property_payload, mortgage_payload, property_endpoint
+):
+    # Create two properties with different purchase prices
+    property_ids = []
+    for purchase_price in (300000, 200000):
+        create_response = test_client.post(
+            property_endpoint,
+            json={**property_payload, "purchase_price": purchase_price},
+        )
+        assert create_response.status_code == 201
+        property_ids.append(create_response.json()["data"]["id"])
+
+    rows = [
+        {**mortgage_payload, "property_id": property_ids[0], "loan_to_value": 75},
+        {**mortgage_payload, "property_id": property_ids[1], "loan_to_value": 50},
+        {**mortgage_payload, "property_id": str(uuid.uuid4())},
+        {**mortgage_payload, "property_id": property_ids[0], "mortgage_type": "x"},
+        {**mortgage_payload, "property_id": property_ids[1], "loan_to_value": 80},
+    ]
+    response = test_client.post(
+        "/api/v1/mortgage/bulk", json=rows, params={"chunk_size": 2}
+    )
+    response_json = response.json()
+    assert response.status_code == 200
+    assert response_json["inserted"] == 3
+    assert [error["row"] for error in response_json["errors"]] == [2, 3]
+    assert response_json["errors"][0]["errors"][0]["msg"] == "Property not found."
+
+    # Mortgage amounts are calculated from the purchase price of each property
+    list_response = test_client.get("/api/v1/mortgage/", params={"limit": 100})
+    amounts = sorted(
+        mortgage["mortgage_amount"]
+        for mortgage in list_response.json()["data"]
+        if mortgage["property_id"] == property_ids[1]
+    )
+    assert amounts == [100000, 160000]
@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+
 import pytest
 
 
@@ -66,3 +70,119 @@ def test_delete_property(test_client, property_payload, property_endpoint):
     get_response = test_client.get(f"/api/v1/property/{property_id}")
     assert get_response.status_code == 404
     assert get_response.json()["detail"] == "Property not found."
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_list_properties_pagination(test_client, property_payload, property_endpoint):
+    property_ids = []
+    for i in range(5):
+        property_payload["property_name"] = f"Property {i}"
+        create_response = test_client.post(property_endpoint, json=property_payload)
+        assert create_response.status_code == 201
+        property_ids.append(create_response.json()["data"]["id"])
+
+    # Walk through every page using the cursor from the previous page
+    listed_ids = []
+    cursor = None
+    for _ in range(100):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        list_response = test_client.get("/api/v1/property", params=params)
+        assert list_response.status_code == 200
+        list_response_json = list_response.json()
+        assert len(list_response_json["data"]) <= 2
+        listed_ids.extend(property_["id"] for property_ in list_response_json["data"])
+        cursor = list_response_json["next_cursor"]
+        if cursor is None:
+            break
+    else:
+        pytest.fail("The cursor never reached the last page.")
+
+    assert len(listed_ids) == len(set(listed_ids))
+    assert set(property_ids) <= set(listed_ids)
+
+
+@pytest.mark.api
+@pytest.mark.unit
+def test_list_properties_invalid_cursor(test_client):
+    list_response = test_client.get("/api/v1/property", params={"cursor": "invalid"})
+    assert list_response.status_code == 400
+    assert list_response.json() == {"detail": "Invalid cursor."}
+
+
+@pytest.mark.api
+@pytest.mark.unit
+def test_list_properties_limit_too_large(test_client):
+    list_response = test_client.get("/api/v1/property", params={"limit": 1000})
+    assert list_response.status_code == 422
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_bulk_create_properties_json(test_client, property_payload):
+    rows = [property_payload, {**property_payload, "purchase_price": "abc"}]
+    response = test_client.post(
+        "/api/v1/property/bulk", json=rows, params={"chunk_size": 1}
+    )
+    response_json = response.json()
+    assert response.status_code == 200
+    assert response_json["inserted"] == 1
+    assert [error["row"] for error in response_json["errors"]] == [1]
+    assert response_json["errors"][0]["errors"][0]["loc"] == ["purchase_price"]
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_bulk_create_properties_ndjson(test_client, property_payload):
+    body = "\n".join([json.dumps(property_payload)] * 3 + ["not json"]) + "\n"
+    response = test_client.post(
+        "/api/v1/property/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    response_json = response.json()
+    assert response.status_code == 200
+    assert response_json["inserted"] == 3
+    assert [error["row"] for error in response_json["errors"]] == [3]
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_bulk_create_properties_csv(test_client, property_payload):
+    fieldnames = list(property_payload)
+    rows = [
+        {**property_payload, "property_name": 'Flat 1, "The Mews"'},
+        {**property_payload, "property_name": "Line\nbreak"},
+    ]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    response = test_client.post(
+        "/api/v1/property/bulk",
+        content=buffer.getvalue(),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 2
+    assert response.json()["errors"] == []
+
+    names = [
+        item["property_name"]
+        for item in test_client.get("/api/v1/property/", params={"limit": 100}).json()[
+            "data"
+        ]
+    ]
+    assert 'Flat 1, "The Mews"' in names
+    assert "Line\nbreak" in names
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_bulk_create_properties_unsupported_content_type(test_client):
+    response = test_client.post(
+        "/api/v1/property/bulk",
+        content="<rows/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
@@ -0,0 +1,85 @@
+import pytest
+
+
+@pytest.fixture(scope="function")
+def no_returning(db_session, monkeypatch):
+    # Act like SQLite before 3.35, which has no UPDATE ... RETURNING
+    monkeypatch.setattr(db_session.get_bind().dialect, "update_returning", False)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_update_and_delete_run_one_statement(
+    test_client,
+    sql_queries,
+    property_payload,
+    mortgage_payload,
+    update_mortgage_payload,
+    property_endpoint,
+    mortgage_endpoint,
+):
+    property_id = test_client.post(property_endpoint, json=property_payload).json()[
+        "data"
+    ]["id"]
+    mortgage_payload["property_id"] = property_id
+    mortgage_id = test_client.post(mortgage_endpoint, json=mortgage_payload).json()[
+        "data"
+    ]["id"]
+
+    update_response = test_client.patch(
+        f"{mortgage_endpoint}{mortgage_id}", json=update_mortgage_payload
+    )
+    assert update_response.status_code == 202
+    assert update_response.json()["data"]["interest_rate"] == 2.5
+    assert update_response.json()["data"]["updatedAt"] is not None
+    assert len(sql_queries.last.statements) == 1
+    assert sql_queries.last.statements[0].sql.startswith("UPDATE mortgages")
+
+    assert test_client.delete(f"{mortgage_endpoint}{mortgage_id}").status_code == 202
+    assert len(sql_queries.last.statements) == 1
+
+    assert test_client.delete(f"{mortgage_endpoint}{mortgage_id}").status_code == 404
+    assert len(sql_queries.last.statements) == 1
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_update_without_returning(
+    test_client,
+    no_returning,
+    sql_queries,
+    property_payload,
+    update_property_payload,
+    property_endpoint,
+):
+    property_id = test_client.post(property_endpoint, json=property_payload).json()[
+        "data"
+    ]["id"]
+
+    update_response = test_client.patch(
+        f"{property_endpoint}{property_id}", json=update_property_payload
+    )
+    assert update_response.status_code == 202
+    assert update_response.json()["data"]["property_name"] == "456 Elm Street"
+    # The UPDATE, then a SELECT of the updated row
+    assert len(sql_queries.last.statements) == 2
+
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    response = test_client.patch(
+        f"{property_endpoint}{missing_id}", json=update_property_payload
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_update_without_fields(test_client, property_payload, property_endpoint):
+    property_id = test_client.post(property_endpoint, json=property_payload).json()[
+        "data"
+    ]["id"]
+    response = test_client.patch(f"{property_endpoint}{property_id}", json={})
+    assert response.status_code == 400
+
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    response = test_client.patch(f"{property_endpoint}{missing_id}", json={})
+    assert response.status_code == 404
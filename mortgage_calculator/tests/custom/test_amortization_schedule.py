@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.custom.calculations import (
+    calculate_amortization_schedule,
+    calculate_repayment_mortgage_payment,
+)
+
+
+@pytest.mark.unit
+def test_repayment_schedule():
+    loan_amount = 100000
+    annual_interest_rate = 3
+    loan_term_years = 30
+    schedule = calculate_amortization_schedule(
+        loan_amount, annual_interest_rate, loan_term_years
+    )
+    monthly_payment = calculate_repayment_mortgage_payment(
+        loan_amount, annual_interest_rate, loan_term_years
+    )
+    assert len(schedule["month"]) == 360
+    assert schedule["interest"][0] == 250
+    assert schedule["principal"][0] == pytest.approx(monthly_payment - 250)
+    assert (schedule["payment"][:-1] == monthly_payment).all()
+    assert schedule["principal"].sum() == pytest.approx(loan_amount, abs=1)
+    assert schedule["balance"][-1] == 0
+
+
+@pytest.mark.unit
+def test_interest_only_schedule():
+    schedule = calculate_amortization_schedule(100000, 3, 25, "interest_only")
+    assert len(schedule["month"]) == 300
+    assert (schedule["interest"] == 250).all()
+    assert (schedule["balance"][:-1] == 100000).all()
+    assert schedule["principal"][-1] == 100000
+    assert schedule["balance"][-1] == 0
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_schedule_endpoint(test_client, property_payload, mortgage_payload):
+    # Create a property
+    create_response = test_client.post("/api/v1/property/", json=property_payload)
+    assert create_response.status_code == 201
+    property_id = create_response.json()["data"]["id"]
+
+    # Create a Repayment mortgage
+    mortgage_payload["property_id"] = property_id
+    create_response = test_client.post("/api/v1/mortgage/", json=mortgage_payload)
+    assert create_response.status_code == 201
+    mortgage_id = create_response.json()["data"]["id"]
+
+    # Get the schedule as NDJSON
+    response = test_client.get(f"/api/v1/mortgage/{mortgage_id}/schedule")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 360
+    assert rows[0] == {
+        "mortgage_id": mortgage_id,
+        "month": 1,
+        "payment": 1264.81,
+        "interest": 750.0,
+        "principal": 514.81,
+        "balance": 299485.19,
+    }
+    assert rows[-1]["balance"] == 0
+
+    # Get the schedule as CSV
+    response = test_client.get(f"/api/v1/mortgage/{mortgage_id}/schedule?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 360
+    assert rows[0]["payment"] == "1264.81"
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_schedule_not_found(test_client):
+    response = test_client.get(
+        "/api/v1/mortgage/00000000-0000-0000-0000-000000000000/schedule"
+    )
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Mortgage not found."}
+
+
+@pytest.mark.unit
+def test_schedule_shorter_than_a_month():
+    schedule = calculate_amortization_schedule(100000, 3, 0)
+    assert all(len(column) == 0 for column in schedule.values())
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_schedule_zero_term(test_client, property_payload, mortgage_payload):
+    create_response = test_client.post("/api/v1/property/", json=property_payload)
+    mortgage_payload["property_id"] = create_response.json()["data"]["id"]
+    mortgage_payload["loan_term"] = 0
+    create_response = test_client.post("/api/v1/mortgage/", json=mortgage_payload)
+    assert create_response.status_code == 201
+    mortgage_id = create_response.json()["data"]["id"]
+
+    response = test_client.get(f"/api/v1/mortgage/{mortgage_id}/schedule")
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "A loan term of at least one month is required to build the schedule."
+    }
@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from app.custom.calculations import calculate_monthly_payments, calculate_roi
+
+
+@pytest.mark.unit
+def test_calculate_roi():
+    metrics = calculate_roi(
+        purchase_prices=[300000, 200000],
+        rental_incomes=[2500, 1000],
+        renovation_costs=[50000, 0],
+        admin_costs=[3000, 0],
+        management_fees=[200, 100],
+        mortgage_debts=[225000, 200000],
+        monthly_mortgage_payments=[1000, 0],
+    )
+    assert metrics["total_cost"].tolist() == [353000, 200000]
+    assert metrics["cash_invested"].tolist() == [128000, 0]
+    assert metrics["monthly_cashflow"].tolist() == [1300, 900]
+    assert metrics["gross_yield"][0] == pytest.approx(10)
+    assert metrics["net_yield"][0] == pytest.approx(2300 * 12 / 353000 * 100)
+    assert metrics["roi"][0] == pytest.approx(1300 * 12 / 353000 * 100)
+    assert metrics["cash_on_cash_return"][0] == pytest.approx(1300 * 12 / 128000 * 100)
+    # Fully financed, so there is no cash invested to return on
+    assert math.isnan(metrics["cash_on_cash_return"][1])
+
+
+@pytest.fixture(scope="function")
+def property_ids(create_portfolio):
+    property_ids, _ = create_portfolio(
+        properties=[{"rental_income": income} for income in (2500, 1500, 3500)],
+        mortgages=[(0, {"loan_to_value": 75})],
+    )
+    return property_ids
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_get_property_roi(test_client, property_ids, property_payload):
+    response = test_client.get(f"/api/v1/property/{property_ids[0]}/roi")
+    assert response.status_code == 200
+    data = response.json()["data"]
+
+    [monthly_payment] = calculate_monthly_payments([225000], [3], [30], ["repayment"])
+    monthly_cashflow = 2500 - property_payload["management_fees"] - monthly_payment
+    assert data["cash_invested"] == 353000 - 225000
+    assert data["monthly_cashflow"] == pytest.approx(monthly_cashflow)
+    assert data["roi"] == pytest.approx(monthly_cashflow * 12 / 353000 * 100)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_get_property_roi_not_found(test_client):
+    response = test_client.get(
+        "/api/v1/property/6f1d4c8a-0b6e-4e57-9d4b-3f0c2a1e5b7d/roi"
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_get_portfolio_roi_ranking(test_client, property_ids):
+    response = test_client.get(
+        "/api/v1/portfolio/roi", params={"rank_by": "gross_yield", "limit": 1000}
+    )
+    assert response.status_code == 200
+    ranking = [row["property_id"] for row in response.json()["data"]]
+    positions = [ranking.index(property_id) for property_id in property_ids]
+    # Same purchase price, so gross yield follows the rent: 3500, 2500, 1500
+    assert positions[2] < positions[0] < positions[1]
+
+    response = test_client.get("/api/v1/portfolio/roi", params={"limit": 1})
+    assert len(response.json()["data"]) == 1
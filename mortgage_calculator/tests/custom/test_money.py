@@ -0,0 +1,187 @@
+import json
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+import app.custom.money as money
+from app.custom.calculations import calculate_monthly_payments
+
+
+def exact_payment_pence(loan_pence, rate, years, mortgage_type):
+    """Reference payment from exact fractions, rounded half to even."""
+    monthly_rate = Fraction(Decimal(rate)) / 1200
+    if mortgage_type == "interest_only":
+        return round(loan_pence * monthly_rate)
+    if monthly_rate == 0:
+        return round(Fraction(loan_pence, years * 12))
+    growth = (1 + monthly_rate) ** (years * 12)
+    return round(loan_pence * monthly_rate * growth / (growth - 1))
+
+
+def random_grid(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(100, 10_000_000_00, size).tolist(),
+        [money.from_pence(bp) for bp in rng.integers(0, 1500, size).tolist()],
+        rng.integers(1, 41, size).tolist(),
+        np.where(rng.random(size) < 0.2, "interest_only", "repayment").tolist(),
+    )
+
+
+@pytest.mark.unit
+def test_monthly_payment_pence():
+    assert money.monthly_payment_pence(100000_00, 3, 30, "repayment") == 421_60
+    assert money.monthly_payment_pence(100000_00, 3, None, "interest_only") == 250_00
+    assert money.monthly_payment_pence(120000_00, 0, 10, "repayment") == 1000_00
+    # 500.005 pence is a tie, which rounds to the even penny
+    assert money.monthly_payment_pence(1000_01, 6, None, "interest_only") == 5_00
+    with pytest.raises(ValueError, match="Unsupported mortgage type."):
+        money.monthly_payment_pence(100000_00, 3, 30, "unsupported")
+
+
+@pytest.mark.unit
+def test_pence_kernel_is_exact():
+    for row in zip(*random_grid(2000)):
+        assert money.monthly_payment_pence(*row) == exact_payment_pence(*row)
+
+
+@pytest.mark.unit
+def test_pence_kernel_exact_fallback(monkeypatch):
+    # With a coarse fixed-point factor most payments need the exact division
+    monkeypatch.setattr(money, "FIXED_POINT_BITS", 12)
+    monkeypatch.setattr(money, "_HALF", 1 << 11)
+    money._annuity_factor.cache_clear()
+    try:
+        for row in zip(*random_grid(500, seed=1)):
+            assert money.monthly_payment_pence(*row) == exact_payment_pence(*row)
+    finally:
+        money._annuity_factor.cache_clear()
+
+
+@pytest.mark.unit
+def test_pence_kernel_matches_float_path():
+    loan_pence, rates, terms, types = random_grid(20000, seed=2)
+    pence = np.array(
+        [
+            money.monthly_payment_pence(*row)
+            for row in zip(loan_pence, rates, terms, types)
+        ]
+    )
+    float_payments = calculate_monthly_payments(
+        [money.from_pence(amount) for amount in loan_pence], rates, terms, types
+    )
+    # Float repayments at a 0% rate are not rounded to the penny
+    rounded = np.round(float_payments * 100).astype(np.int64)
+    differences = np.abs(rounded - pence)
+    assert differences.max() <= 1
+    # Only amounts within float error of a half penny can round differently
+    assert np.count_nonzero(differences) <= len(pence) // 10000
+
+
+@pytest.mark.unit
+def test_pence_kernel_range():
+    # Long terms and rates with many decimal places take the float formula
+    for rate, years in ((3, 100), (3.3333333333333335, 30), (150, 30), (-1, 30)):
+        [payment] = calculate_monthly_payments([100000], [rate], [years], ["repayment"])
+        assert money.monthly_payment_pence(100000_00, rate, years, "repayment") == (
+            round(payment * 100)
+        )
+    with pytest.raises(ValueError, match="out of range"):
+        money._annuity_factor(3, 1200, money.MAX_EXACT_MONTHS + 1)
+
+
+@pytest.mark.unit
+def test_calculate_monthly_payments_modes(monkeypatch):
+    args = (
+        [Decimal("225000.00")],
+        [Decimal("3.00")],
+        [Decimal("30.00")],
+        ["repayment"],
+    )
+    assert money.calculate_monthly_payments(*args).tolist() == [948.61]
+    monkeypatch.setattr(money, "MONEY_PRECISION", "pence")
+    assert money.calculate_monthly_payments(*args).tolist() == [948.61]
+
+
+@pytest.mark.unit
+def test_calculate_mortgage_amount(monkeypatch):
+    monkeypatch.setattr(money, "MONEY_PRECISION", "pence")
+    assert money.calculate_mortgage_amount(Decimal("123456.78"), 12.34) == Decimal(
+        "15234.57"
+    )
+    assert money.calculate_mortgage_amount(Decimal("0.10"), 0.5) == Decimal("0.00")
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_pence_mode_payment(
+    test_client, property_payload, property_endpoint, mortgage_endpoint, monkeypatch
+):
+    monkeypatch.setattr(money, "MONEY_PRECISION", "pence")
+    create_response = test_client.post(
+        property_endpoint, json={**property_payload, "purchase_price": 333333.33}
+    )
+    create_response = test_client.post(
+        mortgage_endpoint,
+        json={
+            "property_id": create_response.json()["data"]["id"],
+            "loan_to_value": 33.33,
+            "interest_rate": 4.99,
+            "mortgage_type": "repayment",
+            "loan_term": 25,
+        },
+    )
+    mortgage = create_response.json()["data"]
+    # 333333.33 x 33.33% = 111099.999889
+    assert mortgage["mortgage_amount"] == 111100.00
+
+    response = test_client.post(f"{mortgage_endpoint}{mortgage['id']}/payment")
+    expected = exact_payment_pence(111100_00, "4.99", 25, "repayment") / 100
+    assert response.json()["monthly_payment"] == expected
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_pence_mode_endpoints(
+    test_client, create_portfolio, property_payload, monkeypatch
+):
+    monkeypatch.setattr(money, "MONEY_PRECISION", "pence")
+    stress_test = test_client.post(
+        "/api/v1/portfolio/stress-test", json={"paths": 10}
+    ).json()["data"]
+    [property_id], [mortgage_id] = create_portfolio(
+        mortgages=[(0, {"loan_to_value": 75})]
+    )
+    # A penny on top of every exact payment shows which endpoints use the kernel
+    exact_payment_pence = money.monthly_payment_pence
+    monkeypatch.setattr(
+        money, "monthly_payment_pence", lambda *args: exact_payment_pence(*args) + 1
+    )
+    payment = (exact_payment_pence(225000_00, 3, 30, "repayment") + 1) / 100
+
+    response = test_client.get(f"/api/v1/mortgage/{mortgage_id}/schedule")
+    assert json.loads(response.text.splitlines()[0])["payment"] == payment
+
+    response = test_client.post(
+        f"/api/v1/mortgage/{mortgage_id}/overpayments",
+        json={"monthly_overpayment": 100},
+    )
+    assert response.json()["data"]["monthly_payment"] == payment
+
+    response = test_client.get(f"/api/v1/property/{property_id}/roi")
+    assert response.json()["data"]["monthly_cashflow"] == pytest.approx(
+        property_payload["rental_income"]
+        - property_payload["management_fees"]
+        - payment
+    )
+
+    response = test_client.post("/api/v1/portfolio/stress-test", json={"paths": 10})
+    data = response.json()["data"]
+    assert data["mortgage_count"] == stress_test["mortgage_count"] + 1
+    assert data["current_monthly_payment"] == pytest.approx(
+        stress_test["current_monthly_payment"]
+        + payment
+        + 0.01 * stress_test["mortgage_count"]
+    )
@@ -1,9 +1,13 @@
+import uuid
+
 import pytest
 
 from app.custom.calculations import (
     calculate_interest_only_payment,
+    calculate_monthly_payments,
     calculate_repayment_mortgage_payment,
 )
+from app.schemas import MAX_PAYMENT_MORTGAGE_IDS
 
 
 @pytest.mark.unit
@@ -27,10 +31,68 @@ def test_repayment_payment():
     assert payment == expected_payment
 
 
+@pytest.mark.unit
+def test_batch_payments():
+    payments = calculate_monthly_payments(
+        loan_amounts=[100000, 100000, 120000],
+        annual_interest_rates=[3, 3, 0],
+        loan_terms_years=[30, None, 10],
+        mortgage_types=["repayment", "interest_only", "repayment"],
+    )
+    assert payments.tolist() == [421.60, 250, 1000]
+
+
+def closed_form_payment(
+    loan_amount: float, annual_interest_rate: float, loan_term_years: int
+) -> float:
+    """The repayment formula evaluated one mortgage at a time with Python floats."""
+    monthly_interest_rate = annual_interest_rate / 100 / 12
+    total_payments = loan_term_years * 12
+    monthly_payment = (
+        loan_amount
+        * (monthly_interest_rate * (1 + monthly_interest_rate) ** total_payments)
+        / ((1 + monthly_interest_rate) ** total_payments - 1)
+    )
+    return round(monthly_payment, 2)
+
+
+@pytest.mark.unit
+def test_batch_payments_match_closed_form():
+    loan_amounts = [340432.32, 225000, 51234.56, 1250000, 87654.32]
+    annual_interest_rates = [6.25, 2.5, 4.99, 0.75, 11.3]
+    loan_terms_years = [25, 30, 40, 5, 15]
+    payments = calculate_monthly_payments(
+        loan_amounts,
+        annual_interest_rates,
+        loan_terms_years,
+        ["repayment"] * len(loan_amounts),
+    )
+    assert payments.tolist() == [
+        closed_form_payment(*loan)
+        for loan in zip(loan_amounts, annual_interest_rates, loan_terms_years)
+    ]
+    # Known payments, so the formula above cannot drift with the kernel
+    assert payments[:3].tolist() == [2245.73, 889.02, 246.71]
+
+    interest_only = calculate_monthly_payments(
+        loan_amounts, annual_interest_rates, [None] * 5, ["interest_only"] * 5
+    )
+    assert interest_only.tolist() == [
+        round(amount * rate / 100 / 12, 2)
+        for amount, rate in zip(loan_amounts, annual_interest_rates)
+    ]
+
+
+@pytest.mark.unit
+def test_batch_payments_unsupported_type():
+    with pytest.raises(ValueError, match="Unsupported mortgage type."):
+        calculate_monthly_payments([100000], [3], [30], ["unsupported"])
+
+
 @pytest.mark.api
 @pytest.mark.integration
 def test_mortgage_payment_endpoint(
-    test_client, db_session, property_payload, mortgage_payload
+    test_client, sql_queries, property_payload, mortgage_payload
 ):
     # Create a property
     create_response = test_client.post("/api/v1/property/", json=property_payload)
@@ -53,6 +115,81 @@ def test_mortgage_payment_endpoint(
     get_response = test_client.post(f"/api/v1/mortgage/{mortgage_id}/payment")
     mortgage_payment = get_response.json()
     assert get_response.status_code == 200
+    # The mortgage and its property are checked with one query
+    sql_queries.assert_max_queries(1)
     assert mortgage_payment["mortgage_id"] == mortgage_id and mortgage_payment[
         "monthly_payment"
     ] == pytest.approx(1265.0, 0.1)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_payments_endpoint(test_client, property_payload, mortgage_payload):
+    # Create a property
+    create_response = test_client.post("/api/v1/property/", json=property_payload)
+    assert create_response.status_code == 201
+    property_id = create_response.json()["data"]["id"]
+
+    # Create a Repayment and an Interest Only mortgage
+    mortgage_payload["property_id"] = property_id
+    create_response = test_client.post("/api/v1/mortgage/", json=mortgage_payload)
+    assert create_response.status_code == 201
+    repayment_id = create_response.json()["data"]["id"]
+
+    mortgage_payload["mortgage_type"] = "interest_only"
+    create_response = test_client.post("/api/v1/mortgage/", json=mortgage_payload)
+    assert create_response.status_code == 201
+    interest_only_id = create_response.json()["data"]["id"]
+
+    # Get the payments by mortgage IDs, including one that does not exist
+    missing_id = str(uuid.uuid4())
+    response = test_client.post(
+        "/api/v1/mortgage/payments",
+        json={"mortgage_ids": [repayment_id, missing_id, interest_only_id]},
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+    assert response_json["data"] == [
+        {"mortgage_id": repayment_id, "monthly_payment": 1264.81},
+        {"mortgage_id": interest_only_id, "monthly_payment": 750.0},
+    ]
+    assert response_json["errors"] == [
+        {"mortgage_id": missing_id, "detail": "Mortgage not found."}
+    ]
+
+    # Get the payments by property ID
+    response = test_client.post(
+        "/api/v1/mortgage/payments", json={"property_id": property_id}
+    )
+    assert response.status_code == 200
+    assert {payment["mortgage_id"] for payment in response.json()["data"]} == {
+        repayment_id,
+        interest_only_id,
+    }
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_payments_property_not_found(test_client):
+    response = test_client.post(
+        "/api/v1/mortgage/payments", json={"property_id": str(uuid.uuid4())}
+    )
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Property not found."}
+
+
+@pytest.mark.api
+@pytest.mark.unit
+def test_mortgage_payments_requires_ids_or_property(test_client):
+    response = test_client.post("/api/v1/mortgage/payments", json={})
+    assert response.status_code == 422
+
+
+@pytest.mark.api
+@pytest.mark.unit
+def test_mortgage_payments_too_many_ids(test_client):
+    mortgage_ids = [str(uuid.uuid4()) for _ in range(MAX_PAYMENT_MORTGAGE_IDS + 1)]
+    response = test_client.post(
+        "/api/v1/mortgage/payments", json={"mortgage_ids": mortgage_ids}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from app.custom.calculations import (
+    calculate_amortization_schedule,
+    calculate_repayment_mortgage_payment,
+)
+from app.custom.overpayments import simulate_overpayments
+
+
+def simulate_month_by_month(loan_amount, rate, years, overpayment, lump_sums):
+    """Reference implementation of simulate_overpayments as a plain loop."""
+    monthly_rate = rate / 100 / 12
+    payment = calculate_repayment_mortgage_payment(loan_amount, rate, years)
+    balance = loan_amount
+    total_interest = 0
+    for month in range(1, years * 12 + 1):
+        total_interest += balance * monthly_rate
+        balance = (
+            balance * (1 + monthly_rate)
+            - payment
+            - overpayment
+            - lump_sums.get(month, 0)
+        )
+        if balance <= 0.005 or month == years * 12:
+            return month, total_interest
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "loan_amount, rate, years",
+    [(225000, 3, 30), (300000, 0, 25), (500000, 7.5, 40), (1000, 15, 1)],
+)
+@pytest.mark.parametrize(
+    "overpayment, lump_sums",
+    [(0, {}), (200, {}), (0, {12: 20000}), (150, {1: 5000, 60: 30000}), (0, {5: 1e7})],
+)
+def test_simulate_overpayments(loan_amount, rate, years, overpayment, lump_sums):
+    result = simulate_overpayments(loan_amount, rate, years, overpayment, lump_sums)
+    months, total_interest = simulate_month_by_month(
+        loan_amount, rate, years, overpayment, lump_sums
+    )
+    assert result["term_months"] == months
+    assert result["total_interest"] == pytest.approx(total_interest, abs=1e-4)
+    assert result["schedule"]["balance"][-1] == 0
+    assert len(result["schedule"]["month"]) == months
+
+
+@pytest.mark.unit
+def test_simulate_without_overpayments_matches_schedule():
+    result = simulate_overpayments(225000, 3, 30)
+    schedule = calculate_amortization_schedule(225000, 3, 30)
+    assert result["term_months"] == result["original_term_months"] == 360
+    assert result["interest_saved"] == pytest.approx(0, abs=1e-6)
+    for column, values in schedule.items():
+        assert np.array_equal(result["schedule"][column], values)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_overpayments(test_client, property_payload, property_endpoint):
+    create_response = test_client.post(property_endpoint, json=property_payload)
+    create_response = test_client.post(
+        "/api/v1/mortgage/",
+        json={
+            "property_id": create_response.json()["data"]["id"],
+            "loan_to_value": 75,
+            "interest_rate": 3,
+            "mortgage_type": "repayment",
+            "loan_term": 30,
+        },
+    )
+    mortgage_id = create_response.json()["data"]["id"]
+
+    response = test_client.post(
+        f"/api/v1/mortgage/{mortgage_id}/overpayments",
+        json={
+            "monthly_overpayment": 200,
+            "lump_sums": [{"month": 12, "amount": 10000}],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["original_term_months"] == 360
+    assert data["term_months"] < 360
+    assert data["months_saved"] == 360 - data["term_months"]
+    assert data["interest_saved"] > 0
+    assert data["payoff_date"] < data["original_payoff_date"]
+    assert len(data["schedule"]["month"]) == data["term_months"]
+    assert data["schedule"]["overpayment"][11] == 10200
+    assert data["schedule"]["balance"][-1] == 0
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_overpayments_errors(test_client, create_portfolio):
+    response = test_client.post(
+        "/api/v1/mortgage/6f1d4c8a-0b6e-4e57-9d4b-3f0c2a1e5b7d/overpayments", json={}
+    )
+    assert response.status_code == 404
+
+    _, [interest_only_id, no_term_id] = create_portfolio(
+        mortgages=[(0, {"mortgage_type": "interest_only"}), (0, {"loan_term": 0})]
+    )
+    response = test_client.post(
+        f"/api/v1/mortgage/{interest_only_id}/overpayments",
+        json={"monthly_overpayment": 100},
+    )
+    assert response.status_code == 400
+
+    response = test_client.post(
+        f"/api/v1/mortgage/{no_term_id}/overpayments",
+        json={"monthly_overpayment": 100},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "A loan term of at least one month is required to simulate overpayments."
+    )
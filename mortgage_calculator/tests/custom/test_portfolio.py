@@ -0,0 +1,148 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import app.portfolio_totals as portfolio_totals
+
+SUMMARY_ENDPOINT = "/api/v1/portfolio/summary"
+
+
+@pytest.fixture(scope="function")
+def portfolio_ids(create_portfolio):
+    """Two properties: one with a mortgage of each type, one without mortgages."""
+    return create_portfolio(
+        properties=[
+            {"purchase_price": 300000, "rental_income": 2500},
+            {"purchase_price": 200000, "rental_income": 1500},
+        ],
+        mortgages=[
+            (0, {"loan_to_value": 50, "loan_term": 25}),
+            (
+                0,
+                {
+                    "loan_to_value": 25,
+                    "interest_rate": 5,
+                    "mortgage_type": "interest_only",
+                    "loan_term": 25,
+                },
+            ),
+        ],
+    )
+
+
+def get_summary(test_client, group_by="none"):
+    response = test_client.get(SUMMARY_ENDPOINT, params={"group_by": group_by})
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_portfolio_summary_by_mortgage_type(test_client, portfolio_ids):
+    summary = {row["group"]: row for row in get_summary(test_client, "mortgage_type")}
+
+    # Both mortgages are on the first property, which counts towards both groups
+    assert summary["repayment"]["mortgage_count"] == 1
+    assert summary["repayment"]["property_count"] == 1
+    assert summary["repayment"]["total_purchase_price"] == 300000
+    assert summary["repayment"]["total_mortgage_debt"] == 150000
+    assert summary["interest_only"]["total_mortgage_debt"] == 75000
+    assert summary["interest_only"]["weighted_average_interest_rate"] == 5
+    assert summary["interest_only"]["total_monthly_rental_income"] == 2500
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_portfolio_summary_by_property(test_client, portfolio_ids):
+    property_ids, _ = portfolio_ids
+    summary = {row["group"]: row for row in get_summary(test_client, "property")}
+
+    assert summary[property_ids[0]]["mortgage_count"] == 2
+    assert summary[property_ids[0]]["total_mortgage_debt"] == 225000
+    assert summary[property_ids[0]]["weighted_average_interest_rate"] == pytest.approx(
+        (150000 * 3 + 75000 * 5) / 225000
+    )
+    assert summary[property_ids[0]]["average_loan_to_value"] == 37.5
+    assert summary[property_ids[1]]["mortgage_count"] == 0
+    assert summary[property_ids[1]]["weighted_average_interest_rate"] is None
+    assert summary[property_ids[1]]["total_purchase_price"] == 200000
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_portfolio_totals_table_matches_live_totals(
+    test_client, monkeypatch, portfolio_ids, property_payload, mortgage_endpoint
+):
+    property_ids, mortgage_ids = portfolio_ids
+
+    # Change the portfolio through every write path the triggers must follow
+    test_client.patch(
+        f"{mortgage_endpoint}{mortgage_ids[0]}", json={"interest_rate": 4}
+    )
+    test_client.delete(f"{mortgage_endpoint}{mortgage_ids[1]}")
+    test_client.patch(
+        f"/api/v1/property/{property_ids[1]}", json={"purchase_price": 250000}
+    )
+    bulk_response = test_client.post(
+        "/api/v1/property/bulk", json=[property_payload] * 3
+    )
+    assert bulk_response.json()["inserted"] == 3
+
+    monkeypatch.setattr(portfolio_totals, "PORTFOLIO_TOTALS_TABLE", True)
+    [table_totals] = get_summary(test_client)
+    monkeypatch.setattr(portfolio_totals, "PORTFOLIO_TOTALS_TABLE", False)
+    [live_totals] = get_summary(test_client)
+
+    assert table_totals == pytest.approx(live_totals)
+    assert live_totals["total_mortgage_debt"] >= 150000
+
+
+@pytest.mark.integration
+def test_portfolio_totals_writers_do_not_wait(db_session, db_url):
+    if db_session.get_bind().dialect.name != "postgresql":
+        pytest.skip("Only Postgres splits the totals over rows.")
+
+    engine = create_engine(db_url)
+    insert = text(
+        "INSERT INTO properties (id, purchase_price, rental_income, renovation_cost, "
+        "property_name, admin_costs, management_fees) "
+        "VALUES (:id, 100000, 1000, 0, 'Concurrent writer', 0, 0)"
+    )
+    # Two connections whose triggers add to different rows
+    connections = []
+    while len({slot for slot, _ in connections}) < 2:
+        connection = engine.connect()
+        pid = connection.execute(text("SELECT pg_backend_pid()")).scalar_one()
+        connections.append((pid % portfolio_totals.PORTFOLIO_TOTALS_SLOTS, connection))
+    first = connections[0][1]
+    second = next(c for slot, c in connections if slot != connections[0][0])
+    try:
+        first.execute(insert, {"id": str(uuid.uuid4())})
+        # The first transaction still holds its totals row
+        second.execute(text("SET lock_timeout = '2s'"))
+        second.execute(insert, {"id": str(uuid.uuid4())})
+        second.rollback()
+        first.rollback()
+    finally:
+        for _, connection in connections:
+            connection.close()
+        engine.dispose()
+
+
+@pytest.mark.unit
+def test_portfolio_totals_triggers_skipped(monkeypatch):
+    class Connection:
+        def __init__(self, dialect_name):
+            self.dialect = SimpleNamespace(name=dialect_name)
+
+        def exec_driver_sql(self, statement):
+            raise AssertionError(statement)
+
+    # Other databases get no triggers
+    assert portfolio_totals.portfolio_totals_ddl("mysql") == []
+    portfolio_totals.create_portfolio_totals_triggers(None, Connection("mysql"))
+    # Nor does any database with the totals table turned off
+    monkeypatch.setattr(portfolio_totals, "PORTFOLIO_TOTALS_TABLE", False)
+    portfolio_totals.create_portfolio_totals_triggers(None, Connection("sqlite"))
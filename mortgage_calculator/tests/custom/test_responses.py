@@ -0,0 +1,44 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import app.schemas as schemas
+from app.custom.responses import ModelResponse
+
+
+@pytest.mark.unit
+def test_model_response_matches_response_model_serialization():
+    content = schemas.MortgageListResponseModel(
+        message="Mortgages retrieved successfully.",
+        data=[
+            schemas.MortgageModel(
+                id=uuid.uuid4(),
+                property_id=uuid.uuid4(),
+                loan_to_value=75,
+                interest_rate=3.5,
+                mortgage_type=schemas.MortgageType.interest_only,
+                loan_term=None,
+                mortgage_amount=225000,
+                createdAt=datetime(2024, 6, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+                updatedAt=None,
+                version=1,
+            )
+        ],
+        next_cursor="abc",
+    )
+    response_field = create_response_field(
+        name="Response", type_=schemas.MortgageListResponseModel, mode="serialization"
+    )
+    expected = asyncio.run(
+        serialize_response(field=response_field, response_content=content)
+    )
+
+    response = ModelResponse(content)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == jsonable_encoder(expected)
@@ -0,0 +1,116 @@
+import pytest
+
+import app.custom.scenarios as scenarios
+from app.cache import LRUCache
+from app.custom.calculations import calculate_monthly_payments
+
+
+@pytest.fixture(scope="function")
+def mortgage_payload(mortgage_payload):
+    """A 75% mortgage, of 225000 on the 300000 property."""
+    return {**mortgage_payload, "loan_to_value": 75}
+
+
+def scenarios_endpoint(mortgage_id):
+    return f"/api/v1/mortgage/{mortgage_id}/scenarios"
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_scenarios(test_client, mortgage_id, mortgage_endpoint):
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id),
+        json={"interest_rates": [3, 4.5], "loan_terms": [25, 30]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    [current_payment] = calculate_monthly_payments([225000], [3], [30], ["repayment"])
+    assert body["current_monthly_payment"] == current_payment
+
+    scenarios = {(row["interest_rate"], row["loan_term"]): row for row in body["data"]}
+    assert len(scenarios) == 4
+    assert scenarios[(3, 30)]["monthly_payment_change"] == 0
+    assert scenarios[(3, 30)]["total_interest"] == pytest.approx(
+        current_payment * 360 - 225000
+    )
+    [payment] = calculate_monthly_payments([225000], [4.5], [25], ["repayment"])
+    assert scenarios[(4.5, 25)]["monthly_payment"] == payment
+    assert scenarios[(4.5, 25)]["loan_to_value"] == 75
+
+    # Nothing is saved
+    response = test_client.get(f"{mortgage_endpoint}{mortgage_id}")
+    assert response.json()["data"]["interest_rate"] == 3
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_scenarios_loan_to_value(test_client, mortgage_id):
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"loan_to_values": [50]}
+    )
+    [scenario] = response.json()["data"]
+    # Half of the 300000 purchase price
+    assert scenario["mortgage_amount"] == 150000
+    assert scenario["monthly_payment_change"] < 0
+
+    # Amounts are rounded to pennies, and the payment is that of the rounded amount
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"loan_to_values": [13.716048]}
+    )
+    [scenario] = response.json()["data"]
+    assert scenario["mortgage_amount"] == 41148.14
+    [payment] = calculate_monthly_payments([41148.14], [3], [30], ["repayment"])
+    assert scenario["monthly_payment"] == payment
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_scenarios_are_memoized(test_client, mortgage_id, monkeypatch):
+    monkeypatch.setattr(scenarios, "payment_cache", LRUCache(ttl=float("inf")))
+    calculated = []
+
+    def counting_monthly_payments(*args):
+        calculated.append(len(args[0]))
+        return calculate_monthly_payments(*args)
+
+    monkeypatch.setattr(
+        scenarios, "calculate_monthly_payments", counting_monthly_payments
+    )
+    payload = {"interest_rates": [3, 4, 5], "loan_terms": [25, 30]}
+    first = test_client.post(scenarios_endpoint(mortgage_id), json=payload).json()
+    second = test_client.post(scenarios_endpoint(mortgage_id), json=payload).json()
+
+    # The current payment is also the 3% and 30 year scenario, calculated once
+    assert calculated == [6]
+    assert first == second
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_mortgage_scenarios_errors(test_client, mortgage_id):
+    response = test_client.post(
+        scenarios_endpoint("6f1d4c8a-0b6e-4e57-9d4b-3f0c2a1e5b7d"), json={}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Mortgage not found."
+
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"interest_rates": list(range(1001))}
+    )
+    assert response.status_code == 422
+
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"loan_to_values": [150]}
+    )
+    assert response.status_code == 422
+
+    # Rates and terms are bounded, so a grid can't overflow the payment formula
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"interest_rates": [101]}
+    )
+    assert response.status_code == 422
+
+    response = test_client.post(
+        scenarios_endpoint(mortgage_id), json={"loan_terms": [51]}
+    )
+    assert response.status_code == 422
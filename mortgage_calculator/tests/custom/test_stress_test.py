@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+import app.custom.stress_test as stress_test
+from app.schemas import RateModel
+
+STRESS_TEST_ENDPOINT = "/api/v1/portfolio/stress-test"
+
+
+@pytest.mark.unit
+def test_simulate_rate_paths():
+    rates = stress_test.simulate_rate_paths(
+        RateModel.vasicek,
+        paths=5000,
+        months=120,
+        initial_rate=5,
+        volatility=1,
+        mean_rate=3,
+        reversion_speed=2,
+        seed=42,
+    )
+    assert rates.shape == (5000, 120)
+    # Ten years of strong mean reversion end up around the mean rate
+    assert rates[:, -1].mean() == pytest.approx(3, abs=0.1)
+    assert np.array_equal(
+        rates,
+        stress_test.simulate_rate_paths(
+            RateModel.vasicek, 5000, 120, 5, 1, 3, reversion_speed=2, seed=42
+        ),
+    )
+
+    random_walk = stress_test.simulate_rate_paths(
+        RateModel.random_walk, paths=5000, months=12, initial_rate=5, volatility=1
+    )
+    assert random_walk[:, -1].std() == pytest.approx(1, abs=0.05)
+
+
+@pytest.mark.unit
+def test_reprice_mortgages_on_process_pool(monkeypatch):
+    rng = np.random.default_rng(0)
+    loans = stress_test.Loans(
+        amortising_balances=rng.uniform(100000, 500000, 300),
+        amortising_rates=rng.uniform(0, 7, 300),
+        amortising_months=rng.integers(60, 360, 300).astype(float),
+        interest_only_balances=rng.uniform(100000, 500000, 30),
+        interest_only_rates=rng.uniform(1, 7, 30),
+    )
+    rate_shifts = rng.normal(0, 2, 200)
+    expected = stress_test.reprice_mortgages(loans, rate_shifts)
+
+    monkeypatch.setattr(stress_test, "STRESS_TEST_WORKERS", 2)
+    monkeypatch.setattr(stress_test, "STRESS_TEST_PARALLEL_MIN", 0)
+    try:
+        assert np.allclose(stress_test.reprice_mortgages(loans, rate_shifts), expected)
+    finally:
+        stress_test.shutdown_executor()
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_stress_test(
+    test_client, property_payload, property_endpoint, mortgage_endpoint
+):
+    create_response = test_client.post(property_endpoint, json=property_payload)
+    for mortgage_type in ("repayment", "interest_only"):
+        test_client.post(
+            mortgage_endpoint,
+            json={
+                "property_id": create_response.json()["data"]["id"],
+                "loan_to_value": 50,
+                "interest_rate": 3,
+                "mortgage_type": mortgage_type,
+                "loan_term": 25,
+            },
+        )
+
+    # Without volatility the rates reset to where they were, as do the payments
+    response = test_client.post(
+        STRESS_TEST_ENDPOINT, json={"paths": 10, "volatility": 0}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["mortgage_count"] >= 2
+    for row in data["percentiles"]:
+        assert row["rate"] == pytest.approx(5)
+        assert row["monthly_payment"] == pytest.approx(
+            data["current_monthly_payment"], abs=0.01 * data["mortgage_count"]
+        )
+
+    response = test_client.post(
+        STRESS_TEST_ENDPOINT,
+        json={"rate_model": "random_walk", "paths": 1000, "volatility": 2, "seed": 1},
+    )
+    data = response.json()["data"]
+    payments = [row["monthly_payment"] for row in data["percentiles"]]
+    cashflows = [row["monthly_cashflow"] for row in data["percentiles"]]
+    assert payments == sorted(payments)
+    assert payments[0] < data["current_monthly_payment"] < payments[-1]
+    assert cashflows == sorted(cashflows)
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_stress_test_validation(test_client):
+    response = test_client.post(STRESS_TEST_ENDPOINT, json={"paths": 0})
+    assert response.status_code == 422
@@ -0,0 +1,56 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+from app import portfolio_totals
+from app.database import Base
+
+MIGRATIONS_DIR = Path(__file__).parents[2] / "migrations"
+
+
+@pytest.fixture(scope="function")
+def alembic_config(tmp_path):
+    """Alembic config pointing at an empty SQLite database."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'migrations.db'}")
+    return config
+
+
+@pytest.mark.integration
+def test_migrations_match_models(alembic_config):
+    command.upgrade(alembic_config, "head")
+
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    assert diff == []
+
+
+@pytest.mark.integration
+def test_migrations_downgrade(alembic_config):
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+    command.upgrade(alembic_config, "head")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("dialect_name", ["postgresql", "sqlite"])
+def test_migrations_match_portfolio_totals_triggers(dialect_name):
+    # The migration has its own copy of the statements, which create_all also runs
+    path = MIGRATIONS_DIR / "versions" / "0003_add_portfolio_totals.py"
+    spec = importlib.util.spec_from_file_location("add_portfolio_totals", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    ddl = portfolio_totals.portfolio_totals_ddl(dialect_name)
+    drop_ddl = portfolio_totals.portfolio_totals_drop_ddl(dialect_name)
+    assert migration.TRIGGERS[dialect_name] == ddl
+    assert migration.DROP_TRIGGERS[dialect_name] == drop_ddl
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.database import InstrumentedQueuePool, get_pool_options, get_pool_stats
+
+
+@pytest.mark.unit
+def test_pool_options_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DB_POOL_USE_LIFO", "true")
+    options = get_pool_options()
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+    assert options["pool_use_lifo"] is True
+
+
+@pytest.mark.unit
+def test_null_pool_option(monkeypatch):
+    monkeypatch.setenv("DB_POOL_NULLPOOL", "true")
+    assert get_pool_options() == {"poolclass": NullPool}
+
+
+@pytest.mark.unit
+def test_pool_stats(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+    )
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        stats = get_pool_stats(engine)
+        assert stats["pool"] == "InstrumentedQueuePool"
+        assert stats["size"] == 2
+        assert stats["checked_out"] == 1
+        assert stats["checkouts"] == 1
+        assert stats["wait_time_max_ms"] >= stats["wait_time_avg_ms"] > 0
+
+    assert get_pool_stats(engine)["checked_out"] == 0
+    engine.dispose()
+
+
+@pytest.mark.api
+@pytest.mark.unit
+def test_pool_stats_endpoint(test_client):
+    response = test_client.get("/api/pool")
+    assert response.status_code == 200
+    assert response.json()["sync"]["pool"] == "InstrumentedQueuePool"
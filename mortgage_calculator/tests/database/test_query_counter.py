@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import PropertyOrm
+
+
+@pytest.mark.unit
+def test_query_counter_flags_repeated_statements(db_session, sql_queries):
+    sql_queries.start_request("GET", "/api/v1/property/")
+    for _ in range(3):
+        db_session.execute(select(PropertyOrm.id).where(PropertyOrm.id.is_(None)))
+    sql_queries.end_request()
+    db_session.execute(select(PropertyOrm.id))
+
+    request = sql_queries.last
+    assert len(request.statements) == 3
+    assert len(sql_queries.statements) == 4
+    assert all(statement.duration_ms >= 0 for statement in request.statements)
+    assert list(request.repeated().values()) == [3]
+    sql_queries.assert_max_queries(3)
+    with pytest.raises(AssertionError, match="at most 2 statement"):
+        sql_queries.assert_max_queries(2)
+    with pytest.raises(AssertionError, match="N\\+1 queries"):
+        sql_queries.assert_no_n_plus_one()
+
+    # Cleared, so the fixture does not warn about them at the end of the test
+    sql_queries.clear()
+    sql_queries.assert_no_n_plus_one()
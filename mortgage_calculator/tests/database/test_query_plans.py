@@ -0,0 +1,47 @@
+import uuid
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models import MortgageOrm, PropertyOrm
+
+
+def explain(db_session, statement) -> str:
+    """Return the query plan of a statement as text, on SQLite or Postgres."""
+    compiled = statement.compile(
+        db_session.get_bind(), compile_kwargs={"literal_binds": True}
+    )
+    if db_session.get_bind().dialect.name == "sqlite":
+        rows = db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+        return "\n".join(row[-1] for row in rows)
+
+    # The test tables are tiny, so stop Postgres from preferring a sequential scan
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = db_session.execute(text(f"EXPLAIN {compiled}")).all()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.integration
+def test_mortgages_by_property_use_index(db_session):
+    statement = (
+        select(MortgageOrm)
+        .where(MortgageOrm.property_id == str(uuid.uuid4()))
+        .order_by(MortgageOrm.createdAt)
+    )
+    assert "ix_mortgages_property_id_createdAt" in explain(db_session, statement)
+
+
+@pytest.mark.integration
+def test_property_listing_uses_index(db_session):
+    statement = (
+        select(PropertyOrm).order_by(PropertyOrm.createdAt, PropertyOrm.id).limit(11)
+    )
+    assert "ix_properties_createdAt_id" in explain(db_session, statement)
+
+
+@pytest.mark.integration
+def test_mortgage_listing_uses_index(db_session):
+    statement = (
+        select(MortgageOrm).order_by(MortgageOrm.createdAt, MortgageOrm.id).limit(11)
+    )
+    assert "ix_mortgages_createdAt_id" in explain(db_session, statement)
@@ -0,0 +1,99 @@
+import re
+
+import pytest
+
+from app import metrics
+
+
+def read_metric(text: str, name: str, **labels) -> float:
+    """The value of the sample of a metric with all the given labels."""
+    for line in text.splitlines():
+        match = re.fullmatch(re.escape(name) + r"(?:\{(.*)\})? (\S+)", line)
+        sample_labels = match and match.group(1) or ""
+        if match and all(f'{k}="{v}"' in sample_labels for k, v in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"No {name} sample with {labels}")
+
+
+@pytest.mark.unit
+def test_histogram_buckets():
+    histogram = metrics.Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.sum == pytest.approx(5.65)
+
+    registry = metrics.Metrics()
+    database_time = metrics.RequestDatabaseTime()
+    database_time.seconds, database_time.statements = 0.002, 2
+    registry.observe("GET", 'a"b', 200, 0.003, database_time, 1500)
+    text = registry.render()
+    assert 'route="a\\"b"' in text
+    assert read_metric(text, "http_request_duration_seconds_bucket", le="0.0025") == 0
+    assert read_metric(text, "http_request_duration_seconds_bucket", le="0.005") == 1
+    assert read_metric(text, "http_response_size_bytes_bucket", le="+Inf") == 1
+    assert read_metric(text, "http_request_db_statements_total") == 2
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_metrics_endpoint(test_client, property_payload, property_endpoint):
+    route = "/api/v1/property/{property_id}"
+    before = test_client.get("/metrics").text
+    try:
+        requests_before = read_metric(
+            before, "http_requests_total", route=route, status="200"
+        )
+    except AssertionError:
+        requests_before = 0
+
+    property_id = test_client.post(property_endpoint, json=property_payload).json()[
+        "data"
+    ]["id"]
+    get_response = test_client.get(f"{property_endpoint}{property_id}")
+    test_client.get("/api/v1/no-such-route")
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    # Requests are labelled by their route template, not their path
+    assert property_id not in text
+    assert (
+        read_metric(text, "http_requests_total", route=route, status="200")
+        == requests_before + 1
+    )
+    assert read_metric(text, "http_requests_total", route="<unmatched>", status="404")
+    # Only the scrape itself is being served
+    assert read_metric(text, "http_requests_in_flight") == 1
+    # Paths redirected to add or remove a trailing slash match no route
+    assert read_metric(
+        text,
+        "http_request_db_statements_total",
+        method="POST",
+        route="/api/v1/property",
+    )
+    assert read_metric(text, "http_request_db_seconds_sum", route=route) > 0
+    assert read_metric(text, "http_response_size_bytes_sum", route=route) >= len(
+        get_response.content
+    )
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_metrics_unknown_methods(test_client):
+    def other_requests() -> float:
+        text = test_client.get("/metrics").text
+        assert "FOO" not in text
+        try:
+            return read_metric(
+                text, "http_request_duration_seconds_count", method="other"
+            )
+        except AssertionError:
+            return 0
+
+    requests_before = other_requests()
+    # Methods are labelled from a fixed set, so clients cannot add series
+    for number in range(5):
+        test_client.request(f"FOO{number}", "/api/healthchecker")
+    assert other_requests() == requests_before + 5
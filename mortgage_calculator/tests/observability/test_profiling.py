@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.main import app
+
+STRESS_TEST_ENDPOINT = "/api/v1/portfolio/stress-test"
+TOKEN = "secret"
+PROFILE_HEADERS = {"X-Profile": TOKEN}
+
+
+@pytest.fixture(scope="function")
+def profiling_client(test_client):
+    """A client of the test app behind the profiling middleware."""
+    profiling.instrument_engines()
+    middleware = profiling.ProfilingMiddleware(app, token=TOKEN, profile_dir="")
+    with TestClient(middleware) as client:
+        yield client
+
+
+@pytest.fixture(scope="function")
+def property_id(test_client, property_payload, property_endpoint):
+    response = test_client.post(property_endpoint, json=property_payload)
+    return response.json()["data"]["id"]
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_profile_request(profiling_client, property_id, property_endpoint):
+    response = profiling_client.get(
+        f"{property_endpoint}{property_id}", headers=PROFILE_HEADERS
+    )
+    profile = response.json()
+    assert response.headers["X-Profile-Id"] == profile["id"]
+    assert profile["route"] == "/api/v1/property/{property_id}"
+    assert profile["status"] == 200
+    assert profile["response_size"] > 0
+    assert profile["sql"]["statements"] == 1
+    assert profile["sql"]["by_statement"][0]["statement"].startswith("SELECT")
+    assert profile["profile"]["format"] == "folded"
+
+    # Requests without the header are not profiled
+    response = profiling_client.get(f"{property_endpoint}{property_id}")
+    assert response.status_code == 200
+    assert response.json()["data"]["id"] == property_id
+    assert "X-Profile-Id" not in response.headers
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_profile_stacks(profiling_client):
+    response = profiling_client.post(
+        STRESS_TEST_ENDPOINT,
+        json={"paths": 20000, "horizon_months": 120, "seed": 1},
+        headers=PROFILE_HEADERS,
+    )
+    profile = response.json()["profile"]
+    assert profile["samples"] > 0
+    # Folded stacks: frames from the root, separated by ";", then the sample count
+    stack, count = profile["stacks"][0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("stress_test.py:simulate_rate_paths" in row for row in profile["stacks"])
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_profile_saved(test_client, tmp_path, property_id, property_endpoint):
+    middleware = profiling.ProfilingMiddleware(
+        app, token=TOKEN, profile_dir=str(tmp_path)
+    )
+    with TestClient(middleware) as client:
+        response = client.get(
+            f"{property_endpoint}{property_id}", headers=PROFILE_HEADERS
+        )
+    # The response is untouched, and the profile saved under its id
+    assert response.json()["data"]["id"] == property_id
+    profile_id = response.headers["X-Profile-Id"]
+    with open(tmp_path / f"{profile_id}.json") as file:
+        assert json.load(file)["status"] == 200
+    assert (tmp_path / f"{profile_id}.folded").exists()
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_profile_token(profiling_client, property_id, property_endpoint):
+    url = f"{property_endpoint}{property_id}"
+    for request_kwargs in (
+        {"headers": {"X-Profile": "1"}},
+        {"headers": {"X-Profile": "secret\xff".encode("latin-1")}},
+        {"params": {"profile": 1}},
+    ):
+        response = profiling_client.get(url, **request_kwargs)
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+
+    response = profiling_client.get(url, headers=PROFILE_HEADERS)
+    assert "X-Profile-Id" in response.headers
+
+
+@pytest.mark.unit
+def test_profiling_requires_token():
+    with pytest.raises(RuntimeError, match="PROFILING_TOKEN"):
+        profiling.ProfilingMiddleware(app, token="")
+
+
+@pytest.mark.api
+@pytest.mark.integration
+def test_one_profile_at_a_time(profiling_client, property_id, property_endpoint):
+    url = f"{property_endpoint}{property_id}"
+    # As if another request were being profiled
+    with profiling._profile_lock:
+        response = profiling_client.get(url, headers=PROFILE_HEADERS)
+        assert response.status_code == 429
+        assert response.json() == {"detail": "Another request is being profiled."}
+
+        # Requests that do not ask for a profile are served as usual
+        assert profiling_client.get(url).status_code == 200
+
+    response = profiling_client.get(url, headers=PROFILE_HEADERS)
+    assert "X-Profile-Id" in response.headers